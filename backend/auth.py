@@ -5,10 +5,12 @@ from fastapi.security import OAuth2PasswordBearer
 import bcrypt
 import jwt
 import hashlib
+import logging
 import uuid
 from backend.config import JWT_SECRET, JWT_ALGORITHM, SUPERADMIN_EMAIL, SUPERADMIN_PASSWORD, JWT_EXPIRATION_SECONDS
 from backend.db import users
 from backend.services.utils import get_malaysia_time
+from backend.services.tracing import span, traced
 
 # Session Clearing Mechanism:
 # By adding a unique salt on every startup, we invalidate all previously issued tokens.
@@ -19,7 +21,13 @@ DYNAMIC_JWT_SECRET = JWT_SECRET
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+logger = logging.getLogger(__name__)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    with span("bcrypt.verify"):
+        return _verify_password(plain_password, hashed_password)
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     try:
         if not hashed_password:
             return False
@@ -35,7 +43,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         # 1. Direct bcrypt check (no pre-hash)
         try:
             if bcrypt.checkpw(password_bytes, hashed_bytes):
-                print("DEBUG: Password verified via Strategy 1 (Direct)")
+                logger.debug("Password verified via Strategy 1 (Direct)")
                 return True
         except Exception:
             pass
@@ -44,7 +52,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         try:
             pre_hex = hashlib.sha256(password_bytes).hexdigest().encode('utf-8')
             if bcrypt.checkpw(pre_hex, hashed_bytes):
-                print("DEBUG: Password verified via Strategy 2 (SHA256 Hex)")
+                logger.debug("Password verified via Strategy 2 (SHA256 Hex)")
                 return True
         except Exception:
             pass
@@ -53,7 +61,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         try:
             pre_bin = hashlib.sha256(password_bytes).digest()
             if bcrypt.checkpw(pre_bin, hashed_bytes):
-                print("DEBUG: Password verified via Strategy 3 (SHA256 Binary)")
+                logger.debug("Password verified via Strategy 3 (SHA256 Binary)")
                 return True
         except Exception:
             pass
@@ -61,12 +69,12 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         # 4. Plain text comparison (LAST RESORT)
         if not hashed_password.startswith('$2'):
             if plain_password == hashed_password:
-                print("DEBUG: Password verified via Strategy 4 (Plain Text)")
+                logger.debug("Password verified via Strategy 4 (Plain Text)")
                 return True
 
         return False
     except Exception as e:
-        print(f"DEBUG: verify_password error: {e}")
+        logger.debug("verify_password error: %s", e)
         return False
 
 def hash_password(password: str) -> str:
@@ -74,7 +82,8 @@ def hash_password(password: str) -> str:
     # and ensure consistent behavior across different environments
     pre_hashed = hashlib.sha256(password.encode('utf-8')).hexdigest().encode('utf-8')
     salt = bcrypt.gensalt()
-    return bcrypt.hashpw(pre_hashed, salt).decode('utf-8')
+    with span("bcrypt.hash"):
+        return bcrypt.hashpw(pre_hashed, salt).decode('utf-8')
 
 def create_access_token(sub: str, role: str, expires_delta: Optional[timedelta] = None) -> str:
     now = get_malaysia_time()
@@ -88,6 +97,7 @@ def create_access_token(sub: str, role: str, expires_delta: Optional[timedelta]
 
 from bson import ObjectId
 
+@traced("auth.get_current_user")
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         # First try with the primary secret
@@ -100,7 +110,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         user_id = payload.get("sub")
         role = payload.get("role")
         if not user_id:
-            print(f"DEBUG: Token decode success but no sub. Payload: {payload}")
+            logger.debug("Token decode success but no sub. Payload: %s", payload)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
         
         # Try finding by ObjectId first (standard), then by str (fallback)
@@ -117,7 +127,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             doc = await users.find_one({"_id": safe_user_id})
             
         if not doc:
-            print(f"DEBUG: User not found in DB. ID: {user_id} (type: {type(user_id)})")
+            logger.debug("User not found in DB. ID: %s (type: %s)", user_id, type(user_id))
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
         return {
             "id": str(doc["_id"]), 
@@ -129,10 +139,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             "has_analyzed": doc.get("has_analyzed", False)
         }
     except jwt.ExpiredSignatureError:
-        print("DEBUG: Token expired")
+        logger.debug("Token expired")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
     except Exception as e:
-        print(f"DEBUG: Invalid token error: {e}")
+        logger.debug("Invalid token error: %s", e)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 async def ensure_admin():
@@ -153,4 +163,6 @@ async def ensure_admin():
             "daily_reset_at": now,
         }
         await users.insert_one(super_doc)
+        from backend.services.email_service import alert_dispatcher
+        alert_dispatcher.invalidate_recipients()
     return True
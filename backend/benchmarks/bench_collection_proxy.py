@@ -0,0 +1,71 @@
+"""
+Micro-benchmark for CollectionProxy attribute access.
+
+Compares the previous behaviour (resolve through DatabaseManager.get_db() on
+every access) with the per-loop cached proxy. No MongoDB server is needed:
+Motor clients connect lazily and attribute access never touches the network.
+
+Usage:
+    python -m backend.benchmarks.bench_collection_proxy [iterations]
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Motor does not connect until the first operation, so any syntactically valid
+# URI works here. Must be set before backend.config is imported.
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/?connect=false")
+
+from backend.db import CollectionProxy, DatabaseManager
+
+
+class LegacyCollectionProxy:
+    """The pre-cache implementation, kept here only for comparison."""
+
+    def __init__(self, collection_name):
+        self._name = collection_name
+
+    def _get_col(self):
+        db = DatabaseManager.get_db()
+        if db is None:
+            raise RuntimeError(f"MongoDB not initialized. Tried to access {self._name}")
+        return db[self._name]
+
+    def __getattr__(self, name):
+        return getattr(self._get_col(), name)
+
+
+def _time_access(proxy, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        proxy.find_one
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+async def _run(iterations: int):
+    legacy = LegacyCollectionProxy("users")
+    cached = CollectionProxy("users")
+    # Warm up both paths so client creation is not part of the measurement
+    _time_access(legacy, 1000)
+    _time_access(cached, 1000)
+
+    results = {}
+    for label, proxy in (("legacy", legacy), ("cached", cached)):
+        samples = sorted(_time_access(proxy, iterations) for _ in range(5))
+        results[label] = samples[len(samples) // 2]
+    return results
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    results = asyncio.run(_run(iterations))
+    print(f"CollectionProxy attribute access ({iterations} iterations, median of 5)")
+    for label, ns in results.items():
+        print(f"  {label:<7} {ns:8.1f} ns/access")
+    if results["cached"]:
+        print(f"  speedup {results['legacy'] / results['cached']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compares the streaming DOCX extractor (resume_parser.extract_docx_text) with python-docx.
+
+The fixture corpus is generated from the resume texts in corpus.json, each in two
+layouts: plain paragraphs, and a template layout with the contact lines in the page
+header, a text box and the skills section as a two-column table. A "long x10" document
+stands in for the largest uploads. For each document the median time and peak traced
+memory of both extractors are reported, along with the characters each recovered and
+whether the skills table made it into the text. python-docx is run the way the upload
+path used it: Document(path) and the text of doc.paragraphs.
+
+Usage:
+    python -m backend.benchmarks.bench_docx_extract
+    python -m backend.benchmarks.bench_docx_extract --repeat 3 --min-time 0.02
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Dict, List, Tuple
+
+from backend.benchmarks.bench_hotpaths import _fmt_time, measure, measure_allocations
+from backend.benchmarks.fixtures import build_docx, build_rich_docx, load_corpus
+
+
+def build_corpus(tmp_dir: str) -> List[Tuple[str, str, str]]:
+    """(name, path, a line of the skills table or "") for every fixture document."""
+    from backend.services.resume_parser import split_resume_sections
+
+    resumes = dict(load_corpus()["resumes"])
+    resumes["long x10"] = "\n".join([resumes["long"]] * 10)
+    docs = []
+    for size, text in resumes.items():
+        sections = split_resume_sections(text)
+        header = [line for line in sections.get("header", "").splitlines() if line.strip()][:3]
+        skills = [line for line in sections.get("skills", "").splitlines() if line.strip()]
+        rows = [[cell.strip() for cell in line.strip("-• ").split(":", 1)] for line in skills] or [["Skills", "Python"]]
+        # The skills only live in the table, as in the templates this layout imitates
+        moved = set(header) | set(skills)
+        body = [line for line in text.splitlines() if line not in moved]
+        layouts = {
+            "plain": (build_docx(text.splitlines()), ""),
+            "template": (
+                build_rich_docx(body, header=header, tables=[rows], text_boxes=[["Languages", "English, Malay"]]),
+                " | ".join(cell for cell in rows[0] if cell),
+            ),
+        }
+        for layout, (data, table_line) in layouts.items():
+            path = os.path.join(tmp_dir, f"{size.replace(' ', '_')}_{layout}.docx")
+            with open(path, "wb") as f:
+                f.write(data)
+            docs.append((f"{size}.{layout}", path, table_line))
+    return docs
+
+
+def python_docx_text(path: str) -> str:
+    from docx import Document
+    return "\n".join(p.text for p in Document(path).paragraphs)
+
+
+def run(argv=None) -> int:
+    from backend.services.resume_parser import extract_docx_text
+
+    parser = argparse.ArgumentParser(description="Compare the streaming DOCX extractor with python-docx.")
+    parser.add_argument("--repeat", type=int, default=5, help="timing samples per extractor and document")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per sample")
+    args = parser.parse_args(argv)
+
+    extractors = {"python-docx": python_docx_text, "streaming": extract_docx_text}
+    speedups: List[float] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'document':<22} {'extractor':<12} {'median':>11} {'peak KiB':>9} {'chars':>7}  table")
+        for name, path, table_line in build_corpus(tmp_dir):
+            medians: Dict[str, float] = {}
+            for label, fn in extractors.items():
+                stats = measure(lambda: fn(path), args.repeat, args.min_time)
+                stats.update(measure_allocations(lambda: fn(path)))
+                text = fn(path)
+                medians[label] = stats["median_us"]
+                found = "-" if not table_line else ("yes" if table_line in text else "MISSING")
+                print(f"{name:<22} {label:<12} {_fmt_time(stats['median_us']):>11} {stats['peak_kib']:>9.1f} {len(text):>7}  {found}")
+            speedups.append(medians["python-docx"] / medians["streaming"])
+    print(f"\nstreaming is {min(speedups):.1f}x to {max(speedups):.1f}x faster than python-docx")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
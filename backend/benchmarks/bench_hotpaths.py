@@ -0,0 +1,215 @@
+"""
+Micro-benchmarks for the CPU-bound hot paths.
+
+Each benchmark is timed with timeit (GC disabled, loop count auto-ranged to at least
+--min-time per sample) over --repeat samples. The median time per op, the
+interquartile range and ops/sec are reported, along with the peak traced memory of
+one call (tracemalloc). Results can be saved as a baseline and later runs compared
+against it. A change is flagged only when it exceeds both --threshold and the
+combined IQR noise of the two runs.
+
+Usage:
+    python -m backend.benchmarks.bench_hotpaths
+    python -m backend.benchmarks.bench_hotpaths -k gibberish -k veto
+    python -m backend.benchmarks.bench_hotpaths --save-baseline
+    python -m backend.benchmarks.bench_hotpaths --baseline backend/benchmarks/results/hotpaths_baseline.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.benchmarks.fixtures import load_corpus, build_docx, build_pdf
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "hotpaths_baseline.json")
+
+Benchmark = Tuple[str, Callable[[], object], int]  # (name, zero-arg callable, max repeats or 0 for --repeat)
+
+
+def build_benchmarks(tmp_dir: str, bcrypt_rounds: int) -> List[Benchmark]:
+    import bcrypt
+    import hashlib
+    from backend.auth import verify_password
+    from backend.services.ai_feedback import build_resume_prompt, parse_json_response, resume_queries
+    from backend.services.interview_engine import veto_premature_ending
+    from backend.services.rag_engine import rag_engine
+    from backend.services.resume_parser import extract_resume_text, split_resume_sections
+    from backend.services.text_quality import classify_answer, answer_features, classify_resume, resume_features
+    from backend.services.token_budget import estimate_tokens, fit_resume_prompt
+    from backend.services.utils import is_gibberish
+
+    corpus = load_corpus()
+    answers = corpus["answers"]
+    job_titles = corpus["job_titles"]
+    resumes = corpus["resumes"]
+    llm = corpus["llm_responses"]
+    outputs = corpus["interview_outputs"]
+    queries = corpus["rag_queries"]
+
+    rag_engine.initialize()
+    chunks = rag_engine.retrieve_many(resume_queries(resumes["long"]), top_k=5, max_chars=3000)
+    context = "\n---\n".join(chunks)
+
+    benches: List[Benchmark] = [
+        (f"gibberish.answers[{len(answers)}]", lambda: [is_gibberish(a) for a in answers], 0),
+        (f"gibberish.job_titles[{len(job_titles)}]", lambda: [is_gibberish(t) for t in job_titles], 0),
+        # Runs on every interview reply before the LLM is called
+        (f"answer_quality.answers[{len(answers)}]", lambda: [classify_answer(answer_features(a)) for a in answers], 0),
+        ("rag.retrieve.resume_prefix", lambda: rag_engine.retrieve(resumes["medium"][:1000], top_k=5), 0),
+        (f"rag.retrieve.queries[{len(queries)}]", lambda: [rag_engine.retrieve(q, top_k=5) for q in queries], 0),
+        ("resume.split_sections.long", lambda: split_resume_sections(resumes["long"]), 0),
+        # Local gate run on every upload before the LLM analysis
+        ("resume_gate.long", lambda: classify_resume(resume_features(resumes["long"])), 0),
+        # What get_feedback pays: section split + one fused multi-query retrieval
+        ("rag.retrieve_many.sections.long", lambda: rag_engine.retrieve_many(resume_queries(resumes["long"]), top_k=5, max_chars=3000), 0),
+        ("parse_json.plain", lambda: parse_json_response(llm["plain_json"]), 0),
+        ("parse_json.fenced", lambda: parse_json_response(llm["fenced_json"]), 0),
+        ("parse_json.malformed", lambda: parse_json_response(llm["malformed"]), 0),
+        ("prompt.build.long_with_context", lambda: build_resume_prompt(resumes["long"], context), 0),
+        ("tokens.estimate.long", lambda: estimate_tokens(resumes["long"]), 0),
+        # Budgeted prompt as get_feedback builds it (normalize, dedupe, trim, build)
+        ("prompt.fit.long_with_context", lambda: fit_resume_prompt(build_resume_prompt, resumes["long"], chunks, 6000), 0),
+        ("veto.question", lambda: veto_premature_ending(outputs["question"]), 0),
+        ("veto.premature_long", lambda: veto_premature_ending(outputs["premature_long"]), 0),
+        ("veto.force_end", lambda: veto_premature_ending(outputs["force_end"], force_end=True), 0),
+    ]
+
+    # verify_password tries its strategies in order, so each stored-hash format costs a
+    # different number of bcrypt rounds. bcrypt is slow by design: few samples suffice.
+    password = "CorrectHorse#2024"
+    pw = password.encode("utf-8")
+    salt = bcrypt.gensalt(rounds=bcrypt_rounds)
+    hashes = {
+        "direct": bcrypt.hashpw(pw, salt).decode(),
+        "sha256_hex": bcrypt.hashpw(hashlib.sha256(pw).hexdigest().encode(), salt).decode(),
+        "sha256_bin": bcrypt.hashpw(hashlib.sha256(pw).digest(), salt).decode(),
+    }
+    for strategy, hashed in hashes.items():
+        benches.append((f"verify_password.{strategy}", lambda h=hashed: verify_password(password, h), 3))
+    benches.append(("verify_password.wrong_password", lambda: verify_password("wrong", hashes["sha256_hex"]), 3))
+    benches.append(("verify_password.plaintext_legacy", lambda: verify_password(password, password), 0))
+
+    for size in ("medium", "long"):
+        lines = resumes[size].split("\n")
+        for ext, data in (("pdf", build_pdf(lines)), ("docx", build_docx(lines))):
+            path = os.path.join(tmp_dir, f"resume_{size}.{ext}")
+            with open(path, "wb") as f:
+                f.write(data)
+            benches.append((f"extract.{ext}.{size}", lambda p=path: extract_resume_text(p), 0))
+    return benches
+
+
+def measure(fn: Callable[[], object], repeat: int, min_time: float) -> Dict[str, float]:
+    fn()  # warm-up (imports, caches, lazy initialisation)
+    timer = timeit.Timer(fn)
+    loops = 1
+    while True:
+        elapsed = timer.timeit(loops)
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+    samples = [t / loops for t in timer.repeat(repeat=repeat, number=loops)]
+    median = statistics.median(samples)
+    q = statistics.quantiles(samples, n=4) if len(samples) >= 2 else [median, median, median]
+    return {
+        "median_us": median * 1e6,
+        "iqr_us": (q[2] - q[0]) * 1e6,
+        "min_us": min(samples) * 1e6,
+        "ops_per_sec": 1.0 / median if median else 0.0,
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def measure_allocations(fn: Callable[[], object], calls: int = 5) -> Dict[str, float]:
+    """Peak traced memory (above the starting level) of a single call, averaged over `calls`."""
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib": statistics.mean(peaks) / 1024}
+
+
+def compare(name: str, current: Dict[str, float], baseline: Optional[Dict[str, float]], threshold_pct: float) -> str:
+    if not baseline or not baseline.get("median_us"):
+        return ""
+    change = (current["median_us"] / baseline["median_us"] - 1) * 100
+    noise = (current["iqr_us"] / current["median_us"] + baseline["iqr_us"] / baseline["median_us"]) * 100
+    if abs(change) <= max(threshold_pct, noise):
+        return f"{change:+7.1f}%  ~"
+    return f"{change:+7.1f}%  {'SLOWER' if change > 0 else 'faster'}"
+
+
+def _fmt_time(us: float) -> str:
+    if us >= 1e6:
+        return f"{us / 1e6:8.2f} s "
+    if us >= 1e3:
+        return f"{us / 1e3:8.2f} ms"
+    return f"{us:8.2f} us"
+
+
+def run(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for CPU hot paths.")
+    parser.add_argument("-k", dest="filters", action="append", default=[], help="only run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=7, help="timing samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum seconds per sample")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12, help="cost factor for the verify_password hashes")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file to compare against (if it exists)")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run to the baseline file")
+    parser.add_argument("--threshold", type=float, default=10.0, help="minimum change in percent to flag")
+    parser.add_argument("--json", dest="json_out", default="", help="also write this run's results to a file")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f).get("benchmarks", {})
+
+    results = {}
+    slower = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        benches = build_benchmarks(tmp_dir, args.bcrypt_rounds)
+        print(f"{'benchmark':<36} {'median':>11} {'iqr':>11} {'ops/sec':>12} {'peak KiB':>9}  {'vs baseline' if baseline else ''}")
+        for name, fn, max_repeat in benches:
+            if args.filters and not any(f in name for f in args.filters):
+                continue
+            repeat = min(args.repeat, max_repeat) if max_repeat else args.repeat
+            stats = measure(fn, repeat, args.min_time)
+            stats.update(measure_allocations(fn, calls=1 if max_repeat else 5))
+            results[name] = {k: round(v, 3) if isinstance(v, float) else v for k, v in stats.items()}
+            verdict = compare(name, stats, baseline.get(name), args.threshold)
+            if verdict.endswith("SLOWER"):
+                slower.append(name)
+            print(f"{name:<36} {_fmt_time(stats['median_us']):>11} {_fmt_time(stats['iqr_us']):>11} "
+                  f"{stats['ops_per_sec']:>12,.1f} {stats['peak_kib']:>9.1f}  {verdict}")
+
+    payload = {"python": sys.version.split()[0], "benchmarks": results}
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+    if slower:
+        print(f"{len(slower)} benchmark(s) slower than baseline: {', '.join(slower)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
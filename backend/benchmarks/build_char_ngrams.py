@@ -0,0 +1,114 @@
+"""
+Builds backend/data/char_trigrams.bin, the character trigram table used by the local
+answer-quality scorer (services/text_quality.py).
+
+The table holds -log2 P(c | a, b) for every trigram over a 27-symbol alphabet (a-z and
+one boundary symbol for everything else), quantized to one byte each. Probabilities are
+interpolated from trigram, bigram and unigram counts so unseen but plausible sequences
+keep a reasonable cost. The training text is English prose about resumes, jobs and
+software: the RAG guideline documents, the benchmark corpus answers and resumes, and the
+docstrings of a fixed list of standard library modules.
+
+Usage:
+    python -m backend.benchmarks.build_char_ngrams
+    python -m backend.benchmarks.build_char_ngrams --output /tmp/char_trigrams.bin
+"""
+import argparse
+import importlib
+import inspect
+import math
+import os
+import sys
+from typing import Iterable, List
+
+from backend.benchmarks.fixtures import load_corpus
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(BACKEND_DIR, "data", "char_trigrams.bin")
+RAG_DOCS_DIR = os.path.join(BACKEND_DIR, "data", "rag_docs")
+
+DOCSTRING_MODULES = (
+    "argparse", "asyncio", "collections", "concurrent.futures", "contextlib", "csv", "datetime",
+    "decimal", "difflib", "email", "functools", "http.client", "http.server", "json", "logging",
+    "multiprocessing", "pathlib", "queue", "sqlite3", "statistics", "string", "subprocess",
+    "tarfile", "textwrap", "threading", "unittest", "urllib.request", "zipfile",
+)
+
+# Interpolation weights for trigram, bigram, unigram and uniform estimates
+WEIGHTS = (0.6, 0.28, 0.1, 0.02)
+
+
+def _docstrings(module_name: str) -> Iterable[str]:
+    module = importlib.import_module(module_name)
+    yield inspect.getdoc(module) or ""
+    for _, obj in inspect.getmembers(module):
+        if getattr(obj, "__module__", None) == module.__name__:
+            yield inspect.getdoc(obj) or ""
+
+
+def training_texts() -> List[str]:
+    from backend.services.text_quality import is_gibberish
+
+    texts = []
+    for name in sorted(os.listdir(RAG_DOCS_DIR)):
+        with open(os.path.join(RAG_DOCS_DIR, name), encoding="utf-8") as f:
+            texts.append(f.read())
+    corpus = load_corpus()
+    # Only the real answers: the corpus also holds junk ones the scorer has to reject
+    texts.extend(a for a in corpus["answers"] if len(a.split()) >= 4 and not is_gibberish(a))
+    texts.extend(corpus["resumes"].values())
+    for module_name in DOCSTRING_MODULES:
+        texts.extend(_docstrings(module_name))
+    return texts
+
+
+def build_table(texts: Iterable[str]) -> bytes:
+    from backend.services.text_quality import NGRAM_ALPHABET, NGRAM_SCALE, ngram_codes
+
+    n = NGRAM_ALPHABET
+    uni = [0] * n
+    bi = [0] * (n * n)
+    tri = [0] * (n * n * n)
+    for text in texts:
+        codes = ngram_codes(text)
+        for i, c in enumerate(codes):
+            uni[c] += 1
+            if i >= 1:
+                bi[codes[i - 1] * n + c] += 1
+            if i >= 2:
+                tri[(codes[i - 2] * n + codes[i - 1]) * n + c] += 1
+    total = sum(uni)
+    # Context counts: how often each (a, b) / (b) is followed by anything
+    ctx2 = [sum(tri[k * n:(k + 1) * n]) for k in range(n * n)]
+    ctx1 = [sum(bi[k * n:(k + 1) * n]) for k in range(n)]
+
+    w3, w2, w1, w0 = WEIGHTS
+    out = bytearray(n * n * n)
+    for a in range(n):
+        for b in range(n):
+            ab = a * n + b
+            for c in range(n):
+                p = w0 / n + w1 * uni[c] / total
+                if ctx1[b]:
+                    p += w2 * bi[b * n + c] / ctx1[b]
+                if ctx2[ab]:
+                    p += w3 * tri[ab * n + c] / ctx2[ab]
+                out[ab * n + c] = min(255, round(-math.log2(p) * NGRAM_SCALE))
+    return bytes(out)
+
+
+def run(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build the character trigram table for the answer-quality scorer.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the table")
+    args = parser.parse_args(argv)
+
+    texts = training_texts()
+    table = build_table(texts)
+    with open(args.output, "wb") as f:
+        f.write(table)
+    print(f"{len(table)} bytes written to {args.output} from {sum(len(t) for t in texts):,} characters of text")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,88 @@
+"""
+Import-time budget check for the cold-start path.
+
+Imports backend.main in fresh interpreters with `python -X importtime`, reports the
+cumulative import cost (best of --runs) and the most expensive top-level modules,
+and fails when:
+  - the total exceeds the budget (--budget-ms or IMPORT_BUDGET_MS), or
+  - any dependency that should load lazily (warmup.LAZY_MODULES) was imported.
+
+Usage:
+    python -m backend.benchmarks.check_importtime
+    python -m backend.benchmarks.check_importtime --budget-ms 600 --top 20
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TARGET = "backend.main"
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1200"))
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def run_importtime(target: str = TARGET) -> List[Tuple[str, int, int, int]]:
+    """Returns (module, self_us, cumulative_us, depth) rows for one fresh import of `target`."""
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def eager_lazy_modules(rows, lazy_modules) -> List[str]:
+    imported = {name for name, _, _, _ in rows}
+    return [name for name in lazy_modules if name in imported]
+
+
+def main(argv=None) -> int:
+    from backend.services.warmup import LAZY_MODULES
+
+    parser = argparse.ArgumentParser(description="Check the import-time budget of backend.main.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters; the fastest run is reported")
+    parser.add_argument("--top", type=int, default=15, help="number of top-level modules to list")
+    args = parser.parse_args(argv)
+
+    best = None
+    for _ in range(args.runs):
+        rows = run_importtime()
+        total = next(cum for name, _, cum, depth in rows if name == TARGET and depth == 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total_us, rows = best
+
+    # Direct imports of backend.main and of the backend packages, ranked by cumulative cost
+    costs: Dict[str, int] = {}
+    for name, _, cum, depth in rows:
+        if depth <= 1 or (name.startswith("backend.") and depth <= 3):
+            costs[name] = max(costs.get(name, 0), cum)
+    print(f"import {TARGET}: {total_us / 1000:.1f} ms (best of {args.runs}), budget {args.budget_ms:.0f} ms")
+    for name, cum in sorted(costs.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {cum / 1000:8.1f} ms  {name}")
+
+    failed = False
+    eager = eager_lazy_modules(rows, LAZY_MODULES)
+    if eager:
+        print(f"FAIL: lazy dependencies imported at startup: {', '.join(eager)}")
+        failed = True
+    if total_us / 1000 > args.budget_ms:
+        print(f"FAIL: import time {total_us / 1000:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
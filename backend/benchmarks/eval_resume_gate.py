@@ -0,0 +1,79 @@
+"""
+Evaluates the local resume gate against labelled documents.
+
+Prints the gate's decision and features for each sample, then a confusion table of
+label vs decision. Rejecting a real resume is the costly mistake, so the run fails when
+any sample labelled "resume" is rejected. Samples can also come from a JSON Lines file
+of {"label": ..., "text": ...} objects, e.g. texts collected while tuning thresholds
+from the gate's log lines.
+
+Usage:
+    python -m backend.benchmarks.eval_resume_gate
+    python -m backend.benchmarks.eval_resume_gate --file labelled.jsonl -v
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+from backend.benchmarks.fixtures import FIXTURES_DIR
+
+DEFAULT_FIXTURES = os.path.join(FIXTURES_DIR, "resume_gate.json")
+
+
+def load_samples(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)["samples"]
+
+
+def evaluate(samples: List[Dict]) -> Dict:
+    from backend.services.text_quality import classify_resume, resume_features
+
+    rows = []
+    confusion: Dict[str, Dict[str, int]] = {}
+    slowest_us = 0.0
+    for i, sample in enumerate(samples):
+        start = time.perf_counter()
+        features = resume_features(sample["text"])
+        result = classify_resume(features)
+        slowest_us = max(slowest_us, (time.perf_counter() - start) * 1e6)
+        row = {"id": sample.get("id", str(i)), "label": sample["label"], **result, "features": features}
+        rows.append(row)
+        by_decision = confusion.setdefault(sample["label"], {})
+        by_decision[result["decision"]] = by_decision.get(result["decision"], 0) + 1
+    return {"rows": rows, "confusion": confusion, "slowest_us": slowest_us}
+
+
+def run(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate the local resume gate against labelled documents.")
+    parser.add_argument("--file", default=DEFAULT_FIXTURES, help="labelled samples (.json fixture or .jsonl)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the features of every sample")
+    args = parser.parse_args(argv)
+
+    report = evaluate(load_samples(args.file))
+    for row in report["rows"]:
+        line = f"{row['id']:<24} {row['label']:<11} {row['decision']:<11} {row['reason']}"
+        if args.verbose:
+            line += "  " + json.dumps(row["features"])
+        print(line)
+
+    decisions = ("pass", "borderline", "reject")
+    print()
+    print(f"{'label':<11} " + " ".join(f"{d:>10}" for d in decisions))
+    for label, counts in sorted(report["confusion"].items()):
+        print(f"{label:<11} " + " ".join(f"{counts.get(d, 0):>10}" for d in decisions))
+    print(f"slowest sample: {report['slowest_us']:.0f} us")
+
+    false_rejects = [row["id"] for row in report["rows"] if row["label"] == "resume" and row["decision"] == "reject"]
+    if false_rejects:
+        print(f"{len(false_rejects)} resume(s) rejected: {', '.join(false_rejects)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,122 @@
+"""
+Fixture corpora for the benchmarks.
+
+corpus.json holds representative inputs (interview answers, job titles, resume texts,
+raw LLM responses). PDF and DOCX files are generated from the resume texts on demand
+so no binary fixtures need to be checked in.
+"""
+import io
+import json
+import os
+from typing import Dict, List
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_corpus = None
+
+
+def load_corpus() -> Dict:
+    global _corpus
+    if _corpus is None:
+        with open(os.path.join(FIXTURES_DIR, "corpus.json"), encoding="utf-8") as f:
+            _corpus = json.load(f)
+    return _corpus
+
+
+def build_docx(lines: List[str]) -> bytes:
+    from docx import Document
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+# A text box as Word writes it: DrawingML for current readers, a VML copy as the fallback
+_TEXT_BOX_XML = (
+    '<mc:AlternateContent xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" '
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape" '
+    'xmlns:v="urn:schemas-microsoft-com:vml">'
+    '<mc:Choice Requires="wps"><w:drawing><wp:inline><wp:extent cx="2000000" cy="900000"/><wp:docPr id="{id}" name="Text Box {id}"/>'
+    '<a:graphic><a:graphicData uri="http://schemas.microsoft.com/office/word/2010/wordprocessingShape">'
+    '<wps:wsp><wps:txbx><w:txbxContent>{paragraphs}</w:txbxContent></wps:txbx></wps:wsp>'
+    '</a:graphicData></a:graphic></wp:inline></w:drawing></mc:Choice>'
+    '<mc:Fallback><w:pict><v:shape><v:textbox><w:txbxContent>{paragraphs}</w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback>'
+    '</mc:AlternateContent>'
+)
+
+
+def build_rich_docx(lines: List[str], header: List[str] = (), tables: List[List[List[str]]] = (), text_boxes: List[List[str]] = ()) -> bytes:
+    """
+    A resume laid out the way many templates are: contact details in the page header,
+    text boxes anchored in the first paragraphs and tables (e.g. skills) after the body.
+    """
+    from xml.sax.saxutils import escape
+    from docx import Document
+    from docx.oxml import parse_xml
+    doc = Document()
+    for i, line in enumerate(header):
+        paragraph = doc.sections[0].header.paragraphs[0] if i == 0 else doc.sections[0].header.add_paragraph()
+        paragraph.text = line
+    paragraphs = [doc.add_paragraph(line) for line in lines]
+    for i, box in enumerate(text_boxes):
+        inner = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>" for line in box)
+        run = paragraphs[min(i, len(paragraphs) - 1)].add_run()
+        run._r.append(parse_xml(_TEXT_BOX_XML.format(id=i + 1, paragraphs=inner)))
+    for rows in tables:
+        table = doc.add_table(rows=len(rows), cols=max(len(r) for r in rows))
+        for r, row in enumerate(rows):
+            for c, cell in enumerate(row):
+                table.cell(r, c).text = cell
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(lines: List[str], lines_per_page: int = 50) -> bytes:
+    """Builds a minimal text PDF (Helvetica, one text object per page) with a valid xref table."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    font_id = 3
+    first_page_id = 4
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        font_id: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+    kids = []
+    for n, page_lines in enumerate(pages):
+        page_id = first_page_id + 2 * n
+        content_id = page_id + 1
+        kids.append(f"{page_id} 0 R")
+        ops = ["BT", "/F1 10 Tf", "13 TL", "50 760 Td"]
+        for line in page_lines:
+            ops.append(f"({_pdf_escape(line)}) Tj T*")
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1", "replace")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii")
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode("ascii")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = out.tell()
+        out.write(b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n")
+    xref_at = out.tell()
+    size = max(objects) + 1
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+    for obj_id in range(1, size):
+        out.write(b"%010d 00000 n \n" % offsets[obj_id])
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_at))
+    return out.getvalue()
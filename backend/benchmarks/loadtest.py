@@ -0,0 +1,367 @@
+"""
+End-to-end load test for the FastAPI app.
+
+Runs the real application in-process (lifespan included) against an in-memory
+MongoDB stand-in (mongomock-motor) or a real mongod, with the Mistral SDK pointed
+at a local fake server that answers after a configurable delay. Each virtual user
+runs the scripted flow
+
+    register -> login -> upload -> analysis job -> start -> N x reply -> end
+
+and the harness reports p50/p95/p99 latency and throughput per endpoint.
+Results are written to backend/benchmarks/results/<commit>.json so runs can be
+compared across commits with --compare.
+
+Usage:
+    python -m backend.benchmarks.loadtest --users 50 --concurrency 10 --replies 3
+    python -m backend.benchmarks.loadtest --llm-latency-ms 800 --compare backend/benchmarks/results/abc1234.json
+    python -m backend.benchmarks.loadtest --mongo-uri mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from backend.benchmarks.fixtures import build_docx
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SAMPLE_RESUME = [
+    "Jane Doe",
+    "Kuala Lumpur, Malaysia | jane.doe@example.com",
+    "Summary",
+    "Backend engineer with five years of experience building Python services and REST APIs.",
+    "Experience",
+    "Software Engineer, Example Sdn Bhd (2021 - present): built FastAPI services on MongoDB, cut p95 latency by 40%.",
+    "Junior Developer, Sample Corp (2019 - 2021): maintained Django applications and CI pipelines.",
+    "Education",
+    "BSc Computer Science, Universiti Malaya",
+    "Skills",
+    "Python, FastAPI, MongoDB, Docker, AWS, PostgreSQL, Redis, Git",
+]
+
+FAKE_FEEDBACK = {
+    "IsResume": True,
+    "Score": 78,
+    "Advantages": ["Quantified achievements", "Relevant stack"],
+    "Disadvantages": ["Short summary"],
+    "Suggestions": ["Add project links"],
+    "Keywords": ["Python", "FastAPI", "MongoDB", "Docker", "AWS"],
+    "Location": "Kuala Lumpur",
+    "DetectedJobTitle": "Backend Engineer",
+}
+
+
+# --- Fake Mistral server -----------------------------------------------------
+
+class FakeMistralHandler(BaseHTTPRequestHandler):
+    """Answers /v1/chat/completions like the Mistral API, after `server.latency` seconds."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        time.sleep(max(0.0, random.gauss(server.latency, server.jitter)))
+
+        messages = request.get("messages") or []
+        system = messages[0].get("content", "") if messages and messages[0].get("role") == "system" else ""
+        if request.get("response_format"):
+            content = json.dumps(FAKE_FEEDBACK)
+        elif "manually ended" in system:
+            content = "Thanks for your time. Since the interview was not completed, no Readiness Score can be generated. [FINISH]"
+        elif "questions are done" in system:
+            content = (
+                "Thank you for completing the interview!\n\n"
+                "You showed solid fundamentals and clear communication.\n"
+                "Interview Readiness Score: 72/100\n[FINISH]"
+            )
+        else:
+            content = "Got it. Can you walk me through how you would design a rate limiter for a public API?"
+
+        body = json.dumps({
+            "id": uuid.uuid4().hex,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mistral-small-latest"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1200, "completion_tokens": len(content) // 4, "total_tokens": 1200 + len(content) // 4},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_fake_mistral(latency_ms: float, jitter_ms: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMistralHandler)
+    server.daemon_threads = True
+    server.latency = latency_ms / 1000
+    server.jitter = jitter_ms / 1000
+    threading.Thread(target=server.serve_forever, name="fake-mistral", daemon=True).start()
+    return server
+
+
+# --- Measurements ------------------------------------------------------------
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, endpoint: str, elapsed: float, ok: bool):
+        self.samples.setdefault(endpoint, []).append(elapsed)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(recorder: Recorder, wall_seconds: float) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for endpoint, values in recorder.samples.items():
+        values = sorted(values)
+        summary[endpoint] = {
+            "count": len(values),
+            "errors": recorder.errors.get(endpoint, 0),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+            "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+        }
+    return summary
+
+
+# --- Virtual users -----------------------------------------------------------
+
+class FlowError(Exception):
+    pass
+
+
+async def _call(client, recorder: Recorder, endpoint: str, method: str, url: str, **kwargs):
+    start = time.perf_counter()
+    response = await client.request(method, url, **kwargs)
+    recorder.add(endpoint, time.perf_counter() - start, response.status_code < 400)
+    if response.status_code >= 400:
+        raise FlowError(f"{endpoint} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+
+async def run_user(app, index: int, run_id: str, replies: int, resume_bytes: bytes, recorder: Recorder):
+    import httpx
+    # One client per virtual user with its own source address, so the per-IP rate limit
+    # behaves as it would for real users
+    transport = httpx.ASGITransport(app=app, client=(f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}", 40000))
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        email = f"loadtest-{run_id}-{index}@example.com"
+        password = "LoadTest#2024"
+        await _call(client, recorder, "POST /api/auth/register", "POST", "/api/auth/register",
+                    json={"email": email, "password": password, "name": f"Load Test {index}"})
+        r = await _call(client, recorder, "POST /api/auth/login", "POST", "/api/auth/login",
+                        data={"username": email, "password": password})
+        client.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+        r = await _call(client, recorder, "POST /api/resume/upload", "POST", "/api/resume/upload",
+                        data={"job_title": "Backend Engineer"},
+                        files={"file": ("resume.docx", resume_bytes, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")})
+        # The analysis runs as a job; long-poll it like the dashboard's fallback does
+        job = r.json()
+        while job["status"] not in ("succeeded", "failed"):
+            r = await _call(client, recorder, "GET /api/resume/jobs/{job_id}", "GET", f"/api/resume/jobs/{job['job_id']}",
+                            params={"wait": 5})
+            job = r.json()
+        if job["status"] == "failed":
+            raise FlowError(f"resume analysis failed: {job['error']}")
+        r = await _call(client, recorder, "POST /api/interview/start", "POST", "/api/interview/start",
+                        data={"difficulty": "Intermediate"})
+        sid = r.json()["session_id"]
+
+        for i in range(replies):
+            r = await _call(client, recorder, "POST /api/interview/{session_id}/reply", "POST", f"/api/interview/{sid}/reply",
+                            data={"user_text": f"I would use a token bucket per client stored in Redis, answer number {i + 1}."})
+            if r.json().get("ended"):
+                break
+        await _call(client, recorder, "POST /api/interview/{session_id}/end", "POST", f"/api/interview/{sid}/end")
+
+
+async def run_load(args) -> Dict:
+    from backend.db import DatabaseManager
+    from backend.main import app
+
+    if args.mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_uri)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+    # Pin the stand-in client for this loop; the collection proxies resolve through it
+    DatabaseManager._client = client
+    DatabaseManager._loop = asyncio.get_running_loop()
+
+    resume_bytes = build_docx(SAMPLE_RESUME)
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    run_id = uuid.uuid4().hex[:8]
+    failures: List[str] = []
+
+    async def one(index: int):
+        async with semaphore:
+            try:
+                await run_user(app, index, run_id, args.replies, resume_bytes, recorder)
+            except FlowError as e:
+                failures.append(str(e))
+
+    async with app.router.lifespan_context(app):
+        # Warm-up flow (imports, RAG index, bcrypt) is not measured
+        await run_user(app, args.users, run_id, 0, resume_bytes, Recorder())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.users)))
+        wall = time.perf_counter() - start
+
+    total = sum(len(v) for v in recorder.samples.values())
+    return {
+        "wall_seconds": round(wall, 3),
+        "total_requests": total,
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "failed_flows": len(failures),
+        "failure_samples": failures[:5],
+        "endpoints": summarize(recorder, wall),
+    }
+
+
+# --- Reporting ---------------------------------------------------------------
+
+def git_commit() -> str:
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"], stderr=subprocess.DEVNULL) != 0
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+
+def print_report(result: Dict, baseline: Optional[Dict] = None):
+    cfg = result["config"]
+    print(f"Load test @ {result['commit']}: {cfg['users']} users, concurrency {cfg['concurrency']}, "
+          f"{cfg['replies']} replies, LLM {cfg['llm_latency_ms']}±{cfg['llm_jitter_ms']} ms, mongo={cfg['mongo']}")
+    print(f"  {result['total_requests']} requests in {result['wall_seconds']}s "
+          f"({result['throughput_rps']} req/s), failed flows: {result['failed_flows']}")
+    header = f"  {'endpoint':<40} {'n':>5} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>8}"
+    if baseline:
+        header += f" {'p95 vs base':>12}"
+    print(header)
+    base_eps = (baseline or {}).get("endpoints", {})
+    for endpoint, s in result["endpoints"].items():
+        line = (f"  {endpoint:<40} {s['count']:>5} {s['errors']:>4} {s['p50_ms']:>9.1f} "
+                f"{s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['throughput_rps']:>8.1f}")
+        base = base_eps.get(endpoint)
+        if base and base.get("p95_ms"):
+            line += f" {(s['p95_ms'] / base['p95_ms'] - 1) * 100:>+11.1f}%"
+        print(line)
+    for failure in result["failure_samples"]:
+        print(f"  ! {failure}")
+
+
+def regressions(result: Dict, baseline: Dict, threshold_pct: float) -> List[str]:
+    found = []
+    for endpoint, s in result["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(endpoint)
+        if base and base.get("p95_ms") and s["p95_ms"] > base["p95_ms"] * (1 + threshold_pct / 100):
+            found.append(f"{endpoint}: p95 {base['p95_ms']} -> {s['p95_ms']} ms")
+    return found
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end load test with mocked MongoDB and Mistral.")
+    parser.add_argument("--users", type=int, default=20, help="virtual users (one full flow each)")
+    parser.add_argument("--concurrency", type=int, default=5, help="flows running at the same time")
+    parser.add_argument("--replies", type=int, default=3, help="interview replies per flow")
+    parser.add_argument("--llm-latency-ms", type=float, default=300, help="mean fake Mistral latency")
+    parser.add_argument("--llm-jitter-ms", type=float, default=50, help="std deviation of the fake latency")
+    parser.add_argument("--mongo-uri", default="", help="use a real mongod instead of mongomock-motor")
+    parser.add_argument("--output", default="", help="result file (default: results/<commit>.json)")
+    parser.add_argument("--no-save", action="store_true", help="print the report without writing a result file")
+    parser.add_argument("--compare", default="", help="baseline result file to compare p95 against")
+    parser.add_argument("--fail-threshold", type=float, default=0,
+                        help="with --compare, exit 1 if any endpoint's p95 regresses by more than this percentage")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = start_fake_mistral(args.llm_latency_ms, args.llm_jitter_ms)
+
+    # Must be set before backend.config is imported. The API key only needs to be
+    # non-empty so the real LLM code path runs; requests go to the fake server.
+    os.environ["MISTRAL_API_KEY"] = "loadtest"
+    os.environ["MISTRAL_SERVER_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("MONGO_URI", args.mongo_uri or "mongodb://loadtest.invalid")
+    os.environ.setdefault("JWT_SECRET", "loadtest-secret")
+    os.environ.setdefault("JWT_ALGORITHM", "HS256")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    try:
+        result = asyncio.run(run_load(args))
+    finally:
+        server.shutdown()
+
+    result = {
+        "commit": git_commit(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "config": {
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "replies": args.replies,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "mongo": "mongod" if args.mongo_uri else "mongomock",
+        },
+        **result,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    if not args.no_save:
+        path = args.output or os.path.join(RESULTS_DIR, f"{result['commit']}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"  results written to {path}")
+
+    if baseline and args.fail_threshold > 0:
+        found = regressions(result, baseline, args.fail_threshold)
+        for r in found:
+            print(f"  REGRESSION {r}")
+        if found:
+            return 1
+    return 1 if result["failed_flows"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -14,8 +14,11 @@ DB_NAME = os.getenv("DB_NAME", "interview_coach")
 JWT_SECRET = os.getenv("JWT_SECRET", "")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY", "")
+MISTRAL_SERVER_URL = os.getenv("MISTRAL_SERVER_URL", "") # Overrides the Mistral API base URL (proxies, load tests)
 SESSION_MAX_QUESTIONS = 100
 DAILY_QUESTION_LIMIT = 60
+DAILY_RESUME_LIMIT = 5
+DAILY_INTERVIEW_LIMIT = 3
 INTERVIEW_DEFAULT_QUESTIONS = int(os.getenv("INTERVIEW_DEFAULT_QUESTIONS", "10"))
 RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", "30"))
 SUPERADMIN_EMAIL = os.getenv("SUPERADMIN_EMAIL", "")
@@ -24,9 +27,83 @@ SAVE_RESUME_BY_DEFAULT = os.getenv("SAVE_RESUME_BY_DEFAULT", "false").lower() ==
 # Removed WEEKLY_RESET_DAY as we moved to daily quotas
 JWT_EXPIRATION_SECONDS = int(os.getenv("JWT_EXPIRATION_SECONDS", "43200")) # Default 12 hours
 
+# Resume feedback RAG context: guideline chunks retrieved per section and fused
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+RAG_CONTEXT_MAX_CHARS = int(os.getenv("RAG_CONTEXT_MAX_CHARS", "3000"))
+
+# Local resume gate: reject clear non-resumes before the LLM analysis (false = log decisions only)
+RESUME_GATE_ENFORCE = os.getenv("RESUME_GATE_ENFORCE", "true").lower() == "true"
+
+# LLM prompt budgets, in estimated tokens (see services/token_budget.py)
+RESUME_PROMPT_MAX_TOKENS = int(os.getenv("RESUME_PROMPT_MAX_TOKENS", "6000"))
+INTERVIEW_HISTORY_MAX_TOKENS = int(os.getenv("INTERVIEW_HISTORY_MAX_TOKENS", "4000"))
+
+# Cold start: warm lazy dependencies in the background as soon as the app starts
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+
+# Metrics: bearer token for the /api/metrics scrape endpoint (disabled when empty)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Tracing
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0")) # Share of requests traced; 0 disables tracing
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "none") # none | file | otlp
+TRACE_FILE = os.getenv("TRACE_FILE", "/tmp/icp_traces.jsonl")
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json") # json | text
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0")) # Share of fast, successful requests logged
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000")) # Requests slower than this are always logged
+
 # Admin Security
 ADMIN_ALLOWLIST = os.getenv("ADMIN_ALLOWLIST", "127.0.0.1,::1").split(",")
 
+# Audit Log Pipeline
+# Serverless platforms (Vercel sets VERCEL=1) never run the lifespan shutdown flush, so
+# batching there could lose queued security events: audit writes default to inline
+SERVERLESS = bool(os.getenv("VERCEL") or os.getenv("AWS_LAMBDA_FUNCTION_NAME"))
+AUDIT_BATCH_ENABLED = os.getenv("AUDIT_BATCH_ENABLED", "false" if SERVERLESS else "true").lower() == "true"
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "1000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "50"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+AUDIT_OVERFLOW_POLICY = os.getenv("AUDIT_OVERFLOW_POLICY", "block") # drop_newest | drop_oldest | block (events the queue cannot take are written inline)
+AUDIT_LOG_TTL_DAYS = int(os.getenv("AUDIT_LOG_TTL_DAYS", "0")) # 0 keeps audit logs forever
+AUDIT_LOG_CAPPED_MB = int(os.getenv("AUDIT_LOG_CAPPED_MB", "0")) # Only applied when the collection is first created
+
+# Usage accounting: per-action events in the usage time series, written in batches
+USAGE_QUEUE_MAX = int(os.getenv("USAGE_QUEUE_MAX", "5000"))
+USAGE_BATCH_SIZE = int(os.getenv("USAGE_BATCH_SIZE", "200"))
+USAGE_FLUSH_INTERVAL_SECONDS = float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "2.0"))
+USAGE_RETENTION_DAYS = int(os.getenv("USAGE_RETENTION_DAYS", "400")) # Only applied when the collection is first created
+USAGE_DAILY_RETENTION_DAYS = int(os.getenv("USAGE_DAILY_RETENTION_DAYS", "35")) # Per-user daily quota counters
+
+# Admin analytics (daily rollups)
+ANALYTICS_ROLLUP_INTERVAL_MINUTES = float(os.getenv("ANALYTICS_ROLLUP_INTERVAL_MINUTES", "0")) # 0: no in-process scheduler
+ANALYTICS_BACKFILL_DAYS = int(os.getenv("ANALYTICS_BACKFILL_DAYS", "365"))
+ANALYTICS_FINALIZE_AFTER_DAYS = int(os.getenv("ANALYTICS_FINALIZE_AFTER_DAYS", "2"))
+CRON_SECRET = os.getenv("CRON_SECRET", "")
+
+# Resume analysis job queue
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2")) # Worker tasks per process
+ANALYSIS_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+ANALYSIS_LEASE_SECONDS = int(os.getenv("ANALYSIS_LEASE_SECONDS", "120")) # A crashed worker's job is picked up again after this
+ANALYSIS_JOB_TTL_SECONDS = int(os.getenv("ANALYSIS_JOB_TTL_SECONDS", "3600")) # Finished jobs are kept this long for polling
+ANALYSIS_WAIT_SECONDS = float(os.getenv("ANALYSIS_WAIT_SECONDS", "25")) # Longest a status poll or ?wait upload is held open
+RESUME_MAX_UPLOAD_MB = float(os.getenv("RESUME_MAX_UPLOAD_MB", "5")) # Larger uploads are rejected with 413 while they stream in
+RESUME_MAX_UPLOAD_BYTES = int(RESUME_MAX_UPLOAD_MB * 1024 * 1024)
+
+# LLM request coalescing (identical concurrent calls share one completion)
+SINGLE_FLIGHT_DISTRIBUTED = os.getenv("SINGLE_FLIGHT_DISTRIBUTED", "true").lower() == "true" # Also across processes via MongoDB leases
+SINGLE_FLIGHT_LEASE_SECONDS = int(os.getenv("SINGLE_FLIGHT_LEASE_SECONDS", "90")) # Longer than the slowest completion
+SINGLE_FLIGHT_RESULT_TTL_SECONDS = int(os.getenv("SINGLE_FLIGHT_RESULT_TTL_SECONDS", "30"))
+
+# Idempotency-Key support on interview turns and resume uploads
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")) # Window in which a repeated key replays the stored response
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120")) # A crashed request frees its key after this
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30")) # How long a concurrent repeat waits before a 409
+
 # Admin Resume Notification EmailJS
 ADMIN_EMAILJS_PUBLIC_KEY = os.getenv("ADMIN_EMAILJS_PUBLIC_KEY", "")
 ADMIN_EMAILJS_SERVICE_ID = os.getenv("ADMIN_EMAILJS_SERVICE_ID", "")
@@ -36,6 +113,9 @@ ADMIN_EMAILJS_TEMPLATE_ID = os.getenv("ADMIN_EMAILJS_TEMPLATE_ID", "")
 ADMIN_ALERT_EMAILJS_PUBLIC_KEY = os.getenv("ADMIN_ALERT_EMAILJS_PUBLIC_KEY", "")
 ADMIN_ALERT_EMAILJS_SERVICE_ID = os.getenv("ADMIN_ALERT_EMAILJS_SERVICE_ID", "")
 ADMIN_ALERT_EMAILJS_TEMPLATE_ID = os.getenv("ADMIN_ALERT_EMAILJS_TEMPLATE_ID", "")
+ADMIN_ALERT_MAX_CONCURRENCY = int(os.getenv("ADMIN_ALERT_MAX_CONCURRENCY", "5"))
+ADMIN_ALERT_MAX_RETRIES = int(os.getenv("ADMIN_ALERT_MAX_RETRIES", "3"))
+ADMIN_ALERT_RECIPIENTS_TTL_SECONDS = int(os.getenv("ADMIN_ALERT_RECIPIENTS_TTL_SECONDS", "300")) # Role changes from outside the app reach alerts within this window
 
 # Server Startup ID for session management
 GLOBAL_STARTUP_ID = "1737273600"
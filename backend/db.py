@@ -1,7 +1,16 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorGridFSBucket
-from backend.config import MONGO_URI, DB_NAME
+from pymongo.errors import OperationFailure
+from backend.config import MONGO_URI, DB_NAME, AUDIT_LOG_TTL_DAYS, AUDIT_LOG_CAPPED_MB, USAGE_RETENTION_DAYS
+from backend.services.structured_log import add_timing
+from backend.services.metrics import mongo_operations, mongo_errors, mongo_operation_duration, cache_requests
+from backend.services.tracing import add_span
 import certifi
 import asyncio
+import logging
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
 
 class DatabaseManager:
     _client = None
@@ -19,7 +28,7 @@ class DatabaseManager:
         # Re-initialize if client is missing or loop has changed (critical for serverless)
         if cls._client is None or (current_loop is not None and cls._loop != current_loop):
             if not MONGO_URI or "your_mongodb_uri_here" in MONGO_URI:
-                print("CRITICAL: MONGO_URI is not set or using placeholder!")
+                logger.critical("MONGO_URI is not set or using placeholder!")
                 return None
             
             try:
@@ -36,9 +45,9 @@ class DatabaseManager:
                     retryReads=True
                 )
                 cls._loop = current_loop
-                print(f"INFO: MongoDB client re-initialized (loop: {id(current_loop)})")
+                logger.info("MongoDB client re-initialized (loop: %s)", id(current_loop))
             except Exception as e:
-                print(f"ERROR: Failed to initialize MongoDB client: {e}")
+                logger.error("Failed to initialize MongoDB client: %s", e)
                 cls._client = None
                 cls._loop = None
                 return None
@@ -51,29 +60,183 @@ class DatabaseManager:
             return client[DB_NAME]
         return None
 
-# Proxy objects that delegate to the actual collection on every access
-# This ensures we always use the current loop's client
+# Proxy objects that delegate to the actual collection of the current loop's client.
+# The resolved collection is cached per event loop in a weak map, so repeated
+# accesses inside one handler skip DatabaseManager entirely, and a fresh loop
+# (serverless re-execution) transparently resolves a new collection.
 class CollectionProxy:
     def __init__(self, collection_name):
         self._name = collection_name
+        self._cols = weakref.WeakKeyDictionary()
+        self._instruments = {}
+        self._cache_hits = cache_requests.labels("collection_proxy", "hit")
+        self._cache_misses = cache_requests.labels("collection_proxy", "miss")
 
     def _get_col(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            col = self._cols.get(loop)
+            if col is not None:
+                self._cache_hits.inc()
+                return col
+
+        self._cache_misses.inc()
         db = DatabaseManager.get_db()
         if db is None:
             raise RuntimeError(f"MongoDB not initialized. Tried to access {self._name}")
-        return db[self._name]
+        col = db[self._name]
+        if loop is not None:
+            self._cols[loop] = col
+        return col
+
+    def invalidate(self):
+        """Drops every cached collection so the next access re-resolves it."""
+        self._cols.clear()
+
+    def _instrument(self, op):
+        """Pre-resolved metric children for one operation on this collection."""
+        inst = self._instruments.get(op)
+        if inst is None:
+            inst = self._instruments[op] = OpInstruments(
+                self._name,
+                op,
+                mongo_operations.labels(self._name, op),
+                mongo_errors.labels(self._name, op),
+                mongo_operation_duration.labels(self._name, op),
+            )
+        return inst
+
+    def __getattr__(self, name):
+        attr = getattr(self._get_col(), name)
+        if name in _TIMED_OPS:
+            return _timed_op(attr, self._instrument(name))
+        if name in _CURSOR_OPS:
+            return _timed_cursor_factory(attr, self._instrument(name))
+        return attr
+
+# Awaitable collection methods whose latency counts towards the request's DB time
+_TIMED_OPS = frozenset({
+    "find_one", "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+    "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+    "delete_one", "delete_many", "count_documents", "estimated_document_count",
+    "distinct", "bulk_write", "create_index",
+})
+# Methods returning a cursor; time is recorded while batches are fetched
+_CURSOR_OPS = frozenset({"find", "aggregate"})
+
+class OpInstruments:
+    __slots__ = ("collection", "op", "span_name", "count", "errors", "duration")
+
+    def __init__(self, collection, op, count, errors, duration):
+        self.collection = collection
+        self.op = op
+        self.span_name = f"mongo.{op}"
+        self.count = count
+        self.errors = errors
+        self.duration = duration
+
+    def record(self, start, failed=False, first=True):
+        end = time.perf_counter()
+        elapsed = end - start
+        add_timing("db", elapsed * 1000, calls=1 if first else 0)
+        add_span(self.span_name, start, end, collection=self.collection)
+        self.duration.observe(elapsed)
+        if first:
+            self.count.inc()
+        if failed:
+            self.errors.inc()
+
+def _timed_op(fn, inst):
+    async def call(*args, **kwargs):
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = await fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            inst.record(start, failed)
+    return call
+
+def _timed_cursor_factory(fn, inst):
+    def call(*args, **kwargs):
+        return TimedCursor(fn(*args, **kwargs), inst)
+    return call
+
+class TimedCursor:
+    """Wraps a Motor cursor so time spent fetching results counts as DB time."""
+
+    def __init__(self, cursor, inst=None):
+        self._cursor = cursor
+        self._inst = inst
+        self._counted = False
+
+    def _record(self, start, failed=False):
+        if self._inst is not None:
+            self._inst.record(start, failed, first=not self._counted)
+        else:
+            add_timing("db", (time.perf_counter() - start) * 1000, calls=0 if self._counted else 1)
+        self._counted = True
 
     def __getattr__(self, name):
-        return getattr(self._get_col(), name)
+        attr = getattr(self._cursor, name)
+        if name == "to_list":
+            async def to_list(*args, **kwargs):
+                start = time.perf_counter()
+                failed = True
+                try:
+                    result = await attr(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    self._record(start, failed)
+            return to_list
+        if callable(attr):
+            # Keep chained calls like .sort().limit() wrapped
+            def chain(*args, **kwargs):
+                result = attr(*args, **kwargs)
+                return self if result is self._cursor else result
+            return chain
+        return attr
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await self._cursor.__anext__()
+        except StopAsyncIteration:
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._record(start, failed)
 
 # These will be imported by other files
-# Note: These proxies are safe to use globally as they resolve the database 
-# dynamically on every access, ensuring compatibility with serverless event loops.
+# Note: These proxies are safe to use globally as they resolve the database
+# per event loop, ensuring compatibility with serverless event loops.
 users = CollectionProxy("users")
 resumes = CollectionProxy("resumes")
 interviews = CollectionProxy("interviews")
+# Time series of usage events (see services/usage.py) and its per-user daily counters
 usage = CollectionProxy("usage")
+usage_daily = CollectionProxy("usage_daily")
 audit_logs = CollectionProxy("audit_logs")
+user_summaries = CollectionProxy("user_summaries")
+daily_rollups = CollectionProxy("daily_rollups")
+job_state = CollectionProxy("job_state")
+analysis_jobs = CollectionProxy("analysis_jobs")
+llm_flights = CollectionProxy("llm_flights")
+idempotency_keys = CollectionProxy("idempotency_keys")
+# File documents of the resume_files GridFS bucket (content hash and reference count in metadata)
+resume_file_docs = CollectionProxy("resume_files.files")
 
 # For GridFS, we need a slightly different approach
 class GridFSProxy:
@@ -105,3 +268,97 @@ fs = GridFSProxy()
 # Export client for startup ping
 def get_client():
     return DatabaseManager.get_client()
+
+# Weights of the resume text index: curated fields rank above words in the body
+RESUME_TEXT_WEIGHTS = {
+    "text": 1,
+    "filename": 3,
+    "job_title": 6,
+    "tags": 8,
+    "feedback.Keywords": 8,
+}
+
+async def _ensure_usage_collection(db, existing):
+    """The usage events as a time series (MongoDB 5.0+), or a plain collection with the same indexes."""
+    retention = USAGE_RETENTION_DAYS * 86400
+    if "usage" not in existing:
+        try:
+            # Events of one user are sparse, so buckets span hours rather than seconds
+            await db.create_collection(
+                "usage",
+                timeseries={"timeField": "ts", "metaField": "meta", "granularity": "hours"},
+                expireAfterSeconds=retention,
+            )
+            return
+        except Exception as e:
+            logger.warning("usage is not a time series collection: %s", e)
+    elif "timeseries" in await usage.options():
+        return
+    await usage.create_index("ts", name="ts", expireAfterSeconds=retention)
+    await usage.create_index([("meta.user_id", 1), ("ts", 1)], name="user_ts")
+
+async def ensure_indexes():
+    """
+    Creates the collection options and indexes the app relies on.
+    Safe to call on every startup: create_index is a no-op when the index exists.
+    """
+    db = DatabaseManager.get_db()
+    if db is None:
+        return False
+
+    try:
+        # Paginated history: equality on user_id, newest first, _id as the tie-breaker of the cursor
+        await interviews.create_index([("user_id", 1), ("created_at", -1), ("_id", -1)], name="user_created")
+        # Every reply/end/detail call looks a session up by its public id
+        await interviews.create_index("session_id", name="session_id")
+        # A user's resumes, latest first (summary rebuilds, "my resumes")
+        await resumes.create_index([("user_id", 1), ("created_at", -1)], name="user_created")
+        # Day-range scans of the analytics rollups
+        await interviews.create_index("created_at", name="created_at")
+        await resumes.create_index("created_at", name="created_at")
+        # Admin full-text search (one text index per collection)
+        await resumes.create_index(
+            [(field, "text") for field in RESUME_TEXT_WEIGHTS],
+            weights=RESUME_TEXT_WEIGHTS,
+            name="resume_search",
+            default_language="english",
+        )
+        # Analysis job queue: claiming scans by status, retries wait for run_after,
+        # one live job per upload fingerprint, finished jobs expire at expires_at
+        await analysis_jobs.create_index([("status", 1), ("run_after", 1)], name="status_run_after")
+        await analysis_jobs.create_index([("status", 1), ("lease_until", 1)], name="status_lease")
+        await analysis_jobs.create_index("dedupe_key", name="dedupe_key", unique=True, sparse=True)
+        await analysis_jobs.create_index("expires_at", name="expires_at", expireAfterSeconds=0)
+        # Single-flight leases and shared LLM results are short-lived
+        await llm_flights.create_index("expires_at", name="expires_at", expireAfterSeconds=0)
+        # Stored responses for Idempotency-Key replays
+        await idempotency_keys.create_index("expires_at", name="expires_at", expireAfterSeconds=0)
+        # One live GridFS object per file content; released objects (refcount 0) drop out of the index
+        await resume_file_docs.create_index(
+            "metadata.sha256",
+            name="content_sha256",
+            unique=True,
+            partialFilterExpression={"metadata.refcount": {"$gt": 0}},
+        )
+
+        # Daily quota counters of past days expire on their own
+        await usage_daily.create_index("expires_at", name="expires_at", expireAfterSeconds=0)
+
+        existing = await db.list_collection_names()
+        await _ensure_usage_collection(db, existing)
+        # Bounded audit retention: a capped collection (fixed size) or a TTL index (fixed age).
+        # MongoDB does not support TTL indexes on capped collections, so capped wins.
+        if AUDIT_LOG_CAPPED_MB > 0:
+            if "audit_logs" not in existing:
+                await db.create_collection("audit_logs", capped=True, size=AUDIT_LOG_CAPPED_MB * 1024 * 1024)
+        elif AUDIT_LOG_TTL_DAYS > 0:
+            ttl_seconds = AUDIT_LOG_TTL_DAYS * 86400
+            try:
+                await audit_logs.create_index("timestamp", expireAfterSeconds=ttl_seconds)
+            except OperationFailure:
+                # Index exists with a different expiry; update it in place
+                await db.command("collMod", "audit_logs", index={"keyPattern": {"timestamp": 1}, "expireAfterSeconds": ttl_seconds})
+    except Exception as e:
+        logger.warning("Failed to ensure indexes: %s", e)
+        return False
+    return True
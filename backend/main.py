@@ -1,23 +1,29 @@
 import os
+import sys
 import time
+import asyncio
+import logging
 import traceback
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-from starlette.responses import HTMLResponse
 
 # Use absolute paths for directories
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ROOT_DIR = os.path.dirname(BASE_DIR)
 FRONTEND_DIR = os.path.join(ROOT_DIR, "frontend")
 
-print(f"INFO: Initializing FastAPI application... (BASE_DIR: {BASE_DIR})")
+from backend.services.structured_log import (
+    configure_logging, start_request_timings, reset_request_timings, log_request
+)
+from backend.services.metrics import http_requests, http_request_duration
+from backend.services.tracing import start_trace, finish_trace
 
-from backend.routes import auth_routes, resume_routes, interview_routes, admin_routes
+configure_logging()
+logger = logging.getLogger(__name__)
+logger.info("Initializing FastAPI application... (BASE_DIR: %s)", BASE_DIR)
+
+from backend.routes import auth_routes, resume_routes, interview_routes, admin_routes, dashboard_routes
 
 # Helper to simplify operation IDs for cleaner API docs
 def simplify_operation_ids(app: FastAPI) -> None:
@@ -33,42 +39,76 @@ def include_routes(app: FastAPI):
         app.include_router(resume_routes.router)
         app.include_router(interview_routes.router)
         app.include_router(admin_routes.router)
-        print("INFO: All routes included successfully.")
+        app.include_router(dashboard_routes.router)
+        logger.info("All routes included successfully.")
     except Exception as e:
-        print(f"ERROR: Failed to include routes: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Failed to include routes: %s", e)
         # Raise it so we can see it in serverless logs/responses
         raise e
 
 # Static global startup_id to persist across serverless function re-executions
-from backend.config import GLOBAL_STARTUP_ID
+from backend.config import GLOBAL_STARTUP_ID, RESUME_MAX_UPLOAD_BYTES
 _GLOBAL_STARTUP_ID = GLOBAL_STARTUP_ID
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Index creation runs in the background so it never delays a cold start
+    from backend.db import ensure_indexes
+    app.state.index_task = asyncio.create_task(ensure_indexes())
+    from backend.config import WARMUP_ON_STARTUP
+    if WARMUP_ON_STARTUP:
+        from backend.services.warmup import warm_up
+        app.state.warmup_task = asyncio.create_task(warm_up())
+    from backend.config import ANALYTICS_ROLLUP_INTERVAL_MINUTES
+    rollup_task = None
+    if ANALYTICS_ROLLUP_INTERVAL_MINUTES > 0:
+        from backend.services.analytics import run_scheduler
+        rollup_task = asyncio.create_task(run_scheduler(ANALYTICS_ROLLUP_INTERVAL_MINUTES * 60))
+    # Analysis workers also pick up jobs left queued by a previous process
+    from backend.services.analysis_jobs import analysis_queue
+    analysis_queue.kick()
+    yield
+    if rollup_task is not None:
+        rollup_task.cancel()
+    try:
+        await analysis_queue.stop()
+    except Exception as e:
+        logger.warning("Failed to stop analysis workers on shutdown: %s", e)
+    # Flush buffered writes and deliver pending alerts before the process exits
+    from backend.services.audit import audit_writer
+    from backend.services.email_service import alert_dispatcher
+    from backend.services.usage import usage_writer
+    try:
+        await audit_writer.stop()
+    except Exception as e:
+        logger.warning("Failed to flush audit log queue on shutdown: %s", e)
+    try:
+        await usage_writer.stop()
+    except Exception as e:
+        logger.warning("Failed to flush usage event queue on shutdown: %s", e)
+    try:
+        await alert_dispatcher.close()
+    except Exception as e:
+        logger.warning("Failed to drain admin alert dispatcher on shutdown: %s", e)
+
 def create_app():
-    from slowapi import Limiter, _rate_limit_exceeded_handler
-    from slowapi.util import get_remote_address
-    from slowapi.errors import RateLimitExceeded
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.staticfiles import StaticFiles
+    from backend.services.static_assets import AssetCache, CachedStaticFiles
+    from backend.services.upload_validation import MULTIPART_OVERHEAD_BYTES, UploadLimitMiddleware
 
-    limiter = Limiter(key_func=get_remote_address)
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
+    # index.html, the favicon and /static are served from memory with ETags and pre-compressed variants
+    assets = AssetCache(FRONTEND_DIR, reload=os.getenv("DEBUG") == "true")
     
     # Register routes immediately
     include_routes(app)
-    
-    app.state.limiter = limiter
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
     # Global error handler for debugging
     @app.exception_handler(Exception)
     async def global_exception_handler(request: Request, exc: Exception):
         method = request.method
         url = str(request.url)
-        print(f"GLOBAL ERROR: {method} {url} - {exc}")
-        import traceback
-        print(traceback.format_exc())
+        logger.error("Unhandled error: %s %s - %s", method, url, exc, exc_info=exc)
         
         detail = str(exc)
         if isinstance(exc, HTTPException):
@@ -105,6 +145,13 @@ def create_app():
             }
         )
 
+    # Oversized resume uploads are refused before the multipart parser spools them
+    app.add_middleware(
+        UploadLimitMiddleware,
+        paths=["/api/resume/upload"],
+        max_body_bytes=RESUME_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    )
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -115,37 +162,68 @@ def create_app():
 
     @app.middleware("http")
     async def log_requests(request: Request, call_next):
-        import time
-        start_time = time.time()
-        method = request.method
-        path = request.url.path
-        print(f"DEBUG: Incoming Request: {method} {path}")
-        
+        start_time = time.perf_counter()
+        timings_token = start_request_timings()
+        trace, trace_token = start_trace(request.method)
+        status_code = 500
+        response = None
         try:
             response = await call_next(request)
-            process_time = (time.time() - start_time) * 1000
-            print(f"DEBUG: Response: {response.status_code} for {method} {path} (took {process_time:.2f}ms)")
+            status_code = response.status_code
             return response
-        except Exception as e:
-            import traceback
-            print(f"DEBUG: Request Failed: {method} {path} - Error: {e}")
-            print(traceback.format_exc())
-            raise e
+        finally:
+            elapsed = time.perf_counter() - start_time
+            # The matched route template (e.g. /api/interview/{session_id}/reply) keeps logs and metrics groupable
+            route = getattr(request.scope.get("route"), "path", None) or "unmatched"
+            if trace is not None:
+                trace.root.name = f"{request.method} {route}"
+                server_timing = finish_trace(trace, trace_token, status=status_code, path=request.url.path)
+                if server_timing and response is not None:
+                    response.headers["Server-Timing"] = server_timing
+            http_requests.labels(route, request.method, status_code).inc()
+            http_request_duration.labels(route, request.method).observe(elapsed)
+            log_request(
+                request.method,
+                route,
+                request.url.path,
+                status_code,
+                elapsed * 1000,
+                request.client.host if request.client else None,
+            )
+            reset_request_timings(timings_token)
 
     simplify_operation_ids(app)
 
     # Use absolute path for static files
     static_dir = os.path.join(FRONTEND_DIR, "static")
     if os.path.exists(static_dir):
-        app.mount("/static", StaticFiles(directory=static_dir), name="static")
-        print(f"INFO: Static files mounted from {static_dir}")
+        app.mount("/static", CachedStaticFiles(assets), name="static")
+        logger.info("Static files mounted from %s", static_dir)
     else:
-        print(f"WARNING: Static directory not found at {static_dir}")
+        logger.warning("Static directory not found at %s", static_dir)
 
     @app.get("/api/meta/startup_id")
     async def startup_id():
         return {"startup_id": _GLOBAL_STARTUP_ID}
 
+    @app.get("/api/metrics", include_in_schema=False)
+    async def scrape_metrics(request: Request):
+        # Scraper endpoint guarded by a static bearer token; disabled unless METRICS_TOKEN is set
+        from backend.config import METRICS_TOKEN
+        from backend.services.metrics import REGISTRY, OPENMETRICS_CONTENT_TYPE
+        if not METRICS_TOKEN or request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+            raise HTTPException(status_code=404, detail="Not Found")
+        return Response(content=REGISTRY.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+    @app.get("/api/cron/rollups", include_in_schema=False)
+    async def cron_rollups(request: Request):
+        # Scheduled refresh of the admin analytics rollups (Vercel Cron sends CRON_SECRET as a bearer token)
+        from backend.config import CRON_SECRET
+        from backend.services.analytics import refresh_rollups
+        if not CRON_SECRET or request.headers.get("authorization") != f"Bearer {CRON_SECRET}":
+            raise HTTPException(status_code=404, detail="Not Found")
+        return await refresh_rollups()
+
     @app.get("/api/health")
     async def health():
         db_status = "not_checked"
@@ -163,6 +241,12 @@ def create_app():
             "database": db_status
         }
 
+    @app.get("/api/warmup", include_in_schema=False)
+    async def warmup():
+        # Hit by the platform (cron / deploy hook) to load lazy dependencies before real traffic
+        from backend.services.warmup import warm_up
+        return await warm_up()
+
     @app.post("/api/test-post")
     async def test_post(data: dict = None):
         return {"message": "POST successful", "received": data}
@@ -179,29 +263,25 @@ def create_app():
         return {"routes": routes}
 
     @app.get("/favicon.ico", include_in_schema=False)
-    async def favicon():
-        from fastapi.responses import FileResponse, Response
-        favicon_path = os.path.join(FRONTEND_DIR, "static", "favicon-32x32.png")
-        if os.path.exists(favicon_path):
-            return FileResponse(favicon_path)
-        return Response(status_code=204)
+    async def favicon(request: Request):
+        response = assets.response(request, "static/favicon-32x32.png", cache_control="public, max-age=86400")
+        return response or Response(status_code=204)
 
     @app.api_route("/{full_path:path}", methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
     async def catch_all(request: Request, full_path: str):
         method = request.method
         url = str(request.url)
         path = request.url.path
-        print(f"DEBUG: Final Catch-all reached: {method} {url} (full_path: {full_path}, path: {path})")
+        logger.debug("Final Catch-all reached: %s %s (full_path: %s)", method, url, full_path)
         
         # If it's a GET request and doesn't look like an API call, serve the frontend
         if method == "GET" and not path.startswith("/api/"):
             from fastapi.responses import HTMLResponse
-            index_path = os.path.join(FRONTEND_DIR, "index.html")
-            try:
-                with open(index_path, "r", encoding="utf-8") as f:
-                    return HTMLResponse(content=f.read())
-            except FileNotFoundError:
-                return HTMLResponse(f"index.html not found at {index_path}", status_code=404)
+            # The SPA shell is read and compressed once; revalidation returns 304
+            response = assets.response(request, "index.html")
+            if response is None:
+                return HTMLResponse(f"index.html not found at {os.path.join(FRONTEND_DIR, 'index.html')}", status_code=404)
+            return response
         
         # If it's an API call that reached here, it's a 404
         if path.startswith("/api/"):
@@ -211,7 +291,7 @@ def create_app():
                 if hasattr(r, 'path'):
                     available_paths.append(f"{list(r.methods) if hasattr(r, 'methods') else '[]'} {r.path}")
             
-            print(f"DEBUG: 404 on API route. Path: {path}. Available: {available_paths}")
+            logger.debug("404 on API route. Path: %s", path)
             
             return JSONResponse(
                 status_code=404,
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Form, Request
 from fastapi.responses import Response
 import base64
+import logging
+from datetime import date, timedelta
 from bson import ObjectId
 from backend.auth import get_current_user
 from backend.db import resumes, interviews, users, fs
 import jwt
 from backend.config import JWT_SECRET, JWT_ALGORITHM
+from backend.services.resume_files import release_resume_file
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -13,61 +18,72 @@ def ensure_admin_role(current):
     if current.get("role") not in ("admin", "super_admin"):
         raise HTTPException(status_code=403, detail="Forbidden")
 
+async def _emails_by_user_id(user_ids) -> dict:
+    """One $in lookup for all the users of a page of resumes."""
+    keys = []
+    for uid in {u for u in user_ids if u}:
+        keys.append(uid)
+        try:
+            keys.append(ObjectId(uid))
+        except Exception:
+            pass
+    if not keys:
+        return {}
+    return {str(u["_id"]): u.get("email", "unknown") async for u in users.find({"_id": {"$in": keys}}, {"email": 1})}
+
 @router.get("/resumes")
 async def list_resumes(
     q: str = Query(None),
     status: str = Query(None),
     tag: str = Query(None),
+    limit: int = Query(100, ge=1, le=500),
     current=Depends(get_current_user),
 ):
     ensure_admin_role(current)
     filt = {}
-    if q:
-        filt["filename"] = {"$regex": q, "$options": "i"}
     if status:
         filt["status"] = status
     if tag:
         filt["tags"] = tag
-    cur = resumes.find(filt)
+    from backend.services.resume_search import LIST_PROJECTION, search_resumes
+    if q:
+        # Ranked full-text search over text, tags, job title, keywords and filename
+        docs = await search_resumes(q, filt, limit=limit)
+    else:
+        # The newest `limit` resumes; the list never loads resume text, feedback or inline files
+        pipeline = [{"$match": filt}, {"$sort": {"created_at": -1}}, {"$limit": limit}, {"$project": LIST_PROJECTION}]
+        docs = [r async for r in resumes.aggregate(pipeline)]
+    emails = await _emails_by_user_id(str(r.get("user_id")) for r in docs if r.get("user_id"))
+
     items = []
-    async for r in cur:
+    for r in docs:
         created = r.get("created_at")
         try:
             created_iso = created.isoformat() if created else None
         except Exception:
             created_iso = str(created) if created else None
-        
-        # Fetch user email via user_id
-        user_email = "unknown"
         user_id = r.get("user_id")
-        if user_id:
-            try:
-                # user_id in resume is the _id in users collection
-                try:
-                    query_id = ObjectId(user_id)
-                except:
-                    query_id = user_id
-                
-                user_doc = await users.find_one({"_id": {"$in": [query_id, user_id]}})
-                if user_doc:
-                    user_email = user_doc.get("email", "unknown")
-            except Exception:
-                pass
-
-        items.append(
-            {
-                "id": str(r["_id"]),
-                "user_id": str(user_id) if user_id else None,
-                "user_email": user_email,
-                "filename": r["filename"],
-                "status": r.get("status", "pending"),
-                "tags": r.get("tags", []),
-                "created_at": created_iso,
-                "mime_type": r.get("mime_type"),
-                "file_available": bool(r.get("file_b64") or r.get("file_id")),
-                "notes": r.get("notes", ""),
-            }
-        )
+
+        item = {
+            "id": str(r["_id"]),
+            "user_id": str(user_id) if user_id else None,
+            "user_email": emails.get(str(user_id), "unknown") if user_id else "unknown",
+            "filename": r["filename"],
+            "status": r.get("status", "pending"),
+            "tags": r.get("tags", []),
+            "created_at": created_iso,
+            "mime_type": r.get("mime_type"),
+            "file_available": bool(r.get("file_available")),
+            "notes": r.get("notes", ""),
+        }
+        if q:
+            item.update({
+                "job_title": r.get("job_title"),
+                "score": round(r.get("score", 0.0), 3),
+                "highlights": r.get("highlights", []),
+                "matched_fields": r.get("matched_fields", []),
+            })
+        items.append(item)
     return items
 
 @router.get("/resumes/{resume_id}")
@@ -178,17 +194,14 @@ async def delete_resume(resume_id: str, current=Depends(get_current_user)):
     if not r:
         raise HTTPException(status_code=404, detail="Not found")
         
-    # Also delete the file from GridFS if it exists
+    # Also release the GridFS file; it is deleted once no other resume shares its content
     fid = r.get("file_id")
     if fid:
         try:
-            # Re-fetch the bucket instance to ensure it's fresh for this request
-            bucket = await fs.get_fs()
-            if bucket:
-                await bucket.delete(ObjectId(fid))
+            await release_resume_file(fid)
         except Exception as e:
-            print(f"Warning: Failed to delete GridFS file {fid}: {e}")
-            pass # Continue even if file deletion fails
+            # Continue even if file deletion fails
+            logger.warning("Failed to release GridFS file %s: %s", fid, e)
             
     await resumes.delete_one({"_id": oid})
     return {"deleted": True}
@@ -235,7 +248,51 @@ async def get_resume_file_open(resume_id: str, token: str = Query(...)):
     return Response(content=raw, media_type=r.get("mime_type") or "application/octet-stream", headers=headers)
 
 @router.get("/metrics")
-async def metrics(current=Depends(get_current_user)):
+async def metrics(request: Request, format: str = Query(None), current=Depends(get_current_user)):
+    ensure_admin_role(current)
+    from backend.services.audit import audit_writer
+    from backend.services.metrics import REGISTRY, OPENMETRICS_CONTENT_TYPE, cache_hit_ratios
+    from backend.services.usage import usage_writer
+    if format == "openmetrics" or "application/openmetrics-text" in request.headers.get("accept", ""):
+        return Response(content=REGISTRY.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+    # Collection metadata count: O(1), unlike count_documents({}) which scans
+    count = await interviews.estimated_document_count()
+    return {
+        "interview_count": count,
+        "audit_writer": audit_writer.stats(),
+        "usage_writer": usage_writer.stats(),
+        "cache_hit_ratios": cache_hit_ratios(),
+    }
+
+def _parse_day(value: str, name: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}; expected YYYY-MM-DD")
+
+@router.get("/analytics")
+async def analytics_report(
+    days: int = Query(30, ge=1, le=366),
+    end: str = Query(None),
+    current=Depends(get_current_user),
+):
+    """Sessions, scores by role, uploads, LLM calls and keywords from the daily rollups."""
+    ensure_admin_role(current)
+    from backend.services.analytics import get_report
+    from backend.services.utils import get_malaysia_time
+    end_day = _parse_day(end, "end") if end else get_malaysia_time().date()
+    return await get_report(end_day - timedelta(days=days - 1), end_day)
+
+@router.post("/analytics/refresh")
+async def analytics_refresh(since: str = Query(None), current=Depends(get_current_user)):
+    """Refreshes the rollups now; `since` recomputes from that day instead of the watermark."""
     ensure_admin_role(current)
-    count = await interviews.count_documents({})
-    return {"interview_count": count}
+    from backend.services.analytics import refresh_rollups
+    from backend.services.utils import get_malaysia_time
+    since_day = _parse_day(since, "since") if since else None
+    if since_day and since_day > get_malaysia_time().date():
+        raise HTTPException(status_code=400, detail="Invalid since; it is after today (Malaysia time)")
+    result = await refresh_rollups(since_day)
+    if result["status"] == "busy":
+        raise HTTPException(status_code=409, detail="A rollup refresh is already running")
+    return result
@@ -2,11 +2,13 @@ from fastapi import APIRouter, HTTPException, status, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
+import logging
 from backend.db import users
 from backend.models import UserIn, Token
 from backend.auth import hash_password, verify_password, create_access_token, get_current_user
 from backend.services.rate_limit import rate_limit
 from backend.services.audit import log_event, check_admin_ip, trigger_admin_alert
+from backend.services.email_service import alert_dispatcher
 from backend.services.utils import get_malaysia_time
 
 from backend.config import (
@@ -17,6 +19,8 @@ from backend.config import (
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
+logger = logging.getLogger(__name__)
+
 @router.get("/test-auth")
 async def test_auth():
     return {"message": "Auth router is working"}
@@ -85,7 +89,7 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
         from backend.auth import ensure_admin
         await ensure_admin()
     except Exception as e:
-        print(f"DEBUG: Non-critical failure in lazy ensure_admin: {e}")
+        logger.warning("Non-critical failure in lazy ensure_admin: %s", e)
     
     try:
         # Try direct lookup first
@@ -97,19 +101,19 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
             # We use a case-insensitive regex but ensure we match the whole string
             user = await users.find_one({"email": {"$regex": f"^{re.escape(username)}$", "$options": "i"}})
             if user:
-                print(f"DEBUG: User found via case-insensitive fallback: {user.get('email')}")
+                logger.debug("User found via case-insensitive fallback: %s", user.get("email"))
             
         if not user:
-            print(f"DEBUG: Login failed - User not found: {username}")
+            logger.info("Login failed - User not found: %s", username)
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Email not found")
         
         # Debug the user object role
         db_email = user.get("email", "unknown")
         user_role = user.get("role", "user")
-        print(f"DEBUG: Login attempt for '{username}'. Found in DB as '{db_email}' with role '{user_role}'")
+        logger.debug("Login attempt for '%s'. Found in DB as '%s' with role '%s'", username, db_email, user_role)
         
         if not verify_password(form_data.password, user["password_hash"]):
-            print(f"DEBUG: Login failed for {username}: Incorrect password")
+            logger.info("Login failed for %s: Incorrect password", username)
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password")
         
         # Update last login info
@@ -123,9 +127,7 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
     except HTTPException:
         raise
     except Exception as e:
-        import traceback
-        print(f"CRITICAL LOGIN ERROR: {e}")
-        print(traceback.format_exc())
+        logger.exception("Login error: %s", e)
         raise HTTPException(status_code=500, detail=f"Database connection error or internal failure: {str(e)}")
 
 @router.post("/admin_login", response_model=Token, dependencies=[Depends(rate_limit)])
@@ -150,7 +152,7 @@ async def admin_login(request: Request, form_data: OAuth2PasswordRequestForm = D
     ip_status = await check_admin_ip(username, ip_address)
     
     if not verify_password(form_data.password, user["password_hash"]):
-        print(f"DEBUG: Admin login failed for {username}: Incorrect password")
+        logger.info("Admin login failed for %s: Incorrect password", username)
         await log_event(str(user["_id"]), username, "admin_login", ip_address, "failure", {"reason": "wrong_password"})
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password")
     
@@ -192,14 +194,11 @@ async def admin_login(request: Request, form_data: OAuth2PasswordRequestForm = D
         
     token = create_access_token(str(user["_id"]), role)
     
-    # Fetch admin emails to return for frontend alerting as fallback
+    # Return admin emails for frontend alerting as fallback (served from the dispatcher's cache)
     admin_emails = []
     if is_anomaly:
         try:
-            cursor = users.find({"role": {"$in": ["admin", "super_admin"]}})
-            async for admin in cursor:
-                if "email" in admin:
-                    admin_emails.append(admin["email"])
+            admin_emails = await alert_dispatcher.get_admin_recipients()
         except Exception:
             pass
 
@@ -0,0 +1,20 @@
+import asyncio
+from fastapi import APIRouter, Depends
+from backend.auth import get_current_user
+from backend.services import usage, user_summary
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+@router.get("")
+async def dashboard(current=Depends(get_current_user)):
+    """Everything the dashboard shows: the user's materialized summary and today's quota counters."""
+    summary, counts = await asyncio.gather(
+        user_summary.get_user_summary(current["id"]),
+        usage.daily_counts(current["id"]),
+    )
+    return {
+        "user": current,
+        "quotas": user_summary.quotas_view(counts),
+        "interviews": user_summary.interview_stats_view(summary.get("interviews")),
+        "resume": user_summary.resume_view(summary.get("resume")),
+    }
@@ -1,34 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, Form
+import base64
+import json
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Form, Query, Response
 from datetime import datetime, timedelta, timezone
 from bson import ObjectId
+from bson.errors import InvalidId
 from backend.db import interviews, users, resumes
 from backend.auth import get_current_user
-from backend.config import SESSION_MAX_QUESTIONS, INTERVIEW_DEFAULT_QUESTIONS, DAILY_QUESTION_LIMIT
-from backend.services.interview_engine import interview_reply
+from backend.config import SESSION_MAX_QUESTIONS, INTERVIEW_DEFAULT_QUESTIONS, DAILY_QUESTION_LIMIT, DAILY_INTERVIEW_LIMIT
+from backend.services.interview_engine import interview_reply_async
 from backend.services.rate_limit import rate_limit
-from backend.services.utils import is_gibberish, get_malaysia_time
+from backend.services.idempotency import idempotent
+from backend.services.text_quality import BORDERLINE, UNUSABLE, score_answer
+from backend.services.utils import get_malaysia_time
 from backend.services.daily_limit import check_daily_limit, increment_daily_limit
+from backend.services.metrics import rate_limit_rejections
+from backend.services import usage, user_summary
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/interview", tags=["interview"])
 
 @router.get("/limits")
 async def get_interview_limits(current=Depends(get_current_user)):
-    can_start, remaining = await check_daily_limit(current["id"], "daily_interview_count", 3)
-    return {"remaining": remaining, "limit": 3}
+    can_start, remaining = await check_daily_limit(current["id"], "daily_interview_count", DAILY_INTERVIEW_LIMIT)
+    return {"remaining": remaining, "limit": DAILY_INTERVIEW_LIMIT}
 
 async def can_ask(user_id: str) -> bool:
-    # Use the daily_limit service to handle reset logic
-    await check_daily_limit(user_id, "daily_question_count", DAILY_QUESTION_LIMIT)
-    
-    oid = ObjectId(user_id)
-    u = await users.find_one({"_id": oid})
-    return int(u.get("daily_question_count", 0)) < DAILY_QUESTION_LIMIT
+    allowed, _ = await check_daily_limit(user_id, "daily_question_count", DAILY_QUESTION_LIMIT)
+    return allowed
 
 async def inc_question(user_id: str):
-    oid = ObjectId(user_id)
-    await users.update_one({"_id": oid}, {"$inc": {"daily_question_count": 1}})
+    await increment_daily_limit(user_id, "daily_question_count")
 
 @router.post("/start")
+@idempotent
 async def start(
     job_title: str = Form(None),
     resume_feedback: str = Form(None),
@@ -78,10 +84,12 @@ async def start(
             raise HTTPException(status_code=400, detail="Analyze resume first to start interview")
             
     if not await can_ask(current["id"]):
+        rate_limit_rejections.labels("daily_question").inc()
         raise HTTPException(status_code=429, detail="Daily question quota reached (60 questions per day). Resets at 00:00 Malaysia Time.")
     
-    can_start, _ = await check_daily_limit(current["id"], "daily_interview_count", 3)
+    can_start, _ = await check_daily_limit(current["id"], "daily_interview_count", DAILY_INTERVIEW_LIMIT)
     if not can_start:
+        rate_limit_rejections.labels("daily_interview").inc()
         raise HTTPException(status_code=429, detail="Daily interview session limit reached. Resets at 00:00 Malaysia Time.")
     
     # Initialize RAG Engine lazily
@@ -89,7 +97,7 @@ async def start(
         from backend.services.rag_engine import rag_engine
         rag_engine.initialize()
     except Exception as e:
-        print(f"DEBUG: Non-critical failure in lazy RAG initialization: {e}")
+        logger.warning("Non-critical failure in lazy RAG initialization: %s", e)
 
     sid = str(ObjectId())
     doc = {
@@ -105,12 +113,15 @@ async def start(
         "ended_at": None,
     }
     res = await interviews.insert_one(doc)
-    ai = interview_reply([], job_title=job_title, resume_feedback=feedback_dict, questions_limit=questions_limit, difficulty=difficulty, current_asked_count=0)
+    await user_summary.record_session_started(current["id"], doc["created_at"])
+    async with usage.track(current["id"], "interview_start"):
+        ai = await interview_reply_async([], session_id=sid, job_title=job_title, resume_feedback=feedback_dict, questions_limit=questions_limit, difficulty=difficulty, current_asked_count=0)
     await inc_question(current["id"])
     await interviews.update_one({"_id": res.inserted_id}, {"$push": {"transcript": {"role": "assistant", "text": ai, "at": get_malaysia_time()}}, "$inc": {"asked_count": 1}})
     return {"session_id": sid, "message": ai, "asked_count": 1, "questions_limit": questions_limit}
 
 @router.post("/{session_id}/reply")
+@idempotent
 async def reply(session_id: str, user_text: str = Form(...), current=Depends(get_current_user), _: None = Depends(rate_limit)):
     s = await interviews.find_one({"session_id": session_id, "user_id": current["id"]})
     if not s:
@@ -123,7 +134,9 @@ async def reply(session_id: str, user_text: str = Form(...), current=Depends(get
     questions_limit = s.get("questions_limit", INTERVIEW_DEFAULT_QUESTIONS)
     difficulty = s.get("difficulty", "Beginner")
 
-    if is_gibberish(user_text):
+    # Clearly unusable answers are re-asked locally; borderline ones go to the model with a hint
+    quality = score_answer(user_text)
+    if quality["verdict"] == UNUSABLE:
         last_q = ""
         for t in reversed(s.get("transcript", [])):
             if t.get("role") == "assistant":
@@ -140,12 +153,15 @@ async def reply(session_id: str, user_text: str = Form(...), current=Depends(get
         )
         return {"message": msg}
     if not await can_ask(current["id"]):
+        rate_limit_rejections.labels("daily_question").inc()
         raise HTTPException(status_code=429, detail="Daily question quota reached (60 questions per day). Resets at 00:00 Malaysia Time.")
     history = [{"role": t["role"], "content": t["text"]} for t in s.get("transcript", [])]
     history.append({"role": "user", "content": user_text})
     
     current_asked_count = s.get("asked_count", 0)
-    ai = interview_reply(history, job_title=job_title, resume_feedback=resume_feedback, questions_limit=questions_limit, difficulty=difficulty, current_asked_count=current_asked_count)
+    answer_confidence = quality["confidence"] if quality["verdict"] == BORDERLINE else None
+    async with usage.track(current["id"], "interview_question"):
+        ai = await interview_reply_async(history, session_id=session_id, job_title=job_title, resume_feedback=resume_feedback, questions_limit=questions_limit, difficulty=difficulty, current_asked_count=current_asked_count, answer_confidence=answer_confidence)
     
     # Check for AI signaling completion
     ai_ended = "[FINISH]" in ai
@@ -198,20 +214,23 @@ async def reply(session_id: str, user_text: str = Form(...), current=Depends(get
                 feedback_text = re.sub(r"Interview Readiness Score:\s*\d+/100", "", feedback_text, flags=re.IGNORECASE).strip()
             
             await increment_daily_limit(current["id"], "daily_interview_count")
+            ended_at = get_malaysia_time()
             await interviews.update_one(
                 {"session_id": session_id}, 
                 {
                     "$set": {
-                        "ended_at": get_malaysia_time(),
+                        "ended_at": ended_at,
                         "readiness_score": readiness_score,
                         "readiness_feedback": feedback_text,
                     }
                 }
             )
+            await user_summary.record_session_completed(current["id"], readiness_score, ended_at)
         return {"message": ai, "ended": True, "asked_count": asked_now, "questions_limit": limit}
     return {"message": ai, "asked_count": asked_now, "questions_limit": limit}
 
 @router.post("/{session_id}/end")
+@idempotent
 async def end(session_id: str, current=Depends(get_current_user)):
     # Check if session was already ended to avoid double counting
     s = await interviews.find_one({"session_id": session_id, "user_id": current["id"]})
@@ -231,15 +250,17 @@ async def end(session_id: str, current=Depends(get_current_user)):
         })
         
         # Call AI to get the explanation message
-        ai_msg = interview_reply(
-            history, 
-            job_title=job_title, 
-            resume_feedback=resume_feedback, 
-            questions_limit=questions_limit, 
-            difficulty=difficulty,
-            current_asked_count=asked_count,
-            force_end=True
-        )
+        async with usage.track(current["id"], "interview_end"):
+            ai_msg = await interview_reply_async(
+                history, 
+                session_id=session_id,
+                job_title=job_title, 
+                resume_feedback=resume_feedback, 
+                questions_limit=questions_limit, 
+                difficulty=difficulty,
+                current_asked_count=asked_count,
+                force_end=True
+            )
         ai_msg = ai_msg.replace("[FINISH]", "").strip()
 
         await increment_daily_limit(current["id"], "daily_interview_count")
@@ -254,72 +275,157 @@ async def end(session_id: str, current=Depends(get_current_user)):
                 "$push": {"transcript": {"role": "assistant", "text": ai_msg, "at": get_malaysia_time()}}
             }
         )
+        await user_summary.record_session_ended_early(current["id"])
         return {"ended": True, "message": ai_msg}
     return {"ended": True, "already_ended": True}
 
 @router.post("/reset-quota")
 async def reset_quota(current=Depends(get_current_user)):
     """Reset the daily quotas for the current user (Testing only)"""
-    oid = ObjectId(current["id"])
-    now = get_malaysia_time()
-    await users.update_one(
-        {"_id": oid},
-        {
-            "$set": {
-                "daily_question_count": 0,
-                "daily_resume_count": 0,
-                "daily_interview_count": 0,
-                "daily_reset_at": now
-            }
-        }
-    )
+    await usage.clear_daily_counts(current["id"])
     return {"message": "Quotas reset successfully"}
 
+# List views never load transcripts; they are paged separately via /{session_id}/transcript
+HISTORY_PROJECTION = {
+    "asked_count": 1,
+    "questions_limit": 1,
+    "job_title": 1,
+    "created_at": 1,
+    "ended_at": 1,
+    "readiness_score": 1,
+    "readiness_feedback": 1,
+}
+
+def _encode_cursor(s) -> str:
+    raw = json.dumps({"t": s["created_at"].isoformat(), "id": str(s["_id"])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), ObjectId(data["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _session_filter(session_id: str, user_id: str) -> dict:
+    # Sessions are addressed either by their document _id or by their public session_id
+    try:
+        return {"$or": [{"_id": ObjectId(session_id)}, {"session_id": session_id}], "user_id": user_id}
+    except (InvalidId, TypeError):
+        return {"session_id": session_id, "user_id": user_id}
+
 @router.get("/history")
-async def history(current=Depends(get_current_user)):
-    cur = interviews.find({"user_id": current["id"]}).sort("created_at", -1)
-    items = []
-    async for s in cur:
-        items.append({
-            "id": str(s["_id"]), 
-            "asked_count": s.get("asked_count", 0), 
-            "created_at": s["created_at"], 
+async def history(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    current=Depends(get_current_user),
+):
+    """
+    One page of the user's sessions, newest first by default.
+    When more sessions exist, the X-Next-Cursor header carries the cursor for the next page.
+    """
+    direction = -1 if order == "desc" else 1
+    filt = {"user_id": current["id"]}
+    if cursor:
+        # Keyset pagination on (created_at, _id), served by the (user_id, created_at, _id) index
+        created_at, oid = _decode_cursor(cursor)
+        op = "$lt" if direction == -1 else "$gt"
+        filt["$or"] = [
+            {"created_at": {op: created_at}},
+            {"created_at": created_at, "_id": {op: oid}},
+        ]
+    cur = (
+        interviews.find(filt, HISTORY_PROJECTION)
+        .sort([("created_at", direction), ("_id", direction)])
+        .limit(limit + 1)
+    )
+    docs = [s async for s in cur]
+    if len(docs) > limit:
+        docs = docs[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(docs[-1])
+    return [
+        {
+            "id": str(s["_id"]),
+            "job_title": s.get("job_title"),
+            "asked_count": s.get("asked_count", 0),
+            "questions_limit": s.get("questions_limit", INTERVIEW_DEFAULT_QUESTIONS),
+            "created_at": s["created_at"],
             "ended_at": s.get("ended_at"),
             "readiness_score": s.get("readiness_score"),
-            "readiness_feedback": s.get("readiness_feedback")
-        })
-    return items
+            "readiness_feedback": s.get("readiness_feedback"),
+        }
+        for s in docs
+    ]
+
+@router.get("/stats")
+async def stats(current=Depends(get_current_user)):
+    """Aggregate interview stats from the user's pre-computed summary."""
+    summary = await user_summary.get_user_summary(current["id"])
+    return user_summary.interview_stats_view(summary.get("interviews"))
+
+@router.get("/{session_id}/transcript")
+async def transcript(
+    session_id: str,
+    after: int = Query(-1, ge=-1),
+    limit: int = Query(50, ge=1, le=200),
+    current=Depends(get_current_user),
+):
+    """
+    Pages transcript turns by sequence number (their position in the session).
+    Pass the last `seq` received as `after` to get the next page.
+    """
+    start = after + 1
+    pipeline = [
+        {"$match": _session_filter(session_id, current["id"])},
+        {"$limit": 1},
+        {"$project": {
+            "total": {"$size": {"$ifNull": ["$transcript", []]}},
+            "turns": {"$slice": [{"$ifNull": ["$transcript", []]}, start, limit]},
+        }},
+    ]
+    page = None
+    async for doc in interviews.aggregate(pipeline):
+        page = doc
+    if page is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    turns = [{"seq": start + i, **t} for i, t in enumerate(page.get("turns") or [])]
+    return {
+        "turns": turns,
+        "total": page["total"],
+        "next_after": turns[-1]["seq"] if turns and start + len(turns) < page["total"] else None,
+    }
 
 @router.get("/{session_id}")
-async def detail(session_id: str, current=Depends(get_current_user)):
-    s = await interviews.find_one({"_id": ObjectId(session_id), "user_id": current["id"]})
-    if not s:
-        s = await interviews.find_one({"session_id": session_id, "user_id": current["id"]})
+async def detail(session_id: str, include_transcript: bool = Query(True), current=Depends(get_current_user)):
+    projection = None if include_transcript else {"transcript": 0}
+    s = await interviews.find_one(_session_filter(session_id, current["id"]), projection)
     if not s:
         raise HTTPException(status_code=404, detail="Not found")
-    return {
+    out = {
         "id": str(s.get("_id")),
         "session_id": s.get("session_id"),
         "asked_count": s.get("asked_count", 0),
         "questions_limit": s.get("questions_limit", INTERVIEW_DEFAULT_QUESTIONS),
         "created_at": s.get("created_at"),
         "ended_at": s.get("ended_at"),
-        "transcript": s.get("transcript", []),
         "readiness_score": s.get("readiness_score"),
         "readiness_feedback": s.get("readiness_feedback"),
     }
+    if include_transcript:
+        out["transcript"] = s.get("transcript", [])
+    return out
 
 @router.delete("/{session_id}")
 async def delete_session(session_id: str, current=Depends(get_current_user)):
-    try:
-        oid = ObjectId(session_id)
-        # Try to delete by _id
-        res = await interviews.delete_one({"_id": oid, "user_id": current["id"]})
-    except:
-        # If not a valid ObjectId, try deleting by session_id string
-        res = await interviews.delete_one({"session_id": session_id, "user_id": current["id"]})
-        
-    if res.deleted_count == 0:
+    s = await interviews.find_one_and_delete(
+        _session_filter(session_id, current["id"]),
+        {"readiness_score": 1, "ended_at": 1},
+    )
+    if not s:
         raise HTTPException(status_code=404, detail="Interview session not found")
-        
+    await user_summary.record_session_deleted(current["id"], s)
+
     return {"message": "Interview session deleted successfully"}
@@ -1,140 +1,138 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import datetime, timezone, timedelta
 from bson import ObjectId
-import os
-import base64
-from backend.db import resumes, users, fs
+import json
+from backend.db import resumes, users
 from backend.models import ResumeFeedback, ManualProfileIn
 from backend.auth import get_current_user
-from backend.services.resume_parser import extract_resume_text
-from backend.services.ai_feedback import get_feedback
+from backend.services.ai_feedback import get_feedback_async
+from backend.services.analysis_jobs import analysis_queue, job_view, SUCCEEDED, FAILED, TERMINAL
 from backend.services.rate_limit import rate_limit
+from backend.services.idempotency import idempotent
+from backend.services.upload_validation import read_upload
 from backend.services.utils import is_gibberish, get_malaysia_time
 from backend.services.daily_limit import check_daily_limit, increment_daily_limit
+from backend.services.metrics import rate_limit_rejections
+from backend.services import usage, user_summary, resume_analysis
+from backend.config import DAILY_RESUME_LIMIT, ANALYSIS_WAIT_SECONDS
 
 router = APIRouter(prefix="/api/resume", tags=["resume"])
 
+SSE_KEEPALIVE_SECONDS = 15
+
 @router.get("/limits")
 async def get_resume_limits(current=Depends(get_current_user)):
-    can_upload, remaining = await check_daily_limit(current["id"], "daily_resume_count", 5)
-    return {"remaining": remaining, "limit": 5}
+    can_upload, remaining = await check_daily_limit(current["id"], "daily_resume_count", DAILY_RESUME_LIMIT)
+    return {"remaining": remaining, "limit": DAILY_RESUME_LIMIT}
 
-@router.post("/upload")
+@router.post("/upload", status_code=202)
+@idempotent
 async def upload_resume(
+    response: Response,
     file: UploadFile = File(...),
     job_title: str = Form(...),
     consent: bool = Form(False),
+    wait: bool = Query(False, description="Hold the request until the analysis finishes (up to ANALYSIS_WAIT_SECONDS)"),
     current=Depends(get_current_user),
     _: None = Depends(rate_limit),
 ):
     if current.get("role") != "user":
         raise HTTPException(status_code=403, detail="Only regular users can upload resumes")
     
-    can_upload, remaining = await check_daily_limit(current["id"], "daily_resume_count", 5)
+    can_upload, remaining = await check_daily_limit(current["id"], "daily_resume_count", DAILY_RESUME_LIMIT)
     if not can_upload:
-        raise HTTPException(status_code=429, detail="Daily resume analysis limit reached. Resets at 00:00 Malaysia Time.")
+        rate_limit_rejections.labels("daily_resume").inc()
+        raise HTTPException(status_code=429, detail=resume_analysis.QUOTA_MESSAGE)
 
     if is_gibberish(job_title):
         raise HTTPException(status_code=400, detail="Invalid job title. Please provide a clear title.")
 
-    name = file.filename
-    file_bytes = await file.read()
-    # We use /tmp which is the only writable directory on Vercel
-    tmp_path = os.path.join("/tmp", "resume_" + str(ObjectId()) + "_" + name.replace(" ", "_"))
-    with open(tmp_path, "wb") as f:
-        f.write(file_bytes)
-    try:
-        text, mime = extract_resume_text(tmp_path)
-    finally:
-        if os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except Exception as e:
-                print(f"Warning: Failed to delete temp file {tmp_path}: {e}")
-        
-    # Initialize RAG Engine lazily
-    try:
-        from backend.services.rag_engine import rag_engine
-        rag_engine.initialize()
-    except Exception as e:
-        print(f"DEBUG: Non-critical failure in lazy RAG initialization: {e}")
-
-    feedback = get_feedback(text)
-
-    # Validate if it's actually a resume
-    # We add a small fallback check: if the text is long enough and contains certain keywords, 
-    # we might override the AI's false negative if it's borderline.
-    is_valid_resume = feedback.get("IsResume", True)
-    resume_text_lower = text.lower()
-    keywords_check = ["experience", "education", "skills", "projects", "achievement", "summary", "contact"]
-    has_structure = sum(1 for kw in keywords_check if kw in resume_text_lower) >= 2
-    
-    if not is_valid_resume and has_structure and len(text) > 300:
-        # Override false negative from AI if the text clearly has resume-like structure
-        is_valid_resume = True
-        feedback["IsResume"] = True
-        if feedback.get("Score") == 0:
-            feedback["Score"] = 40 # Give a base score if it was 0
-
-    if not is_valid_resume:
-        raise HTTPException(
-            status_code=400, 
-            detail="The uploaded file does not appear to be a professional resume or CV. Please ensure the file contains your professional experience, education, and skills."
-        )
-    
-    # Use AI detected job title if it's available and the provided one is generic
-    ai_detected_title = feedback.get("DetectedJobTitle")
-    final_job_title = job_title
-    if ai_detected_title and (len(job_title) < 3 or job_title.lower() in ["software", "engineer", "intern", "manager"]):
-        final_job_title = ai_detected_title
-
-    # Increment daily count only after successful analysis
-    await increment_daily_limit(current["id"], "daily_resume_count")
-    
-    # Update user status and target job title
-    user_id_obj = None
-    try:
-        user_id_obj = ObjectId(current["id"])
-    except:
-        user_id_obj = current["id"]
-
-    update_data = {"has_analyzed": True, "target_job_title": final_job_title}
-    if feedback.get("Location"):
-        update_data["target_location"] = feedback["Location"]
-
-    await users.update_one(
-        {"_id": user_id_obj}, 
-        {"$set": update_data}
+    # Type sniffed from the first chunk, size capped and hashed while reading
+    upload = await read_upload(file)
+
+    # Parsing and the LLM call run in an analysis job; the client polls
+    # /api/resume/jobs/{job_id} or follows /api/resume/jobs/{job_id}/events
+    job, deduplicated = await analysis_queue.enqueue(
+        resume_analysis.KIND,
+        current["id"],
+        {"filename": file.filename, "job_title": job_title, "consent": consent, "kind": upload["kind"], "sha256": upload["sha256"]},
+        file_bytes=upload["data"],
+        dedupe_key=resume_analysis.upload_dedupe_key(current["id"], job_title, consent, upload["sha256"]),
     )
+    job_id = str(job["_id"])
+
+    if wait:
+        job = await analysis_queue.wait(job_id, ANALYSIS_WAIT_SECONDS) or job
+        if job.get("status") == SUCCEEDED:
+            return JSONResponse(jsonable_encoder(job["result"]))
+        if job.get("status") == FAILED:
+            raise HTTPException(status_code=job["error"]["status_code"], detail=job["error"]["detail"])
+
+    response.headers["Location"] = f"/api/resume/jobs/{job_id}"
+    response.headers["Retry-After"] = "1"
+    return {
+        "job_id": job_id,
+        "status": job.get("status"),
+        "deduplicated": deduplicated,
+        "status_url": f"/api/resume/jobs/{job_id}",
+        "events_url": f"/api/resume/jobs/{job_id}/events",
+    }
 
-    if consent:
-        # Store file in GridFS
-        try:
-            bucket = await fs.get_fs()
-            grid_id = await bucket.upload_from_stream(name, file_bytes)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to store file: {e}")
-        doc = {
-            "resume_id": str(ObjectId()),
-            "user_id": current["id"],
-            "filename": name,
-            "mime_type": mime,
-            "consent": consent,
-            "file_id": str(grid_id),
-            "text": text,
-            "job_title": final_job_title,
-            "feedback": feedback,
-            "status": "pending",
-            "tags": feedback.get("Keywords", []),
-            "notes": "",
-            "created_at": get_malaysia_time(),
-        }
-        res = await resumes.insert_one(doc)
-        return {"id": str(res.inserted_id), "feedback": feedback, "job_title": final_job_title}
-    else:
-        return {"id": None, "feedback": feedback, "job_title": final_job_title}
+async def _get_own_job(job_id: str, current) -> dict:
+    job = await analysis_queue.get(job_id)
+    if not job or job.get("user_id") != current["id"]:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(
+    job_id: str,
+    response: Response,
+    wait: float = Query(0, ge=0, description="Seconds to wait for the job to finish before answering"),
+    current=Depends(get_current_user),
+):
+    job = await _get_own_job(job_id, current)
+    if job["status"] not in TERMINAL:
+        # Make sure this process works on the queue (serverless instances start idle)
+        analysis_queue.kick()
+        if wait:
+            job = await analysis_queue.wait(job_id, min(wait, ANALYSIS_WAIT_SECONDS)) or job
+    if job["status"] not in TERMINAL:
+        response.headers["Retry-After"] = "1"
+    return job_view(job)
+
+@router.get("/jobs/{job_id}/events")
+async def analysis_job_events(job_id: str, current=Depends(get_current_user)):
+    """Server-sent events: one `status` event per state change, ending with the finished job."""
+    job = await _get_own_job(job_id, current)
+
+    async def stream():
+        last = None
+        current_job = job
+        while True:
+            view = job_view(current_job)
+            if view["status"] != last:
+                last = view["status"]
+                yield f"event: status\ndata: {json.dumps(jsonable_encoder(view))}\n\n"
+            else:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+            if last in TERMINAL:
+                return
+            current_job = await analysis_queue.wait(job_id, SSE_KEEPALIVE_SECONDS)
+            if current_job is None:
+                return
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/manual-upload")
+@idempotent
 async def manual_upload_profile(
     data: ManualProfileIn,
     current=Depends(get_current_user),
@@ -143,8 +141,9 @@ async def manual_upload_profile(
     if current.get("role") != "user":
         raise HTTPException(status_code=403, detail="Only regular users can build profiles")
     
-    can_upload, remaining = await check_daily_limit(current["id"], "daily_resume_count", 5)
+    can_upload, remaining = await check_daily_limit(current["id"], "daily_resume_count", DAILY_RESUME_LIMIT)
     if not can_upload:
+        rate_limit_rejections.labels("daily_resume").inc()
         raise HTTPException(status_code=429, detail="Daily profile analysis limit reached. Resets at 00:00 Malaysia Time.")
 
     # Construct virtual resume text
@@ -156,7 +155,8 @@ async def manual_upload_profile(
     KEY ACHIEVEMENT: {data.achievement}
     """
     
-    feedback = get_feedback(text)
+    async with usage.track(current["id"], "resume_analysis"):
+        feedback = await get_feedback_async(text, current["id"])
 
     # Increment daily count
     await increment_daily_limit(current["id"], "daily_resume_count")
@@ -195,6 +195,7 @@ async def manual_upload_profile(
         "created_at": get_malaysia_time(),
     }
     await resumes.insert_one(doc)
+    await user_summary.record_resume_analyzed(current["id"], feedback, final_job_title, doc["filename"], stored=True)
     
     return {"feedback": feedback, "job_title": final_job_title}
 
@@ -1,9 +1,23 @@
+import asyncio
+import copy
 import json
 import re
 from typing import List, Dict, Any
-from mistralai import Mistral
-from backend.config import MISTRAL_API_KEY
+from backend.config import MISTRAL_API_KEY, RAG_CONTEXT_MAX_CHARS, RAG_TOP_K, RESUME_PROMPT_MAX_TOKENS
 from backend.services.rag_engine import rag_engine
+from backend.services.llm_client import chat_complete
+from backend.services.resume_parser import split_resume_sections
+from backend.services.single_flight import content_key, llm_flight
+from backend.services.token_budget import fit_resume_prompt
+from backend.services.tracing import traced
+
+_feedback_flight = llm_flight("get_feedback")
+
+def resume_queries(text: str) -> List[str]:
+    """RAG queries for a resume: one per detected section, or the whole text when none is found."""
+    sections = split_resume_sections(text)
+    queries = [body for name, body in sections.items() if name != "header"]
+    return queries or [text]
 
 def build_resume_prompt(text: str, context: str = "") -> str:
     prompt = (
@@ -59,6 +73,7 @@ def parse_json_response(resp: str) -> Dict[str, Any]:
             "DetectedJobTitle": ""
         }
 
+@traced("service.get_feedback")
 def get_feedback(text: str) -> Dict[str, Any]:
     if not MISTRAL_API_KEY:
         return {
@@ -72,18 +87,22 @@ def get_feedback(text: str) -> Dict[str, Any]:
             "DetectedJobTitle": "Software Engineer"
         }
     
-    # RAG Step: Retrieve relevant context based on resume content
-    # We take the first 1000 characters for retrieval to avoid overhead
-    relevant_chunks = rag_engine.retrieve(text[:1000], top_k=5)
-    context = "\n---\n".join(relevant_chunks)
+    relevant_chunks = rag_engine.retrieve_many(resume_queries(text), top_k=RAG_TOP_K, max_chars=RAG_CONTEXT_MAX_CHARS)
+    prompt, budget = fit_resume_prompt(build_resume_prompt, text, relevant_chunks, RESUME_PROMPT_MAX_TOKENS)
+    budget.record()
     
-    client = Mistral(api_key=MISTRAL_API_KEY)
-    
-    completion = client.chat.complete(
+    completion = chat_complete(
         model="mistral-large-latest",
-        messages=[{"role": "user", "content": build_resume_prompt(text, context)}],
+        messages=[{"role": "user", "content": prompt}],
         temperature=0.2,
         response_format={"type": "json_object"}
     )
     content = completion.choices[0].message.content
     return parse_json_response(content)
+
+async def get_feedback_async(text: str, user_id: str) -> Dict[str, Any]:
+    """get_feedback in a worker thread; one user's identical concurrent analyses share one completion."""
+    # Scoped to the user: results are cached across processes, never across accounts
+    feedback = await _feedback_flight.do(content_key(user_id, text), lambda: asyncio.to_thread(get_feedback, text))
+    # Callers adjust the feedback in place; keep the shared result intact
+    return copy.deepcopy(feedback)
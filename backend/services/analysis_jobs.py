@@ -0,0 +1,340 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from bson import Binary, ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from backend.config import (
+    ANALYSIS_JOB_TTL_SECONDS, ANALYSIS_LEASE_SECONDS, ANALYSIS_MAX_ATTEMPTS, ANALYSIS_WORKERS,
+)
+from backend.db import analysis_jobs
+from backend.services.metrics import REGISTRY, analysis_job_duration, analysis_jobs_total
+from backend.services.utils import get_malaysia_time
+
+logger = logging.getLogger(__name__)
+
+# Slow analyses (resume parsing + LLM) run as jobs instead of inside the HTTP request.
+#
+# Jobs live in the analysis_jobs collection, so any process can pick them up: a worker
+# claims the oldest runnable job with find_one_and_update and holds it under a lease
+# (lease_until) that it renews while the handler runs. A job whose worker died is
+# claimed again once the lease expires. Handler exceptions are retried with exponential
+# backoff up to ANALYSIS_MAX_ATTEMPTS; JobError is a final answer (bad file, quota) and
+# is not retried. Finished jobs drop their file and expire after ANALYSIS_JOB_TTL_SECONDS.
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+TERMINAL = (SUCCEEDED, FAILED)
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobError(Exception):
+    """A non-retryable job failure, reported to the client like an HTTPException."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _seconds_since(value: datetime) -> float:
+    # MongoDB returns naive datetimes in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return max(0.0, (get_malaysia_time() - value).total_seconds())
+
+
+def job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public representation of a job (never includes the uploaded file)."""
+    return {
+        "job_id": str(job["_id"]),
+        "kind": job.get("kind"),
+        "status": job.get("status"),
+        "attempts": job.get("attempts", 0),
+        "created_at": job.get("created_at"),
+        "finished_at": job.get("finished_at"),
+        "result": job.get("result"),
+        "error": job.get("error"),
+    }
+
+
+class AnalysisQueue:
+    def __init__(
+        self,
+        collection,
+        workers: int = 2,
+        max_attempts: int = 3,
+        lease_seconds: float = 120,
+        ttl_seconds: float = 3600,
+        poll_interval: float = 1.0,
+        retry_delay: float = 2.0,
+    ):
+        self.collection = collection
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.handlers: Dict[str, Handler] = {}
+
+        self._id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._loop = None
+        self._wake: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._waiters: Dict[str, asyncio.Event] = {}
+        self._running = 0
+        self._stopping = False
+
+    def register(self, kind: str, handler: Handler):
+        self.handlers[kind] = handler
+
+    def _ensure_started(self):
+        """Binds the wake-up event and worker tasks to the running loop (re-created if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._wake is None or self._loop is not loop:
+            self._wake = asyncio.Event()
+            self._waiters = {}
+            self._loop = loop
+            self._tasks = []
+        self._stopping = False
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            name = f"{self._id}:{len(self._tasks)}"
+            self._tasks.append(loop.create_task(self._worker(name)))
+
+    def kick(self):
+        """Starts the workers if needed and wakes an idle one."""
+        if self.workers <= 0:
+            return
+        self._ensure_started()
+        self._wake.set()
+
+    async def enqueue(
+        self,
+        kind: str,
+        user_id: str,
+        payload: Dict[str, Any],
+        file_bytes: Optional[bytes] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queues a job and returns (job, deduplicated). With a `dedupe_key`, an identical
+        job that is still queued, running or recently succeeded is returned instead.
+        """
+        now = get_malaysia_time()
+        doc = {
+            "kind": kind,
+            "user_id": user_id,
+            "payload": payload,
+            "status": QUEUED,
+            "attempts": 0,
+            "run_after": now,
+            "created_at": now,
+        }
+        if file_bytes is not None:
+            doc["file"] = Binary(file_bytes)
+        if dedupe_key:
+            doc["dedupe_key"] = dedupe_key
+
+        for _ in range(2):
+            try:
+                await self.collection.insert_one(doc)
+                analysis_jobs_total.labels(kind, "enqueued").inc()
+                self.kick()
+                return doc, False
+            except DuplicateKeyError:
+                doc.pop("_id", None)
+                existing = await self.collection.find_one({"dedupe_key": dedupe_key}, {"file": 0})
+                if existing is not None:
+                    analysis_jobs_total.labels(kind, "deduplicated").inc()
+                    self.kick()
+                    return existing, True
+                # The duplicate failed and released its key in between; insert again
+        raise RuntimeError("Could not enqueue analysis job")
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            oid = ObjectId(job_id)
+        except (InvalidId, TypeError):
+            return None
+        return await self.collection.find_one({"_id": oid}, {"file": 0})
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Returns the job once it is finished, or its latest state after `timeout` seconds.
+        Jobs finished in this process wake the waiter at once; jobs finished elsewhere
+        are noticed on the next re-read (every poll_interval).
+        """
+        deadline = asyncio.get_running_loop().time() + max(0.0, timeout)
+        while True:
+            job = await self.get(job_id)
+            if job is None or job.get("status") in TERMINAL:
+                self._waiters.pop(job_id, None)
+                return job
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return job
+            self.kick()
+            event = self._waiters.setdefault(job_id, asyncio.Event())
+            try:
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, self.poll_interval))
+            except asyncio.TimeoutError:
+                pass
+
+    async def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Takes the oldest runnable job (queued and due, or running with an expired lease)."""
+        now = get_malaysia_time()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": QUEUED, "run_after": {"$lte": now}},
+                {"status": RUNNING, "lease_until": {"$lt": now}},
+            ]},
+            {
+                "$set": {"status": RUNNING, "worker": worker, "lease_until": now + timedelta(seconds=self.lease_seconds), "started_at": now},
+                "$inc": {"attempts": 1},
+            },
+            sort=[("run_after", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _renew_lease(self, job_id, worker: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self.collection.update_one(
+                {"_id": job_id, "worker": worker, "status": RUNNING},
+                {"$set": {"lease_until": get_malaysia_time() + timedelta(seconds=self.lease_seconds)}},
+            )
+
+    async def _finish(self, job: Dict[str, Any], worker: str, fields: Dict[str, Any]):
+        now = get_malaysia_time()
+        unset = {"file": "", "lease_until": ""}
+        if fields["status"] == FAILED:
+            # A failed upload may be retried by the user with the same file
+            unset["dedupe_key"] = ""
+        res = await self.collection.update_one(
+            {"_id": job["_id"], "worker": worker, "status": RUNNING},
+            {"$set": {**fields, "finished_at": now, "expires_at": now + timedelta(seconds=self.ttl_seconds)}, "$unset": unset},
+        )
+        if not res.modified_count:
+            logger.warning("Analysis job %s finished after its lease was taken over", job["_id"])
+        analysis_jobs_total.labels(job["kind"], fields["status"]).inc()
+        event = self._waiters.pop(str(job["_id"]), None)
+        if event is not None:
+            event.set()
+
+    async def run_one(self, job: Dict[str, Any], worker: str):
+        """Runs a claimed job through its handler and records the outcome."""
+        kind = job["kind"]
+        if job.get("attempts") == 1 and job.get("created_at") is not None:
+            analysis_job_duration.labels(kind, "queued").observe(_seconds_since(job["created_at"]))
+
+        if job.get("attempts", 1) > self.max_attempts:
+            # Only reachable when workers keep dying mid-job (lease expiry re-claims)
+            await self._finish(job, worker, {"status": FAILED, "error": {"status_code": 500, "detail": "Analysis failed. Please try again."}})
+            return
+
+        handler = self.handlers.get(kind)
+        if handler is None:
+            await self._finish(job, worker, {"status": FAILED, "error": {"status_code": 500, "detail": f"No handler for job kind '{kind}'"}})
+            return
+
+        renewer = asyncio.create_task(self._renew_lease(job["_id"], worker))
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        try:
+            result = await handler(job)
+        except JobError as e:
+            await self._finish(job, worker, {"status": FAILED, "error": {"status_code": e.status_code, "detail": e.detail}})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Analysis job %s attempt %d failed: %s", job["_id"], job.get("attempts", 1), e)
+            if job.get("attempts", 1) >= self.max_attempts:
+                await self._finish(job, worker, {"status": FAILED, "error": {"status_code": 500, "detail": "Analysis failed. Please try again."}, "last_error": str(e)})
+            else:
+                delay = self.retry_delay * 2 ** (job.get("attempts", 1) - 1)
+                await self.collection.update_one(
+                    {"_id": job["_id"], "worker": worker, "status": RUNNING},
+                    {"$set": {"status": QUEUED, "run_after": get_malaysia_time() + timedelta(seconds=delay), "last_error": str(e)},
+                     "$unset": {"lease_until": "", "worker": ""}},
+                )
+                analysis_jobs_total.labels(kind, "retried").inc()
+        else:
+            await self._finish(job, worker, {"status": SUCCEEDED, "result": result})
+        finally:
+            renewer.cancel()
+            analysis_job_duration.labels(kind, "run").observe(loop.time() - t0)
+
+    async def _worker(self, name: str):
+        failures = 0
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                job = await self.claim(name)
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not failures:
+                    logger.warning("Analysis worker %s could not claim a job: %s", name, e)
+                failures += 1
+                job = None
+            if job is None:
+                # Back off while the database is unreachable
+                idle = self.poll_interval * min(2 ** failures, 30)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=idle)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._running += 1
+            try:
+                await self.run_one(job, name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Analysis worker %s crashed on job %s: %s", name, job["_id"], e)
+            finally:
+                self._running -= 1
+
+    async def stop(self, timeout: float = 10.0):
+        """Lets in-flight jobs finish (up to `timeout`), then stops the workers (shutdown hook)."""
+        self._stopping = True
+        tasks = [t for t in self._tasks if not t.done()]
+        if self._wake is not None:
+            self._wake.set()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for t in pending:
+                # Unfinished jobs are re-claimed elsewhere when their lease expires
+                t.cancel()
+        self._tasks = []
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": len([t for t in self._tasks if not t.done()]),
+            "running": self._running,
+            "waiters": len(self._waiters),
+        }
+
+
+analysis_queue = AnalysisQueue(
+    analysis_jobs,
+    workers=ANALYSIS_WORKERS,
+    max_attempts=ANALYSIS_MAX_ATTEMPTS,
+    lease_seconds=ANALYSIS_LEASE_SECONDS,
+    ttl_seconds=ANALYSIS_JOB_TTL_SECONDS,
+)
+REGISTRY.gauge_func(
+    "icp_analysis_queue", "Analysis worker pool state in this process.", ("state",),
+    lambda: {(state,): value for state, value in analysis_queue.stats().items()},
+)
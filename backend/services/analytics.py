@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
+from backend.config import ANALYTICS_BACKFILL_DAYS, ANALYTICS_FINALIZE_AFTER_DAYS
+from backend.db import daily_rollups, interviews, job_state, resumes, usage
+from backend.services.utils import get_malaysia_time
+
+logger = logging.getLogger(__name__)
+
+# Admin reporting from pre-aggregated daily rollups.
+#
+# refresh_rollups() writes one document per Malaysia calendar day (`_id` = "YYYY-MM-DD")
+# computed with aggregation pipelines over that day's interviews and resumes. It is
+# incremental: a watermark in job_state marks the first day that may still change
+# (sessions created on a day can end the next one), so each run only recomputes the
+# days from the watermark to today. Reports then read O(days) rollup documents.
+# LLM cost (calls, tokens, latency per model and action) comes from the usage time series.
+
+MYT = timezone(timedelta(hours=8))
+STATE_ID = "daily_rollups"
+LEASE_SECONDS = 300
+TOP_TAGS = 50
+
+
+def _day_key(d: date) -> str:
+    return d.isoformat()
+
+
+def _day_bounds(d: date) -> Tuple[datetime, datetime]:
+    start = datetime(d.year, d.month, d.day, tzinfo=MYT)
+    return start, start + timedelta(days=1)
+
+
+def _to_myt_date(value: datetime) -> date:
+    # MongoDB returns naive datetimes in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(MYT).date()
+
+
+async def _sessions_by_role(start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    scored = {"$gt": [{"$ifNull": ["$readiness_score", None]}, None]}
+    unscored = {"$eq": [{"$ifNull": ["$readiness_score", None]}, None]}
+    ended = {"$gt": [{"$ifNull": ["$ended_at", None]}, None]}
+    pipeline = [
+        {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+        {"$group": {
+            "_id": {"job_title": "$job_title", "difficulty": "$difficulty"},
+            "sessions": {"$sum": 1},
+            "completed": {"$sum": {"$cond": [scored, 1, 0]}},
+            "ended_early": {"$sum": {"$cond": [{"$and": [ended, unscored]}, 1, 0]}},
+            "score_sum": {"$sum": "$readiness_score"},
+            "questions": {"$sum": "$asked_count"},
+        }},
+    ]
+    rows = []
+    async for row in interviews.aggregate(pipeline):
+        key = row.pop("_id") or {}
+        rows.append({"job_title": key.get("job_title") or "Unknown", "difficulty": key.get("difficulty") or "Beginner", **row})
+    return rows
+
+
+async def _uploads_by_type(start: datetime, end: datetime) -> Dict[str, int]:
+    pipeline = [
+        {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+        {"$group": {"_id": "$mime_type", "count": {"$sum": 1}}},
+    ]
+    return {(row["_id"] or "unknown"): row["count"] async for row in resumes.aggregate(pipeline)}
+
+
+async def _tag_counts(start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    pipeline = [
+        {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": TOP_TAGS},
+    ]
+    return [{"tag": row["_id"], "count": row["count"]} async for row in resumes.aggregate(pipeline)]
+
+
+async def _llm_usage(start: datetime, end: datetime) -> List[Dict[str, Any]]:
+    pipeline = [
+        {"$match": {"ts": {"$gte": start, "$lt": end}, "kind": "llm"}},
+        {"$group": {
+            "_id": {"action": "$meta.action", "model": "$model"},
+            "calls": {"$sum": 1},
+            "errors": {"$sum": {"$cond": [{"$eq": ["$outcome", "ok"]}, 0, 1]}},
+            "prompt_tokens": {"$sum": "$prompt_tokens"},
+            "completion_tokens": {"$sum": "$completion_tokens"},
+            "latency_ms": {"$sum": "$latency_ms"},
+        }},
+    ]
+    rows = []
+    async for row in usage.aggregate(pipeline):
+        key = row.pop("_id") or {}
+        rows.append({"action": key.get("action") or "unknown", "model": key.get("model") or "unknown", **row})
+    return rows
+
+
+async def compute_day(d: date) -> Dict[str, Any]:
+    """Builds the rollup document for one Malaysia calendar day."""
+    start, end = _day_bounds(d)
+    by_role = await _sessions_by_role(start, end)
+    uploads = await _uploads_by_type(start, end)
+    tags = await _tag_counts(start, end)
+    llm_usage = await _llm_usage(start, end)
+
+    sessions = {k: sum(r[k] for r in by_role) for k in ("sessions", "completed", "ended_early", "score_sum", "questions")}
+    manual = uploads.get("text/plain", 0)
+    return {
+        "_id": _day_key(d),
+        "day": _day_key(d),
+        "sessions": sessions,
+        "by_role": by_role,
+        "uploads": {"total": sum(uploads.values()), "files": sum(uploads.values()) - manual, "manual": manual, "by_type": uploads},
+        # Completions derived from the records they produced: one per question asked, one per
+        # early-end message and one per stored analysis (analyses without consent are not stored)
+        "llm": {
+            "interview_calls": sessions["questions"] + sessions["ended_early"],
+            "resume_calls": sum(uploads.values()),
+        },
+        "llm_usage": llm_usage,
+        "tags": tags,
+        "computed_at": get_malaysia_time(),
+    }
+
+
+async def _acquire_lease(now: datetime) -> bool:
+    try:
+        await job_state.update_one(
+            {"_id": STATE_ID, "$or": [{"locked_until": None}, {"locked_until": {"$lt": now}}]},
+            {"$set": {"locked_until": now + timedelta(seconds=LEASE_SECONDS)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # The state document exists and another run holds the lease
+        return False
+    return True
+
+
+async def _first_day(today: date) -> date:
+    earliest = today
+    for col in (interviews, resumes):
+        doc = await col.find_one({"created_at": {"$ne": None}}, {"created_at": 1}, sort=[("created_at", 1)])
+        if doc and doc.get("created_at"):
+            earliest = min(earliest, _to_myt_date(doc["created_at"]))
+    return max(earliest, today - timedelta(days=ANALYTICS_BACKFILL_DAYS))
+
+
+async def refresh_rollups(since: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Recomputes rollups from the watermark (or `since`) through today and advances the
+    watermark. Only one run proceeds at a time across instances (lease in job_state).
+    """
+    started = time.perf_counter()
+    now = get_malaysia_time()
+    if not await _acquire_lease(now):
+        return {"status": "busy"}
+    try:
+        today = now.date()
+        state = await job_state.find_one({"_id": STATE_ID}) or {}
+        if since is None and state.get("watermark"):
+            since = date.fromisoformat(state["watermark"])
+        elif since is None:
+            since = await _first_day(today)
+        # A watermark past today would make later runs skip the days in between
+        since = min(since, today)
+
+        d = since
+        refreshed = 0
+        while d <= today:
+            doc = await compute_day(d)
+            await daily_rollups.replace_one({"_id": doc["_id"]}, doc, upsert=True)
+            refreshed += 1
+            d += timedelta(days=1)
+
+        # Days before this one are final; later runs start here
+        watermark = max(since, today - timedelta(days=ANALYTICS_FINALIZE_AFTER_DAYS))
+        await job_state.update_one(
+            {"_id": STATE_ID},
+            {"$set": {"watermark": _day_key(watermark), "last_run_at": now, "last_run_days": refreshed}},
+        )
+        result = {
+            "status": "ok",
+            "from": _day_key(since),
+            "to": _day_key(today),
+            "days_refreshed": refreshed,
+            "watermark": _day_key(watermark),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        logger.info("Daily rollups refreshed: %d day(s) from %s", refreshed, result["from"], extra=result)
+        return result
+    finally:
+        await job_state.update_one({"_id": STATE_ID}, {"$set": {"locked_until": None}})
+
+
+def _llm_usage_view(calls: int = 0, errors: int = 0, prompt_tokens: int = 0, completion_tokens: int = 0, latency_ms: float = 0, **key) -> Dict[str, Any]:
+    return {
+        **key,
+        "calls": calls,
+        "errors": errors,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "average_latency_ms": round(latency_ms / calls, 1) if calls else None,
+    }
+
+
+async def get_report(start: date, end: date) -> Dict[str, Any]:
+    """Combines the rollups for [start, end] into an admin report."""
+    series = []
+    roles: Dict[Tuple[str, str], Dict[str, int]] = {}
+    tags: Counter = Counter()
+    models: Dict[str, Counter] = {}
+    actions: Dict[str, Counter] = {}
+    totals = Counter()
+    cur = daily_rollups.find({"_id": {"$gte": _day_key(start), "$lte": _day_key(end)}}).sort("_id", 1)
+    async for doc in cur:
+        s, u, llm = doc["sessions"], doc["uploads"], doc["llm"]
+        series.append({
+            "day": doc["day"],
+            "sessions": s["sessions"],
+            "completed": s["completed"],
+            "average_score": round(s["score_sum"] / s["completed"], 1) if s["completed"] else None,
+            "uploads": u["total"],
+            "llm_calls": llm["interview_calls"] + llm["resume_calls"],
+            "llm_tokens": sum(r["prompt_tokens"] + r["completion_tokens"] for r in doc.get("llm_usage", [])),
+        })
+        totals.update({
+            "sessions": s["sessions"], "completed": s["completed"], "ended_early": s["ended_early"],
+            "score_sum": s["score_sum"], "uploads": u["total"], "manual_profiles": u["manual"],
+            "interview_calls": llm["interview_calls"], "resume_calls": llm["resume_calls"],
+        })
+        for r in doc.get("by_role", []):
+            agg = roles.setdefault((r["job_title"], r["difficulty"]), Counter())
+            agg.update({"sessions": r["sessions"], "completed": r["completed"], "score_sum": r["score_sum"]})
+        tags.update({t["tag"]: t["count"] for t in doc.get("tags", [])})
+        for r in doc.get("llm_usage", []):
+            counts = {k: r[k] for k in ("calls", "errors", "prompt_tokens", "completion_tokens", "latency_ms")}
+            models.setdefault(r["model"], Counter()).update(counts)
+            actions.setdefault(r["action"], Counter()).update(counts)
+
+    by_role = [
+        {
+            "job_title": job_title,
+            "difficulty": difficulty,
+            "sessions": agg["sessions"],
+            "completed": agg["completed"],
+            "average_score": round(agg["score_sum"] / agg["completed"], 1) if agg["completed"] else None,
+        }
+        for (job_title, difficulty), agg in roles.items()
+    ]
+    by_role.sort(key=lambda r: r["sessions"], reverse=True)
+    llm_usage = {
+        "by_model": [_llm_usage_view(model=model, **agg) for model, agg in models.items()],
+        "by_action": [_llm_usage_view(action=action, **agg) for action, agg in actions.items()],
+    }
+    for rows in llm_usage.values():
+        rows.sort(key=lambda r: r["prompt_tokens"] + r["completion_tokens"], reverse=True)
+    state = await job_state.find_one({"_id": STATE_ID}, {"last_run_at": 1, "watermark": 1}) or {}
+    return {
+        "from": _day_key(start),
+        "to": _day_key(end),
+        "totals": {
+            "sessions": totals["sessions"],
+            "completed": totals["completed"],
+            "ended_early": totals["ended_early"],
+            "average_score": round(totals["score_sum"] / totals["completed"], 1) if totals["completed"] else None,
+            "uploads": totals["uploads"],
+            "manual_profiles": totals["manual_profiles"],
+            "llm_calls": {"interview": totals["interview_calls"], "resume": totals["resume_calls"]},
+        },
+        "series": series,
+        "by_role": by_role,
+        "llm_usage": llm_usage,
+        "tags": [{"tag": t, "count": c} for t, c in tags.most_common(TOP_TAGS)],
+        "last_refreshed_at": state.get("last_run_at"),
+    }
+
+
+async def run_scheduler(interval_seconds: float):
+    """Refreshes rollups periodically for long-running deployments (see ANALYTICS_ROLLUP_INTERVAL_MINUTES)."""
+    while True:
+        try:
+            await refresh_rollups()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Daily rollup refresh failed: %s", e)
+        await asyncio.sleep(interval_seconds)
@@ -1,14 +1,34 @@
 from datetime import datetime, timezone, timedelta
 from typing import Optional, Dict, Any
 from backend.db import audit_logs, users
-from backend.config import ADMIN_ALLOWLIST
-from backend.services.email_service import send_admin_alert
+from backend.config import (
+    ADMIN_ALLOWLIST, AUDIT_BATCH_ENABLED, AUDIT_QUEUE_MAX, AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL_SECONDS, AUDIT_OVERFLOW_POLICY
+)
+from backend.services.batch_writer import BatchWriter
+from backend.services.email_service import alert_dispatcher
+from backend.services.metrics import REGISTRY
 from backend.services.utils import get_malaysia_time
 import logging
 
-# Configure logging for console alerts
+# Security events go through the app-wide structured logger (see structured_log.configure_logging)
 logger = logging.getLogger("security_audit")
-logging.basicConfig(level=logging.INFO)
+
+# Audit events are buffered and written in batches off the request path. Security events
+# must not be lost, so batching is off by default on serverless (no shutdown flush there)
+# and an event the full queue will not take is written inline instead of being dropped.
+audit_writer = BatchWriter(
+    audit_logs,
+    name="audit_logs",
+    max_queue=AUDIT_QUEUE_MAX,
+    batch_size=AUDIT_BATCH_SIZE,
+    flush_interval=AUDIT_FLUSH_INTERVAL_SECONDS,
+    overflow=AUDIT_OVERFLOW_POLICY,
+)
+REGISTRY.gauge_func(
+    "icp_audit_writer", "Audit log writer queue counters.", ("state",),
+    lambda: {(state,): value for state, value in audit_writer.stats().items()},
+)
 
 async def log_event(
     user_id: Optional[str],
@@ -18,7 +38,7 @@ async def log_event(
     status: str,
     details: Optional[Dict[str, Any]] = None
 ):
-    """Records an event in the audit log collection."""
+    """Records an event in the audit log collection (queued for a batched write)."""
     log_doc = {
         "user_id": user_id,
         "email": email,
@@ -28,7 +48,8 @@ async def log_event(
         "details": details or {},
         "timestamp": get_malaysia_time()
     }
-    await audit_logs.insert_one(log_doc)
+    if not AUDIT_BATCH_ENABLED or not await audit_writer.put(log_doc):
+        await audit_logs.insert_one(log_doc)
     
     if status == "failure":
         logger.warning(f"SECURITY ALERT: {event_type} failed for {email} from IP {ip_address}")
@@ -53,12 +74,10 @@ async def check_admin_ip(email: str, ip_address: str) -> Dict[str, Any]:
         if last_ip and last_ip != clean_ip:
             is_anomaly = True
             
-    # DEBUG LOG for verification during testing
-    print(f"[SECURITY DEBUG] Admin IP Check for {email}:")
-    print(f"  - Current IP: {clean_ip}")
-    print(f"  - Is in Allowlist: {is_allowed}")
-    print(f"  - Previous IP: {last_ip}")
-    print(f"  - Is Anomaly: {is_anomaly}")
+    logger.debug(
+        "Admin IP check for %s", email,
+        extra={"ip_address": clean_ip, "is_allowed": is_allowed, "last_ip": last_ip, "is_anomaly": is_anomaly},
+    )
 
     return {
         "is_allowed": is_allowed,
@@ -67,21 +86,11 @@ async def check_admin_ip(email: str, ip_address: str) -> Dict[str, Any]:
     }
 
 async def trigger_admin_alert(email: str, ip_address: str, reason: str):
-    """Sends an email alert for suspicious admin activity."""
+    """Queues an email alert for suspicious admin activity (delivered in the background)."""
     alert_msg = f"Security Alert for Admin Account: {email}\n\nReason: {reason}\nIP Address: {ip_address}\nTimestamp: {get_malaysia_time()}"
     
-    # VISUAL CONSOLE ALERT
-    print(f"\n{'='*60}")
-    print(f"!!! SECURITY ALERT TRIGGERED !!!")
-    print(f"Admin: {email}")
-    print(f"Reason: {reason}")
-    print(f"IP: {ip_address}")
-    print(f"{'='*60}\n")
-    
-    logger.critical(alert_msg)
+    logger.critical(alert_msg, extra={"admin_email": email, "reason": reason, "ip_address": ip_address})
     
-    # send_admin_alert now fetches admin emails from the database automatically
+    # The dispatcher resolves admin recipients and fans out the emails off the request path
     subject = f"Security Alert: Suspicious Admin Activity ({email})"
-    print(f"[DEBUG] Calling send_admin_alert for {email}...")
-    await send_admin_alert(subject, alert_msg, offender_email=email)
-    print(f"[DEBUG] send_admin_alert call completed.")
+    alert_dispatcher.enqueue(subject, alert_msg, offender_email=email)
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+
+
+class BatchWriter:
+    """
+    Buffers documents in a bounded in-memory queue and writes them with
+    insert_many from a background task, either when a batch fills up or when
+    the flush interval elapses.
+
+    When the queue is full the overflow policy decides what happens:
+    - "drop_newest": the incoming document is discarded
+    - "drop_oldest": the oldest queued document is discarded to make room
+    - "block": the caller waits up to `put_timeout` seconds, then drops
+    Every outcome is counted in `stats()`.
+    """
+
+    def __init__(
+        self,
+        collection,
+        name: str,
+        max_queue: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        overflow: str = DROP_NEWEST,
+        put_timeout: float = 0.05,
+    ):
+        self.collection = collection
+        self.name = name
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.put_timeout = put_timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop = None
+        self._stopping = False
+        self._counters = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "batches": 0,
+        }
+
+    def _ensure_started(self):
+        """Binds the queue and flusher task to the running loop (re-created if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            if self._queue is not None and self._queue.qsize():
+                # The previous loop is gone (serverless re-execution); its buffer cannot be flushed
+                self._counters["dropped"] += self._queue.qsize()
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._loop = loop
+            self._task = None
+        self._stopping = False
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    async def put(self, doc: Dict[str, Any]) -> bool:
+        """Queues a document for writing. Returns False if it was dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(doc)
+            self._counters["enqueued"] += 1
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow == DROP_OLDEST:
+            try:
+                self._queue.get_nowait()
+                self._counters["dropped"] += 1
+            except asyncio.QueueEmpty:
+                pass
+            self._queue.put_nowait(doc)
+            self._counters["enqueued"] += 1
+            return True
+
+        if self.overflow == BLOCK:
+            try:
+                await asyncio.wait_for(self._queue.put(doc), timeout=self.put_timeout)
+                self._counters["enqueued"] += 1
+                return True
+            except asyncio.TimeoutError:
+                pass
+
+        self._counters["dropped"] += 1
+        logger.warning(f"{self.name} queue full ({self.max_queue}); dropping document")
+        return False
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+            self._counters["written"] += len(batch)
+            self._counters["batches"] += 1
+        except Exception as e:
+            self._counters["failed"] += len(batch)
+            logger.error(f"{self.name} batch write of {len(batch)} documents failed: {e}")
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                first = await asyncio.wait_for(self._queue.get(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                continue
+            batch = [first] + self._drain(self.batch_size - 1)
+            if len(batch) < self.batch_size and not self._stopping:
+                # Give a partial batch a short window to fill up before writing
+                await asyncio.sleep(min(self.flush_interval, 0.05))
+                batch += self._drain(self.batch_size - len(batch))
+            await self._write(batch)
+
+    async def flush(self):
+        """Writes everything currently queued, in batches."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            await self._write(batch)
+
+    async def stop(self, timeout: float = 5.0):
+        """Stops the background task and flushes the remaining queue (shutdown hook)."""
+        self._stopping = True
+        if self._task is not None and not self._task.done():
+            try:
+                # Let an in-flight batch finish instead of cancelling it mid-write
+                await asyncio.wait_for(self._task, timeout=self.flush_interval + timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        data = dict(self._counters)
+        data["queued"] = self._queue.qsize() if self._queue is not None else 0
+        return data
@@ -1,42 +1,124 @@
 from backend.config import (
-    ADMIN_ALERT_EMAILJS_PUBLIC_KEY, ADMIN_ALERT_EMAILJS_SERVICE_ID, ADMIN_ALERT_EMAILJS_TEMPLATE_ID
+    ADMIN_ALERT_EMAILJS_PUBLIC_KEY, ADMIN_ALERT_EMAILJS_SERVICE_ID, ADMIN_ALERT_EMAILJS_TEMPLATE_ID,
+    ADMIN_ALERT_MAX_CONCURRENCY, ADMIN_ALERT_MAX_RETRIES, ADMIN_ALERT_RECIPIENTS_TTL_SECONDS
 )
 from backend.db import users
+from backend.services.metrics import record_cache
+from typing import TYPE_CHECKING, List, Optional
+import asyncio
 import logging
-import httpx
+import random
+import time
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
-async def send_admin_alert(subject: str, message: str, offender_email: str = "Unknown"):
+EMAILJS_SEND_URL = "https://api.emailjs.com/api/v1.0/email/send"
+
+
+class AlertDispatcher:
     """
-    Sends a security alert email to all admins/super_admins found in the database 
-    using the EmailJS REST API.
+    Delivers admin security alerts off the request path.
+
+    - One pooled httpx.AsyncClient is shared by every alert (re-created if the event loop changes)
+    - Recipients are fanned out concurrently with asyncio.gather, capped by a semaphore
+    - Transient failures (network errors, 429, 5xx) are retried with exponential backoff
+    - The admin recipient list is cached for a short TTL instead of queried per alert
     """
-    if not all([ADMIN_ALERT_EMAILJS_SERVICE_ID, ADMIN_ALERT_EMAILJS_TEMPLATE_ID, ADMIN_ALERT_EMAILJS_PUBLIC_KEY]):
-        logger.error("Admin EmailJS configuration missing. Cannot send email alert.")
-        return False
 
-    # Find all admins and super_admins in the database
-    admin_emails = []
-    try:
-        cursor = users.find({"role": {"$in": ["admin", "super_admin"]}})
+    def __init__(self, max_concurrency: int = 5, max_retries: int = 3, backoff_base: float = 0.5, recipients_ttl: float = 300):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.recipients_ttl = recipients_ttl
+
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._loop = None
+        self._recipients: List[str] = []
+        self._recipients_expire_at = 0.0
+        self._pending = set()
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            # Deferred so that importing this module (pulled in by the auth routes) stays cheap
+            import httpx
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(10.0, connect=5.0),
+                limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            )
+            self._loop = loop
+        return self._client
+
+    async def get_admin_recipients(self, refresh: bool = False) -> List[str]:
+        """Returns the emails of all admins/super_admins, cached for `recipients_ttl` seconds."""
+        now = time.monotonic()
+        if not refresh and self._recipients and now < self._recipients_expire_at:
+            record_cache("admin_recipients", True)
+            return list(self._recipients)
+        record_cache("admin_recipients", False)
+
+        admin_emails = []
+        cursor = users.find({"role": {"$in": ["admin", "super_admin"]}}, {"email": 1})
         async for admin in cursor:
             if "email" in admin:
                 admin_emails.append(admin["email"])
-        
-        # Log found admins for debugging
-        logger.info(f"Found {len(admin_emails)} admins for security alert: {admin_emails}")
-    except Exception as e:
-        logger.error(f"Error fetching admin emails from database: {str(e)}")
-        return False
+        self._recipients = admin_emails
+        self._recipients_expire_at = now + self.recipients_ttl
+        return list(admin_emails)
+
+    def invalidate_recipients(self):
+        """
+        Drops this process's cached recipient list; call it after changing a role in-process.
+        Role changes made elsewhere (create_admin_cli.py, another instance) are picked up
+        when the cache expires, i.e. within `recipients_ttl` seconds.
+        """
+        self._recipients_expire_at = 0.0
+
+    async def _post_with_retry(self, client: "httpx.AsyncClient", semaphore: asyncio.Semaphore, admin_email: str, payload: dict) -> bool:
+        for attempt in range(self.max_retries + 1):
+            retryable = True
+            try:
+                async with semaphore:
+                    response = await client.post(EMAILJS_SEND_URL, json=payload)
+                if response.status_code == 200:
+                    logger.info(f"Security alert email sent to {admin_email} via EmailJS")
+                    return True
+                retryable = response.status_code == 429 or response.status_code >= 500
+                logger.error(f"Failed to send EmailJS alert to {admin_email}: {response.status_code} - {response.text}")
+            except Exception as e:
+                logger.error(f"Exception while sending EmailJS alert to {admin_email}: {str(e)}")
 
-    if not admin_emails:
-        logger.warning("No users with admin or super_admin role found in database. Alert only logged to terminal.")
-        logger.info(f"PENDING ALERT: {subject} - {message}")
+            if not retryable or attempt == self.max_retries:
+                break
+            # Exponential backoff with jitter: 0.5s, 1s, 2s, ... (+ up to 50%)
+            delay = self.backoff_base * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
         return False
 
-    success_count = 0
-    async with httpx.AsyncClient() as client:
+    async def send(self, subject: str, message: str, offender_email: str = "Unknown") -> bool:
+        """Sends the alert to every admin concurrently. Returns True if at least one email was delivered."""
+        if not all([ADMIN_ALERT_EMAILJS_SERVICE_ID, ADMIN_ALERT_EMAILJS_TEMPLATE_ID, ADMIN_ALERT_EMAILJS_PUBLIC_KEY]):
+            logger.error("Admin EmailJS configuration missing. Cannot send email alert.")
+            return False
+
+        try:
+            admin_emails = await self.get_admin_recipients()
+            logger.info(f"Found {len(admin_emails)} admins for security alert: {admin_emails}")
+        except Exception as e:
+            logger.error(f"Error fetching admin emails from database: {str(e)}")
+            return False
+
+        if not admin_emails:
+            logger.warning("No users with admin or super_admin role found in database. Alert only logged to terminal.")
+            logger.info(f"PENDING ALERT: {subject} - {message}")
+            return False
+
+        client = self._get_client()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = []
         for admin_email in admin_emails:
             # Template parameters for the Admin EmailJS template
             template_params = {
@@ -45,29 +127,51 @@ async def send_admin_alert(subject: str, message: str, offender_email: str = "Un
                 "admin_message": f"Security Alert: {subject}\n\n{message}",
                 "offender_email": offender_email
             }
-
             payload = {
                 "service_id": ADMIN_ALERT_EMAILJS_SERVICE_ID,
                 "template_id": ADMIN_ALERT_EMAILJS_TEMPLATE_ID,
                 "user_id": ADMIN_ALERT_EMAILJS_PUBLIC_KEY,
                 "template_params": template_params
             }
+            tasks.append(self._post_with_retry(client, semaphore, admin_email, payload))
 
-            try:
-                logger.debug(f"Sending alert to {admin_email}...")
-                logger.debug(f"Payload: {payload}")
-                response = await client.post(
-                    "https://api.emailjs.com/api/v1.0/email/send",
-                    json=payload,
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    logger.info(f"Security alert email sent to {admin_email} via EmailJS")
-                    success_count += 1
-                else:
-                    logger.error(f"Failed to send EmailJS alert to {admin_email}: {response.status_code} - {response.text}")
-            except Exception as e:
-                logger.error(f"Exception while sending EmailJS alert to {admin_email}: {str(e)}")
+        results = await asyncio.gather(*tasks)
+        return any(results)
+
+    def enqueue(self, subject: str, message: str, offender_email: str = "Unknown") -> asyncio.Task:
+        """Schedules the alert in the background and returns immediately."""
+        task = asyncio.get_running_loop().create_task(self.send(subject, message, offender_email))
+        # Keep a strong reference until the task finishes so it is not garbage collected
+        self._pending.add(task)
+        task.add_done_callback(self._on_done)
+        return task
+
+    def _on_done(self, task: asyncio.Task):
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Admin alert dispatch failed: {task.exception()}")
 
-    return success_count > 0
+    async def close(self, timeout: float = 10.0):
+        """Waits for in-flight alerts (shutdown hook) and closes the shared HTTP client."""
+        pending = [t for t in self._pending if t.get_loop() is asyncio.get_running_loop()]
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+
+alert_dispatcher = AlertDispatcher(
+    max_concurrency=ADMIN_ALERT_MAX_CONCURRENCY,
+    max_retries=ADMIN_ALERT_MAX_RETRIES,
+    recipients_ttl=ADMIN_ALERT_RECIPIENTS_TTL_SECONDS,
+)
+
+
+async def send_admin_alert(subject: str, message: str, offender_email: str = "Unknown"):
+    """
+    Sends a security alert email to all admins/super_admins found in the database
+    using the EmailJS REST API.
+    """
+    return await alert_dispatcher.send(subject, message, offender_email)
@@ -0,0 +1,169 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+from fastapi import Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pymongo.errors import DuplicateKeyError
+from backend.config import IDEMPOTENCY_LOCK_SECONDS, IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_WAIT_SECONDS
+from backend.db import idempotency_keys
+from backend.services.metrics import idempotent_requests
+from backend.services.utils import get_malaysia_time
+
+logger = logging.getLogger(__name__)
+
+# Optional Idempotency-Key support for non-idempotent POST endpoints.
+#
+# The first request with a key claims a record in idempotency_keys and runs the handler;
+# its outcome (body, explicit headers, or a 4xx HTTPException) is stored and replayed for
+# every repeat of the key within IDEMPOTENCY_TTL_SECONDS (TTL index on expires_at). A
+# repeat that arrives while the first is still running waits for it. Keys are scoped to
+# the user and the request path. Server errors are not stored, so a retry runs again.
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+IN_PROGRESS = "in_progress"
+DONE = "done"
+
+
+def _record_id(user_id: str, path: str, key: str) -> str:
+    return hashlib.sha256(f"{user_id}\0{path}\0{key}".encode("utf-8")).hexdigest()
+
+
+async def _claim(record_id: str, user_id: str, path: str) -> Optional[Dict[str, Any]]:
+    """None if this request now owns the key, otherwise the existing record."""
+    now = get_malaysia_time()
+    lock = {
+        "status": IN_PROGRESS,
+        "user_id": user_id,
+        "path": path,
+        "locked_until": now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS),
+        "expires_at": now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+    }
+    try:
+        await idempotency_keys.insert_one({"_id": record_id, **lock})
+        return None
+    except DuplicateKeyError:
+        pass
+    # A request that crashed without releasing its lock
+    res = await idempotency_keys.update_one(
+        {"_id": record_id, "status": IN_PROGRESS, "locked_until": {"$lt": now}},
+        {"$set": lock},
+    )
+    if res.modified_count:
+        return None
+    return await idempotency_keys.find_one({"_id": record_id}) or {"status": IN_PROGRESS}
+
+
+async def _wait_for_result(record_id: str, user_id: str, path: str, route: str) -> Optional[Dict[str, Any]]:
+    """Waits for a concurrent request with the same key. None if the key became free."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + IDEMPOTENCY_WAIT_SECONDS
+    delay = 0.05
+    while True:
+        record = await _claim(record_id, user_id, path)
+        if record is None or record.get("status") == DONE:
+            return record
+        if loop.time() >= deadline:
+            idempotent_requests.labels(route, "conflict").inc()
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still being processed. Please retry shortly.")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 0.5)
+
+
+def _replay(stored: Dict[str, Any], response: Response) -> Any:
+    headers = {**dict(stored.get("headers", [])), REPLAY_HEADER: "true"}
+    if stored["kind"] == "error":
+        raise HTTPException(status_code=stored["status_code"], detail=stored["detail"], headers=headers)
+    if stored["kind"] == "response":
+        return JSONResponse(stored["body"], status_code=stored["status_code"], headers=headers)
+    for name, value in headers.items():
+        response.headers[name] = value
+    return stored["body"]
+
+
+async def _store(record_id: str, stored: Dict[str, Any]):
+    now = get_malaysia_time()
+    try:
+        await idempotency_keys.update_one(
+            {"_id": record_id},
+            {"$set": {"status": DONE, "response": stored, "expires_at": now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)},
+             "$unset": {"locked_until": ""}},
+        )
+    except Exception as e:
+        logger.warning("Failed to store idempotent response %s: %s", record_id, e)
+
+
+async def _release(record_id: str):
+    try:
+        await idempotency_keys.delete_one({"_id": record_id, "status": IN_PROGRESS})
+    except Exception as e:
+        logger.warning("Failed to release idempotency key %s: %s", record_id, e)
+
+
+def idempotent(fn):
+    """
+    Route decorator adding an optional `Idempotency-Key` header to a POST endpoint.
+    The endpoint must take the authenticated user as `current`.
+    """
+    sig = inspect.signature(fn)
+    own_request = "request" in sig.parameters
+    own_response = "response" in sig.parameters
+    extra = []
+    if not own_request:
+        extra.append(inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+    if not own_response:
+        extra.append(inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+    extra.append(inspect.Parameter(
+        "idempotency_key", inspect.Parameter.KEYWORD_ONLY, annotation=Optional[str],
+        default=Header(None, alias="Idempotency-Key", max_length=MAX_KEY_LENGTH,
+                       description="Client-generated key; repeats within the window replay the first response"),
+    ))
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        key = kwargs.pop("idempotency_key", None)
+        request: Request = kwargs["request"] if own_request else kwargs.pop("request")
+        response: Response = kwargs["response"] if own_response else kwargs.pop("response")
+        current = kwargs.get("current")
+        if not key or not current:
+            return await fn(*args, **kwargs)
+
+        path = request.url.path
+        # Metrics use the route template, not the concrete path
+        route = getattr(request.scope.get("route"), "path", path)
+        record_id = _record_id(current["id"], path, key)
+        record = await _wait_for_result(record_id, current["id"], path, route)
+        if record is not None:
+            idempotent_requests.labels(route, "replayed").inc()
+            return _replay(record["response"], response)
+
+        idempotent_requests.labels(route, "first").inc()
+        try:
+            result = await fn(*args, **kwargs)
+        except HTTPException as e:
+            if e.status_code < 500:
+                await _store(record_id, {"kind": "error", "status_code": e.status_code, "detail": jsonable_encoder(e.detail)})
+            else:
+                await _release(record_id)
+            raise
+        except BaseException:
+            await _release(record_id)
+            raise
+
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() != REPLAY_HEADER.lower()]
+        if isinstance(result, JSONResponse):
+            stored = {"kind": "response", "status_code": result.status_code, "body": json.loads(result.body), "headers": headers}
+        else:
+            stored = {"kind": "body", "body": jsonable_encoder(result), "headers": headers}
+        await _store(record_id, stored)
+        return result
+
+    wrapper.__signature__ = sig.replace(parameters=list(sig.parameters.values()) + extra)
+    return wrapper
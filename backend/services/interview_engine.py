@@ -1,7 +1,17 @@
+import asyncio
+import re
 from datetime import datetime
 from typing import Dict, Any, List
-from mistralai import Mistral
-from backend.config import MISTRAL_API_KEY
+from backend.config import INTERVIEW_HISTORY_MAX_TOKENS, MISTRAL_API_KEY
+from backend.services.llm_client import chat_complete
+from backend.services.metrics import llm_retries
+from backend.services.single_flight import content_key, llm_flight
+from backend.services.token_budget import PromptBudget, compact_feedback, estimate_messages, estimate_tokens, window_transcript
+from backend.services.tracing import traced
+
+_reply_flight = llm_flight("interview_reply")
+
+INTERVIEW_MODEL = "mistral-small-latest"
 
 SYSTEM_PROMPT = (
     "You are a professional interviewer. Use plain text only. No bold, no emojis. "
@@ -39,15 +49,27 @@ SYSTEM_PROMPT = (
     "[FINISH]"
 )
 
-def interview_reply(history: List[Dict[str, str]], job_title: str = "", resume_feedback: Dict[str, Any] = None, questions_limit: int = 10, difficulty: str = "Beginner", current_asked_count: int = 0, force_end: bool = False) -> str:
+_SCORE_LINE_RE = re.compile(r"Interview Readiness Score:.*", re.IGNORECASE)
+_FEEDBACK_HEADER_RE = re.compile(r"(Performance Feedback|Summary of Performance|Overall Feedback):.*", re.IGNORECASE | re.DOTALL)
+
+def veto_premature_ending(content: str, force_end: bool = False) -> str:
+    """Strips score lines (and, unless force_end, [FINISH] and feedback headers) sent before the interview is over."""
+    content = _SCORE_LINE_RE.sub("", content).strip()
+    if not force_end:
+        content = content.replace("[FINISH]", "").strip()
+        # Also strip "Performance Feedback" or similar headers if they appear prematurely
+        content = _FEEDBACK_HEADER_RE.sub("", content).strip()
+    return content
+
+@traced("service.interview_reply")
+def interview_reply(history: List[Dict[str, str]], job_title: str = "", resume_feedback: Dict[str, Any] = None, questions_limit: int = 10, difficulty: str = "Beginner", current_asked_count: int = 0, force_end: bool = False, answer_confidence: float = None) -> str:
     if not MISTRAL_API_KEY:
         if not history:
             prefix = f"Starting {difficulty} interview for {job_title}. " if job_title else ""
             return prefix + "Hi, thanks for joining today. To start, could you tell me about yourself?"
         return "Thanks. What interests you about this role, and how does it fit your goals?"
     
-    client = Mistral(api_key=MISTRAL_API_KEY)
-    
+    budget = PromptBudget("interview_reply")
     custom_system = SYSTEM_PROMPT
     if job_title or resume_feedback or questions_limit or difficulty:
         custom_system += "\n\nCANDIDATE CONTEXT:\n"
@@ -55,7 +77,10 @@ def interview_reply(history: List[Dict[str, str]], job_title: str = "", resume_f
             custom_system += f"- Target Job Title: {job_title}\n"
             custom_system += f"  (CRITICAL: Always reference this role and ensure all questions are highly specific to a {job_title} professional.)\n"
         if resume_feedback:
-            custom_system += f"- Resume Analysis: {resume_feedback}\n"
+            # Only the parts the interviewer uses; the full analysis repr is several times larger
+            feedback_text = compact_feedback(resume_feedback)
+            budget.add("resume_feedback", estimate_tokens(str(resume_feedback)), estimate_tokens(feedback_text))
+            custom_system += f"- Resume Analysis: {feedback_text}\n"
         if questions_limit:
             custom_system += f"- Interview Length: {questions_limit} questions.\n"
         if difficulty:
@@ -82,15 +107,30 @@ def interview_reply(history: List[Dict[str, str]], job_title: str = "", resume_f
         else:
             custom_system += f"\nSTRICT RULE: You MUST ask interview question #{current_asked_count + 1} now. You are NOT allowed to end the interview. DO NOT provide a score, DO NOT say goodbye, and DO NOT use the [FINISH] tag. If you try to end now, you are failing your task."
         custom_system += "\nWait for the user's answer before asking the next question."
+        if answer_confidence is not None and current_asked_count > 0:
+            # Borderline answers flagged by the local answer-quality check (text_quality.score_answer)
+            custom_system += (
+                f"\nANSWER CHECK: An automatic check rates the candidate's latest answer as weak (confidence {answer_confidence:.2f} of 1; "
+                "it is very short or does not read like a clear answer). If it does not really answer your last question, "
+                "politely ask them to elaborate or rephrase it instead of moving on."
+            )
     else:
         custom_system += f"\nSTRICT RULE: All {questions_limit} questions are done. The user has just answered the final question. You MUST now provide the final wrap-up: Thank you message, then feedback summary, then the score line, then [FINISH]."
         custom_system += "\nDo NOT ask any more questions."
 
     custom_system += "\n\nEnsure you follow the question count strictly. Do not hallucinate that the interview is over until the count reaches the limit."
 
-    msgs = [{"role": "system", "content": custom_system}] + history
-    completion = client.chat.complete(
-        model="mistral-small-latest", 
+    window, omitted = window_transcript(history, INTERVIEW_HISTORY_MAX_TOKENS)
+    if omitted:
+        custom_system += f"\n\nNOTE: The first {omitted} messages of this interview are omitted to save space. They were answered already; do not ask those questions again."
+
+    budget.add("system", estimate_tokens(custom_system) - budget.sent.get("resume_feedback", 0))
+    budget.add("history", estimate_messages(history), estimate_messages(window))
+    budget.record()
+
+    msgs = [{"role": "system", "content": custom_system}] + window
+    completion = chat_complete(
+        model=INTERVIEW_MODEL, 
         messages=msgs, 
         temperature=0.3
     )
@@ -98,14 +138,8 @@ def interview_reply(history: List[Dict[str, str]], job_title: str = "", resume_f
     
     # VETO: Hard-strip any premature scores if we haven't reached the limit
     if current_asked_count < questions_limit or force_end:
-        import re
-        content = re.sub(r"Interview Readiness Score:.*", "", content, flags=re.IGNORECASE).strip()
-        if not force_end:
-            content = content.replace("[FINISH]", "").strip()
-        # Also strip "Performance Feedback" or similar headers if they appear prematurely
-        if not force_end:
-            content = re.sub(r"(Performance Feedback|Summary of Performance|Overall Feedback):.*", "", content, flags=re.IGNORECASE | re.DOTALL).strip()
-        
+        content = veto_premature_ending(content, force_end)
+
         # RE-PROMPT if the AI tried to end early and gave us a useless message (only for non-force-end)
         if not force_end and (not content or "?" not in content or "thank you" in content.lower() or "goodbye" in content.lower()):
             # Add a correction message and try once more
@@ -114,14 +148,20 @@ def interview_reply(history: List[Dict[str, str]], job_title: str = "", resume_f
                 "role": "user", 
                 "content": f"[SYSTEM CORRECTION]: You tried to end the interview early or didn't ask a question. You have only asked {current_asked_count} questions out of {questions_limit}. You MUST continue. Please ask a high-quality, {difficulty}-level technical question about {job_title} now. Do NOT say goodbye."
             })
-            retry_completion = client.chat.complete(
-                model="mistral-small-latest", 
+            llm_retries.labels(INTERVIEW_MODEL).inc()
+            retry_completion = chat_complete(
+                model=INTERVIEW_MODEL, 
                 messages=correction_msgs, 
                 temperature=0.3
             )
-            content = retry_completion.choices[0].message.content
-            content = re.sub(r"Interview Readiness Score:.*", "", content, flags=re.IGNORECASE).strip()
-            content = content.replace("[FINISH]", "").strip()
-            content = re.sub(r"(Performance Feedback|Summary of Performance|Overall Feedback):.*", "", content, flags=re.IGNORECASE | re.DOTALL).strip()
+            content = veto_premature_ending(retry_completion.choices[0].message.content)
 
     return content
+
+async def interview_reply_async(history: List[Dict[str, str]], *, session_id: str, **kwargs) -> str:
+    """
+    interview_reply in a worker thread; a duplicate submit of the same turn shares one completion.
+    The key is scoped to the session: two users starting the same interview must not share a question.
+    """
+    key = content_key(session_id, history, kwargs)
+    return await _reply_flight.do(key, lambda: asyncio.to_thread(interview_reply, history, **kwargs))
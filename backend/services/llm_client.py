@@ -0,0 +1,39 @@
+import time
+from typing import TYPE_CHECKING, Any, Dict, List
+from backend.config import MISTRAL_API_KEY, MISTRAL_SERVER_URL
+from backend.services.metrics import record_llm_completion
+from backend.services.structured_log import timed
+from backend.services.tracing import add_span
+from backend.services.usage import note_llm_call
+
+if TYPE_CHECKING:
+    from mistralai import Mistral
+
+# One shared client per process: it holds a pooled HTTP connection to the Mistral API
+_client = None
+
+
+def get_client() -> "Mistral":
+    global _client
+    if _client is None:
+        # Imported on first use: the SDK and its models add ~200ms to a cold start
+        from mistralai import Mistral
+        _client = Mistral(api_key=MISTRAL_API_KEY, server_url=MISTRAL_SERVER_URL or None)
+    return _client
+
+
+def chat_complete(model: str, messages: List[Dict[str, Any]], **kwargs):
+    """Runs a Mistral chat completion, recording its latency, outcome and token usage."""
+    start = time.perf_counter()
+    completion = None
+    outcome = "error"
+    try:
+        with timed("llm"):
+            completion = get_client().chat.complete(model=model, messages=messages, **kwargs)
+        outcome = "ok"
+        return completion
+    finally:
+        end = time.perf_counter()
+        record_llm_completion(model, end - start, completion, outcome)
+        note_llm_call(model, end - start, completion, outcome)
+        add_span("llm.chat", start, end, model=model, outcome=outcome)
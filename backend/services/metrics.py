@@ -0,0 +1,275 @@
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Lightweight in-process metrics exported in OpenMetrics text format.
+#
+# Updates are plain attribute/list increments on pre-resolved children, with no locks:
+# the app runs on a single event loop, and for the few updates made from worker threads
+# an occasional lost increment is an acceptable trade for zero contention.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values):
+        """Returns the child for these label values; hold on to it on hot paths."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Creates the child that holds the samples for one set of label values."""
+
+    @abstractmethod
+    def render(self) -> List[str]:
+        """The OpenMetrics sample lines for this metric (without HELP/TYPE)."""
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def value(self, *values) -> float:
+        child = self._children.get(tuple(str(v) for v in values))
+        return child.value if child else 0.0
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in self._children.items():
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, key)} {_format_value(child.value)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum", "count")
+
+    def __init__(self, upper_bounds):
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("child", "start")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def render(self) -> List[str]:
+        lines = []
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.upper_bounds + (float("inf"),), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_count{labels} {child.count}")
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        return lines
+
+
+class GaugeFunc(_Metric):
+    """Gauge whose samples are computed at scrape time: fn() -> {label_values_tuple: value}."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str], fn: Callable[[], Dict[Tuple[str, ...], float]]):
+        super().__init__(name, help_text, labelnames)
+        self.fn = fn
+
+    def _new_child(self):
+        raise TypeError(f"{self.name} is computed at scrape time and has no children to update")
+
+    def render(self) -> List[str]:
+        try:
+            samples = self.fn()
+        except Exception:
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, tuple(str(v) for v in key))} {_format_value(value)}" for key, value in samples.items()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge_func(self, name, help_text, labelnames, fn) -> GaugeFunc:
+        return self.register(GaugeFunc(name, help_text, labelnames, fn))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.append(f"# HELP {metric.name} {_escape(metric.help)}")
+            lines.extend(metric.render())
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# --- HTTP ---
+http_requests = REGISTRY.counter("icp_http_requests", "HTTP requests by route template, method and status.", ("route", "method", "status"))
+http_request_duration = REGISTRY.histogram("icp_http_request_duration_seconds", "HTTP request latency by route template.", ("route", "method"))
+
+# --- MongoDB ---
+mongo_operations = REGISTRY.counter("icp_mongo_operations", "MongoDB operations by collection and operation.", ("collection", "op"))
+mongo_errors = REGISTRY.counter("icp_mongo_errors", "Failed MongoDB operations by collection and operation.", ("collection", "op"))
+mongo_operation_duration = REGISTRY.histogram("icp_mongo_operation_duration_seconds", "MongoDB operation latency by collection and operation.", ("collection", "op"))
+
+# --- LLM ---
+llm_requests = REGISTRY.counter("icp_llm_requests", "Mistral completions by model and outcome.", ("model", "outcome"))
+llm_request_duration = REGISTRY.histogram("icp_llm_request_duration_seconds", "Mistral completion latency by model.", ("model",), buckets=(0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0))
+llm_tokens = REGISTRY.counter("icp_llm_tokens", "Mistral tokens by model and kind (prompt/completion).", ("model", "kind"))
+single_flight_calls = REGISTRY.counter("icp_single_flight_calls", "Coalesced calls by flight and outcome (leader/coalesced/shared/takeover/fallback).", ("flight", "outcome"))
+prompt_tokens = REGISTRY.counter("icp_prompt_tokens", "Estimated LLM prompt tokens by call, component and stage (raw/sent, before and after compaction).", ("call", "component", "stage"))
+prompt_size = REGISTRY.histogram("icp_prompt_size_tokens", "Estimated prompt tokens sent per LLM call.", ("call",), buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000))
+llm_retries = REGISTRY.counter("icp_llm_retries", "Mistral completions re-issued after a rejected response.", ("model",))
+
+# --- RAG / parsing ---
+rag_retrieval_duration = REGISTRY.histogram("icp_rag_retrieval_duration_seconds", "RAG retrieval latency.", buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05))
+answer_checks = REGISTRY.counter("icp_answer_checks", "Local interview answer checks by verdict (ok/borderline/unusable) and rule; unusable ones are re-asked without an LLM call.", ("verdict", "reason"))
+resume_gate_decisions = REGISTRY.counter("icp_resume_gate_decisions", "Local resume gate decisions (pass/borderline/reject) by rule.", ("decision", "reason"))
+resume_extraction_duration = REGISTRY.histogram("icp_resume_extraction_duration_seconds", "Resume text extraction latency by file format.", ("format",))
+
+# --- Background jobs ---
+analysis_jobs_total = REGISTRY.counter("icp_analysis_jobs", "Analysis jobs by kind and outcome (enqueued/deduplicated/retried/succeeded/failed).", ("kind", "outcome"))
+analysis_job_duration = REGISTRY.histogram("icp_analysis_job_duration_seconds", "Analysis job time spent queued and running.", ("kind", "phase"), buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0))
+
+# --- Quotas / caches ---
+rate_limit_rejections = REGISTRY.counter("icp_rate_limit_rejections", "Requests rejected by a rate limit or daily quota.", ("limit",))
+upload_rejections = REGISTRY.counter("icp_upload_rejections", "Resume uploads rejected while streaming in, by reason (too_large/unsupported_type/doc/empty).", ("reason",))
+resume_file_ops = REGISTRY.counter("icp_resume_file_ops", "Resume file storage operations (stored/shared/released/deleted); shared ones reused an identical stored file.", ("op",))
+resume_file_bytes = REGISTRY.counter("icp_resume_file_bytes", "Resume file bytes written to GridFS (stored) or deduplicated against an identical file (shared).", ("outcome",))
+idempotent_requests = REGISTRY.counter("icp_idempotent_requests", "Requests carrying an Idempotency-Key by path and outcome (first/replayed/conflict).", ("path", "outcome"))
+cache_requests = REGISTRY.counter("icp_cache_requests", "Cache lookups by cache and result (hit/miss).", ("cache", "result"))
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.labels(cache, "hit" if hit else "miss").inc()
+
+
+def cache_hit_ratios() -> Dict[str, float]:
+    """Hit ratio per cache, derived from icp_cache_requests."""
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), child in cache_requests._children.items():
+        hits_total = totals.setdefault(cache, [0.0, 0.0])
+        if result == "hit":
+            hits_total[0] += child.value
+        hits_total[1] += child.value
+    return {cache: (hits / total if total else 0.0) for cache, (hits, total) in totals.items()}
+
+
+REGISTRY.gauge_func(
+    "icp_cache_hit_ratio", "Hit ratio per cache since process start.", ("cache",),
+    lambda: {(cache,): ratio for cache, ratio in cache_hit_ratios().items()},
+)
+
+
+def record_llm_completion(model: str, elapsed: float, completion=None, outcome: str = "ok"):
+    """Records latency, outcome and token usage for one Mistral completion."""
+    llm_requests.labels(model, outcome).inc()
+    llm_request_duration.labels(model).observe(elapsed)
+    usage = getattr(completion, "usage", None)
+    if usage is not None:
+        llm_tokens.labels(model, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+        llm_tokens.labels(model, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
@@ -1,6 +1,15 @@
+import logging
 import os
 import re
-from typing import List, Dict, Any
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Sequence
+from backend.services.metrics import rag_retrieval_duration
+from backend.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Reciprocal-rank fusion constant: damps the weight of the very top ranks
+RRF_K = 60
 
 class RAGEngine:
     """
@@ -16,6 +25,8 @@ class RAGEngine:
         else:
             self.docs_dir = docs_dir
         self.documents = []
+        # Inverted index: word -> ids (positions in self.documents) of the chunks containing it
+        self.postings: Dict[str, List[int]] = {}
         self._initialized = False
 
     def initialize(self):
@@ -23,13 +34,13 @@ class RAGEngine:
         if self._initialized:
             return
 
-        print(f"Initializing Lightweight RAG Engine from {self.docs_dir}...")
+        logger.info("Initializing Lightweight RAG Engine from %s", self.docs_dir)
         try:
             self._load_documents()
             self._initialized = True
-            print(f"RAG Engine ready with {len(self.documents)} chunks.")
+            logger.info("RAG Engine ready with %d chunks", len(self.documents))
         except Exception as e:
-            print(f"CRITICAL: RAG Engine initialization failed: {e}")
+            logger.critical("RAG Engine initialization failed: %s", e)
             # Don't set _initialized to True so it might retry or stay empty
 
     def _ensure_initialized(self):
@@ -39,7 +50,7 @@ class RAGEngine:
     def _load_documents(self):
         """Loads and chunks documents from the rag_docs directory."""
         if not os.path.exists(self.docs_dir):
-            print(f"Warning: RAG docs directory not found at {self.docs_dir}")
+            logger.warning("RAG docs directory not found at %s", self.docs_dir)
             return
 
         for filename in os.listdir(self.docs_dir):
@@ -61,7 +72,13 @@ class RAGEngine:
                                     "words": words
                                 })
                 except Exception as e:
-                    print(f"Error loading {filename}: {e}")
+                    logger.warning("Error loading RAG document %s: %s", filename, e)
+
+        postings = defaultdict(list)
+        for doc_id, doc in enumerate(self.documents):
+            for word in doc["words"]:
+                postings[word].append(doc_id)
+        self.postings = dict(postings)
 
     def retrieve(self, query: str, top_k: int = 5) -> List[str]:
         """
@@ -72,21 +89,54 @@ class RAGEngine:
         if not self.documents:
             return []
 
-        # Tokenize query
-        query_words = set(re.findall(r'\w+', query.lower()))
-        
-        # Rank documents by word overlap (Jaccard-like or simple count)
-        scored_docs = []
-        for doc in self.documents:
-            overlap = len(query_words.intersection(doc["words"]))
-            if overlap > 0:
-                scored_docs.append((overlap, doc["content"]))
-        
-        # Sort by overlap count (descending)
-        scored_docs.sort(key=lambda x: x[0], reverse=True)
-        
-        # Return top K contents
-        return [doc[1] for doc in scored_docs[:top_k]]
+        with span("rag.retrieve", top_k=top_k), rag_retrieval_duration.time():
+            return self._rank(query, top_k)
+
+    def retrieve_many(self, queries: Sequence[str], top_k: int = 5, max_chars: Optional[int] = None) -> List[str]:
+        """
+        Retrieves chunks for several queries at once (e.g. one per resume section) and merges
+        the rankings with reciprocal-rank fusion, so a chunk that ranks well for any section
+        makes the cut. Each chunk appears once; chunks are added in fused order while the
+        total stays within `max_chars`.
+        """
+        self._ensure_initialized()
+        if not self.documents:
+            return []
+
+        with span("rag.retrieve_many", queries=len(queries), top_k=top_k), rag_retrieval_duration.time():
+            fused: Dict[int, float] = defaultdict(float)
+            for query in queries:
+                for rank, doc_id in enumerate(self._ranked_ids(query, top_k)):
+                    fused[doc_id] += 1.0 / (RRF_K + rank + 1)
+
+            results: List[str] = []
+            seen = set()
+            used = 0
+            for doc_id in sorted(fused, key=lambda d: (-fused[d], d)):
+                content = self.documents[doc_id]["content"]
+                if content in seen:
+                    continue
+                if max_chars is not None and used + len(content) > max_chars:
+                    # A smaller chunk further down may still fit
+                    continue
+                seen.add(content)
+                results.append(content)
+                used += len(content)
+                if len(results) >= top_k:
+                    break
+            return results
+
+    def _ranked_ids(self, query: str, top_k: int) -> List[int]:
+        # Overlap count per chunk, accumulated from the postings of the query words
+        counts: Dict[int, int] = defaultdict(int)
+        for word in set(re.findall(r'\w+', query.lower())):
+            for doc_id in self.postings.get(word, ()):
+                counts[doc_id] += 1
+        # Highest overlap first; ties keep load order
+        return sorted(counts, key=lambda d: (-counts[d], d))[:top_k]
+
+    def _rank(self, query: str, top_k: int) -> List[str]:
+        return [self.documents[doc_id]["content"] for doc_id in self._ranked_ids(query, top_k)]
 
 # Singleton instance
 rag_engine = RAGEngine()
@@ -2,6 +2,7 @@ from time import time
 from typing import Dict
 from fastapi import Request, HTTPException, status
 from backend.config import RATE_LIMIT_PER_MINUTE
+from backend.services.metrics import rate_limit_rejections
 
 bucket: Dict[str, list[float]] = {}
 
@@ -12,6 +13,7 @@ def rate_limit(request: Request):
     arr = bucket.get(ip, [])
     arr = [t for t in arr if now - t < window]
     if len(arr) >= RATE_LIMIT_PER_MINUTE:
+        rate_limit_rejections.labels("ip_per_minute").inc()
         raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Rate limit exceeded")
     arr.append(now)
     bucket[ip] = arr
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+from bson import ObjectId
+from backend.config import DAILY_RESUME_LIMIT, RESUME_GATE_ENFORCE
+from backend.db import resumes, users
+from backend.services import usage, user_summary
+from backend.services.ai_feedback import get_feedback_async
+from backend.services.analysis_jobs import JobError, analysis_queue
+from backend.services.daily_limit import check_daily_limit, increment_daily_limit
+from backend.services.metrics import rate_limit_rejections
+from backend.services.resume_files import release_resume_file, store_resume_file
+from backend.services.resume_parser import extract_resume_text
+from backend.services.text_quality import REJECT, resume_gate
+from backend.services.utils import get_malaysia_time
+
+logger = logging.getLogger(__name__)
+
+# Resume file analysis, run by the analysis job workers (see analysis_jobs.py).
+# POST /api/resume/upload only validates the request and queues a "resume_upload" job.
+
+KIND = "resume_upload"
+
+QUOTA_MESSAGE = "Daily resume analysis limit reached. Resets at 00:00 Malaysia Time."
+NOT_A_RESUME_MESSAGE = (
+    "The uploaded file does not appear to be a professional resume or CV. Please ensure "
+    "the file contains your professional experience, education, and skills."
+)
+
+
+def upload_dedupe_key(user_id: str, job_title: str, consent: bool, file_sha256: str) -> str:
+    """Fingerprint of an upload, so a double-submitted form runs a single analysis."""
+    h = hashlib.sha256()
+    for part in (KIND, user_id, job_title.strip().lower(), "1" if consent else "0"):
+        h.update(part.encode("utf-8") + b"\0")
+    h.update(bytes.fromhex(file_sha256))
+    return h.hexdigest()
+
+
+def _extract(name: str, file_bytes: bytes, kind: Optional[str] = None) -> Tuple[str, str]:
+    # The parser is picked by extension, so the sniffed type wins over whatever the file was called
+    if kind and not name.lower().endswith("." + kind):
+        name = os.path.splitext(name)[0] + "." + kind
+    # We use /tmp which is the only writable directory on Vercel
+    tmp_path = os.path.join("/tmp", "resume_" + str(ObjectId()) + "_" + name.replace(" ", "_"))
+    with open(tmp_path, "wb") as f:
+        f.write(file_bytes)
+    try:
+        return extract_resume_text(tmp_path)
+    finally:
+        try:
+            os.remove(tmp_path)
+        except OSError as e:
+            logger.warning("Failed to delete temp file %s: %s", tmp_path, e)
+
+
+def _validate_feedback(text: str, feedback: Dict[str, Any]) -> bool:
+    is_valid_resume = feedback.get("IsResume", True)
+    # If the text is long enough and has resume-like sections, override a borderline
+    # false negative from the AI
+    resume_text_lower = text.lower()
+    keywords_check = ["experience", "education", "skills", "projects", "achievement", "summary", "contact"]
+    has_structure = sum(1 for kw in keywords_check if kw in resume_text_lower) >= 2
+    if not is_valid_resume and has_structure and len(text) > 300:
+        is_valid_resume = True
+        feedback["IsResume"] = True
+        if feedback.get("Score") == 0:
+            feedback["Score"] = 40 # Give a base score if it was 0
+    return is_valid_resume
+
+
+async def analyze_upload(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Job handler: parses the file, asks the LLM for feedback and stores the result."""
+    user_id = job["user_id"]
+    payload = job["payload"]
+    name = payload["filename"]
+    job_title = payload["job_title"]
+    consent = payload.get("consent", False)
+    file_bytes = bytes(job.get("file") or b"")
+
+    # Other uploads may have used up the quota while this one was queued
+    can_upload, _ = await check_daily_limit(user_id, "daily_resume_count", DAILY_RESUME_LIMIT)
+    if not can_upload:
+        rate_limit_rejections.labels("daily_resume").inc()
+        raise JobError(429, QUOTA_MESSAGE)
+
+    try:
+        text, mime = await asyncio.to_thread(_extract, name, file_bytes, payload.get("kind"))
+    except ValueError as e:
+        raise JobError(400, str(e))
+
+    # Recipes, stories and keyboard mash are turned away without a mistral-large call
+    gate = resume_gate(text)
+    if gate["decision"] == REJECT and RESUME_GATE_ENFORCE:
+        raise JobError(400, NOT_A_RESUME_MESSAGE)
+
+    # Initialize RAG Engine lazily
+    try:
+        from backend.services.rag_engine import rag_engine
+        rag_engine.initialize()
+    except Exception as e:
+        logger.warning("Non-critical failure in lazy RAG initialization: %s", e)
+
+    async with usage.track(user_id, "resume_analysis"):
+        feedback = await get_feedback_async(text, user_id)
+    if not _validate_feedback(text, feedback):
+        raise JobError(400, NOT_A_RESUME_MESSAGE)
+
+    # Use AI detected job title if it's available and the provided one is generic
+    ai_detected_title = feedback.get("DetectedJobTitle")
+    final_job_title = job_title
+    if ai_detected_title and (len(job_title) < 3 or job_title.lower() in ["software", "engineer", "intern", "manager"]):
+        final_job_title = ai_detected_title
+
+    grid_id = job.get("file_id")
+    if consent and grid_id is None:
+        # Stored before the quota is charged, so a failed upload is retried without charging twice.
+        # The id is kept on the job: a retry reuses this reference instead of taking another.
+        grid_id, _ = await store_resume_file(name, file_bytes, payload.get("sha256"))
+        if job.get("_id") is not None:
+            await analysis_queue.collection.update_one({"_id": job["_id"]}, {"$set": {"file_id": grid_id}})
+
+    resume_id = None
+    try:
+        # Increment daily count only after successful analysis
+        await increment_daily_limit(user_id, "daily_resume_count")
+
+        try:
+            user_id_obj = ObjectId(user_id)
+        except Exception:
+            user_id_obj = user_id
+        update_data = {"has_analyzed": True, "target_job_title": final_job_title}
+        if feedback.get("Location"):
+            update_data["target_location"] = feedback["Location"]
+        await users.update_one({"_id": user_id_obj}, {"$set": update_data})
+
+        if consent:
+            doc = {
+                "resume_id": str(ObjectId()),
+                "user_id": user_id,
+                "filename": name,
+                "mime_type": mime,
+                "consent": consent,
+                "file_id": str(grid_id),
+                "text": text,
+                "job_title": final_job_title,
+                "feedback": feedback,
+                "status": "pending",
+                "tags": feedback.get("Keywords", []),
+                "notes": "",
+                "created_at": get_malaysia_time(),
+            }
+            res = await resumes.insert_one(doc)
+            resume_id = str(res.inserted_id)
+        await user_summary.record_resume_analyzed(user_id, feedback, final_job_title, name, stored=consent)
+    except Exception:
+        if grid_id is not None and resume_id is None and job.get("attempts", 1) >= analysis_queue.max_attempts:
+            # The job fails for good and no resume refers to the file
+            await release_resume_file(grid_id)
+        raise
+    return {"id": resume_id, "feedback": feedback, "job_title": final_job_title}
+
+analysis_queue.register(KIND, analyze_upload)
@@ -0,0 +1,92 @@
+import hashlib
+import logging
+from typing import Optional, Tuple
+from bson import ObjectId
+from gridfs.errors import FileExists, NoFile
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from backend.db import fs, resume_file_docs
+from backend.services.metrics import resume_file_bytes, resume_file_ops
+
+logger = logging.getLogger(__name__)
+
+# Content-addressed storage of consented resume files in the resume_files GridFS bucket.
+#
+# Every GridFS object carries metadata {"sha256", "refcount"}. Storing a file whose
+# content is already there increments the count of the existing object instead of
+# writing the bytes again, so the same resume uploaded twice (or a template shared by
+# many users) is kept once. Releasing decrements the count and deletes the object when
+# it reaches zero. A unique index on metadata.sha256, restricted to objects with a
+# positive count (see db.ensure_indexes), keeps two concurrent first uploads of the same
+# content from both creating an object: the loser discards its copy and takes a reference.
+#
+# Objects stored before this scheme have no metadata and are deleted outright on release.
+
+MAX_STORE_ATTEMPTS = 3
+
+
+async def _add_reference(sha256: str) -> Optional[ObjectId]:
+    doc = await resume_file_docs.find_one_and_update(
+        {"metadata.sha256": sha256, "metadata.refcount": {"$gt": 0}},
+        {"$inc": {"metadata.refcount": 1}},
+        projection={"_id": 1},
+    )
+    return doc["_id"] if doc else None
+
+
+async def store_resume_file(filename: str, data: bytes, sha256: Optional[str] = None) -> Tuple[ObjectId, bool]:
+    """
+    Stores a resume file, or takes a reference to an identical one.
+    Returns (GridFS file id, whether an existing object was reused).
+    """
+    sha256 = sha256 or hashlib.sha256(data).hexdigest()
+    bucket = await fs.get_fs()
+    for _ in range(MAX_STORE_ATTEMPTS):
+        file_id = await _add_reference(sha256)
+        if file_id is not None:
+            resume_file_ops.labels("shared").inc()
+            resume_file_bytes.labels("shared").inc(len(data))
+            return file_id, True
+        file_id = ObjectId()
+        try:
+            await bucket.upload_from_stream_with_id(file_id, filename, data, metadata={"sha256": sha256, "refcount": 1})
+        except (FileExists, DuplicateKeyError):
+            # Another upload of the same content got its object in first (GridFS reports the
+            # unique index violation as FileExists); drop the chunks we already wrote
+            try:
+                await bucket.delete(file_id)
+            except NoFile:
+                pass
+            continue
+        resume_file_ops.labels("stored").inc()
+        resume_file_bytes.labels("stored").inc(len(data))
+        return file_id, False
+    raise RuntimeError(f"Could not store resume file {sha256} after {MAX_STORE_ATTEMPTS} attempts")
+
+
+async def release_resume_file(file_id) -> bool:
+    """Drops one reference to a stored file; returns True when the object itself was deleted."""
+    oid = ObjectId(file_id)
+    doc = await resume_file_docs.find_one_and_update(
+        {"_id": oid, "metadata.refcount": {"$gt": 0}},
+        {"$inc": {"metadata.refcount": -1}},
+        projection={"metadata": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        # Stored before content addressing, or already gone
+        if not await resume_file_docs.find_one({"_id": oid, "metadata.refcount": {"$exists": False}}, {"_id": 1}):
+            return False
+    elif doc["metadata"]["refcount"] > 0:
+        resume_file_ops.labels("released").inc()
+        return False
+
+    # A count of zero is never incremented again (_add_reference needs a positive one)
+    bucket = await fs.get_fs()
+    try:
+        await bucket.delete(oid)
+    except NoFile:
+        return False
+    resume_file_ops.labels("deleted").inc()
+    logger.info("Deleted resume file %s", oid)
+    return True
@@ -1,8 +1,8 @@
-from typing import Tuple
-from docx import Document
-from pdfminer.high_level import extract_text
-from pypdf import PdfReader
+from typing import Dict, List, Optional, Tuple
 import os
+import re
+from backend.services.metrics import resume_extraction_duration
+from backend.services.tracing import span
 
 def is_pdf(filename: str) -> bool:
     return filename.lower().endswith(".pdf")
@@ -12,45 +12,223 @@ def is_docx(filename: str) -> bool:
 
 def extract_resume_text(path: str) -> Tuple[str, str]:
     name = os.path.basename(path)
-    text = ""
-    mime = ""
 
     if is_pdf(name):
-        mime = "application/pdf"
-        # Try pdfminer first
-        try:
-            text = extract_text(path).strip()
-        except Exception:
-            text = ""
-        
-        # Fallback to pypdf if pdfminer failed or returned very little text
-        if len(text) < 50:
-            try:
-                reader = PdfReader(path)
-                pypdf_text = ""
-                for page in reader.pages:
-                    pypdf_text += page.extract_text() + "\n"
-                if len(pypdf_text.strip()) > len(text):
-                    text = pypdf_text.strip()
-            except Exception:
-                pass
-        
-        if not text or len(text) < 20:
-            raise ValueError(
-                "Could not extract text from this PDF. It might be an image-based PDF or a scanned document. "
-                "Please upload a PDF with selectable text, or a Word (.docx) file."
-            )
-        return text, mime
+        with span("extract.pdf"), resume_extraction_duration.labels("pdf").time():
+            return _extract_pdf(path)
 
     if name.lower().endswith(".doc"):
         raise ValueError("Please convert .doc to .docx or pdf")
-    
+
     if is_docx(name):
-        mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        doc = Document(path)
-        text = "\n".join([p.text for p in doc.paragraphs])
-        if not text.strip():
-             raise ValueError("The Word document appears to be empty.")
-        return text.strip(), mime
-    
+        with span("extract.docx"), resume_extraction_duration.labels("docx").time():
+            return _extract_docx(path)
+
     raise ValueError(f"Unsupported file type: {name}. Please upload a PDF or DOCX file.")
+
+# The parsing libraries are imported inside the extractors so that a cold start
+# (and every request that never sees an upload) does not pay for them.
+
+def _extract_pdf(path: str) -> Tuple[str, str]:
+    from pdfminer.high_level import extract_text
+    from pypdf import PdfReader
+    mime = "application/pdf"
+    # Try pdfminer first
+    try:
+        text = extract_text(path).strip()
+    except Exception:
+        text = ""
+
+    # Fallback to pypdf if pdfminer failed or returned very little text
+    if len(text) < 50:
+        try:
+            reader = PdfReader(path)
+            pypdf_text = ""
+            for page in reader.pages:
+                pypdf_text += page.extract_text() + "\n"
+            if len(pypdf_text.strip()) > len(text):
+                text = pypdf_text.strip()
+        except Exception:
+            pass
+
+    if not text or len(text) < 20:
+        raise ValueError(
+            "Could not extract text from this PDF. It might be an image-based PDF or a scanned document. "
+            "Please upload a PDF with selectable text, or a Word (.docx) file."
+        )
+    return text, mime
+
+def _extract_docx(path: str) -> Tuple[str, str]:
+    mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    text = extract_docx_text(path)
+    if not text.strip():
+         raise ValueError("The Word document appears to be empty.")
+    return text.strip(), mime
+
+# DOCX text is streamed out of the zip with an incremental XML parser instead of building
+# python-docx's object model, which costs several times the time and memory and only
+# exposed doc.paragraphs (table cells, where many resumes keep their skills, were lost).
+# Headers come first, then the body in document order (paragraphs, one line per table row
+# with " | " between cells, text box paragraphs before the paragraph they are anchored in),
+# then footers. Each element is cleared once its text is taken.
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P, _W_R, _W_T, _W_TC, _W_TR, _W_TXBX = (_W + t for t in ("p", "r", "t", "tc", "tr", "txbxContent"))
+_W_BR, _W_TYPE = _W + "br", _W + "type"
+# Run children with a fixed text, as python-docx renders them
+_W_RUN_TEXT = {_W + "tab": "\t", _W + "ptab": "\t", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+# Text boxes are written twice (DrawingML and a VML fallback for old readers); only the first counts
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_PACKAGE_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+DOCX_READ_ERROR = "Could not read this Word document. Please save it again as .docx or upload a PDF."
+
+def _docx_part_lines(stream) -> List[str]:
+    from xml.etree.ElementTree import iterparse
+    lines: List[str] = []
+    sinks = [lines]  # where finished paragraphs go: the part, or the table cell / text box being read
+    rows: List[List[str]] = []  # cells of the open table rows (nested tables stack)
+    paragraphs: List[List[str]] = []  # text of the open paragraphs (text boxes nest them)
+    in_run = 0
+    skip = 0
+    for event, elem in iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _MC_FALLBACK:
+                skip += 1
+            elif skip:
+                pass
+            elif tag == _W_P:
+                paragraphs.append([])
+            elif tag == _W_R:
+                in_run += 1
+            elif tag == _W_TC or tag == _W_TXBX:
+                sinks.append([])
+            elif tag == _W_TR:
+                rows.append([])
+            continue
+
+        if tag == _MC_FALLBACK:
+            skip -= 1
+            elem.clear()
+        elif skip:
+            continue
+        elif tag == _W_T:
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == _W_R:
+            in_run -= 1
+        elif tag == _W_P:
+            sinks[-1].append("".join(paragraphs.pop()))
+            elem.clear()
+        elif tag == _W_TC:
+            cell = sinks.pop()
+            rows[-1].append(" ".join(line.strip() for line in cell if line.strip()))
+        elif tag == _W_TR:
+            line = " | ".join(cell for cell in rows.pop() if cell)
+            if line:
+                sinks[-1].append(line)
+            elem.clear()
+        elif tag == _W_TXBX:
+            box = sinks.pop()
+            sinks[-1].extend(line for line in box if line.strip())
+        elif in_run and paragraphs:
+            if tag == _W_BR:
+                if elem.get(_W_TYPE, "textWrapping") == "textWrapping":
+                    paragraphs[-1].append("\n")
+            elif tag in _W_RUN_TEXT:
+                paragraphs[-1].append(_W_RUN_TEXT[tag])
+    return lines
+
+def _docx_main_part(zf) -> str:
+    from xml.etree.ElementTree import fromstring
+    try:
+        for rel in fromstring(zf.read("_rels/.rels")).iter(_PACKAGE_RELS):
+            if rel.get("Type") == _OFFICE_DOCUMENT_REL:
+                return rel.get("Target", "").lstrip("/")
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+def _part_number(name: str) -> int:
+    digits = "".join(c for c in os.path.basename(name) if c.isdigit())
+    return int(digits) if digits else 0
+
+def extract_docx_text(source) -> str:
+    """Text of a .docx (path or binary file object): headers, body in document order, footers."""
+    import zipfile
+    from xml.etree.ElementTree import ParseError
+    try:
+        with zipfile.ZipFile(source) as zf:
+            main = _docx_main_part(zf)
+            folder = os.path.dirname(main) + "/"
+            names = [n for n in zf.namelist() if n.startswith(folder) and "/" not in n[len(folder):]]
+            headers = sorted((n for n in names if n[len(folder):].startswith("header")), key=_part_number)
+            footers = sorted((n for n in names if n[len(folder):].startswith("footer")), key=_part_number)
+            out: List[str] = []
+            seen = set()
+
+            def add_margin(parts):
+                # Default, first-page and even-page headers usually repeat the same lines
+                for name in parts:
+                    with zf.open(name) as f:
+                        for line in _docx_part_lines(f):
+                            if line.strip() and line not in seen:
+                                seen.add(line)
+                                out.append(line)
+
+            add_margin(headers)
+            with zf.open(main) as f:
+                out.extend(_docx_part_lines(f))
+            add_margin(footers)
+    except (zipfile.BadZipFile, KeyError, ParseError) as e:
+        raise ValueError(DOCX_READ_ERROR) from e
+    return "\n".join(out)
+
+# Resume section headings (normalized) and the section they start
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "career objective", "objective", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history", "work history", "career history", "internships", "internship experience"),
+    "skills": ("skills", "technical skills", "key skills", "core skills", "core competencies", "competencies", "technologies", "tools", "languages"),
+    "education": ("education", "academic background", "academic qualifications", "qualifications", "education and training"),
+    "projects": ("projects", "key projects", "personal projects", "selected projects", "portfolio"),
+    "certifications": ("certifications", "certificates", "licenses", "awards", "achievements", "honours", "honors", "awards and achievements"),
+}
+_HEADING_LOOKUP = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+_HEADING_CLEAN_RE = re.compile(r"[^a-z& ]+")
+MAX_HEADING_LENGTH = 40
+
+def _heading_section(line: str) -> Optional[str]:
+    if not line or len(line) > MAX_HEADING_LENGTH:
+        return None
+    key = " ".join(_HEADING_CLEAN_RE.sub(" ", line.lower()).split()).replace(" & ", " and ")
+    return _HEADING_LOOKUP.get(key)
+
+def section_headings(text: str, limit: int = 0) -> List[str]:
+    """Sections whose heading appears in text, in order of first appearance (stops after `limit` if set)."""
+    found: List[str] = []
+    for line in text.splitlines():
+        section = _heading_section(line.strip())
+        if section is not None and section not in found:
+            found.append(section)
+            if len(found) == limit:
+                break
+    return found
+
+def split_resume_sections(text: str) -> Dict[str, str]:
+    """
+    Splits resume text at recognised section headings ("EXPERIENCE", "Technical Skills:", ...).
+    Text before the first heading is returned as "header" (name, contact details);
+    repeated headings of the same section are merged. Returns {"header": text} when no
+    heading is found.
+    """
+    sections: Dict[str, List[str]] = {"header": []}
+    current = "header"
+    for line in text.splitlines():
+        section = _heading_section(line.strip())
+        if section is not None:
+            current = section
+            sections.setdefault(current, [])
+            continue
+        sections[current].append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if name == "header" or any(l.strip() for l in lines)}
@@ -0,0 +1,147 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo.errors import OperationFailure
+from backend.db import RESUME_TEXT_WEIGHTS, resumes
+
+logger = logging.getLogger(__name__)
+
+# Admin full-text search over stored resumes.
+#
+# Queries go through the weighted "resume_search" text index (see db.ensure_indexes), so
+# ranking happens inside MongoDB and only the top hits are read. Highlights are computed
+# here for those hits only. Until the index exists (it is built in the background at
+# startup) a slower escaped-regex scan with the same weights keeps search working.
+
+MAX_TERMS = 10
+SNIPPET_RADIUS = 60
+MAX_SNIPPETS = 3
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+# One-letter words that are never what an admin is looking for ("C" and "R" are)
+_STOP_LETTERS = {"a", "i"}
+
+
+def _has(field: str) -> Dict[str, Any]:
+    return {"$gt": [{"$ifNull": [field, None]}, None]}
+
+# Fields of the admin resume list. Legacy documents keep the file inline (file_b64), so
+# availability is computed server-side instead of shipping the file with every row.
+LIST_PROJECTION = {
+    "user_id": 1, "filename": 1, "status": 1, "tags": 1, "created_at": 1, "mime_type": 1, "notes": 1,
+    "file_available": {"$or": [_has("$file_id"), _has("$file_b64")]},
+}
+SEARCH_PROJECTION = {**LIST_PROJECTION, "job_title": 1, "text": 1, "feedback.Keywords": 1}
+
+
+def query_terms(q: str) -> List[str]:
+    terms = []
+    for t in _TERM_RE.findall((q or "").lower()):
+        if t not in _STOP_LETTERS and t not in terms:
+            terms.append(t)
+    return terms[:MAX_TERMS]
+
+
+def _terms_source(terms: List[str]) -> str:
+    # Prefix match so "develop" also marks "developer"/"developing", close to the index's
+    # stemming; one-letter terms ("C", "R") only match as whole words
+    return r"\b(?:" + "|".join(
+        re.escape(t) + (r"\b" if len(t) == 1 else r"\w*") for t in terms
+    ) + ")"
+
+
+def _terms_re(terms: List[str]) -> re.Pattern:
+    return re.compile(_terms_source(terms), re.IGNORECASE)
+
+
+def _utf16_offset(text: str, index: int) -> int:
+    # The client slices JavaScript strings, which count characters outside the BMP (emoji) twice
+    return index + sum(1 for ch in text[:index] if ord(ch) > 0xFFFF)
+
+
+def highlight(text: str, terms: List[str], max_snippets: int = MAX_SNIPPETS, radius: int = SNIPPET_RADIUS) -> List[Dict[str, Any]]:
+    """
+    Returns up to `max_snippets` excerpts of `text` around the query terms, each with the
+    [start, end) offsets of the matches inside the snippet (the client does the marking).
+    Offsets are in UTF-16 code units, as JavaScript indexes strings.
+    """
+    if not text or not terms:
+        return []
+    pattern = _terms_re(terms)
+    windows: List[Tuple[int, int]] = []
+    for m in pattern.finditer(text):
+        start, end = max(0, m.start() - radius), min(len(text), m.end() + radius)
+        if windows and start <= windows[-1][1]:
+            # Overlapping context: extend the previous snippet
+            windows[-1] = (windows[-1][0], end)
+        elif len(windows) < max_snippets:
+            windows.append((start, end))
+        else:
+            break
+    snippets = []
+    for start, end in windows:
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        snippet = prefix + " ".join(text[start:end].split()) + suffix
+        # Offsets are taken after whitespace collapsing; the ellipses are not words, so
+        # matching the whole snippet finds the same terms
+        matches = [[_utf16_offset(snippet, m.start()), _utf16_offset(snippet, m.end())] for m in pattern.finditer(snippet)]
+        snippets.append({"snippet": snippet, "matches": matches})
+    return snippets
+
+
+def _field_values(doc: Dict[str, Any], field: str) -> List[str]:
+    value: Any = doc
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    if value is None:
+        return []
+    return [str(v) for v in value] if isinstance(value, list) else [str(value)]
+
+
+def matched_fields(doc: Dict[str, Any], terms: List[str]) -> List[str]:
+    pattern = _terms_re(terms)
+    return [f for f in RESUME_TEXT_WEIGHTS if any(pattern.search(v) for v in _field_values(doc, f))]
+
+
+def fallback_score(doc: Dict[str, Any], terms: List[str]) -> float:
+    pattern = _terms_re(terms)
+    return float(sum(
+        weight * sum(len(pattern.findall(v)) for v in _field_values(doc, field))
+        for field, weight in RESUME_TEXT_WEIGHTS.items()
+    ))
+
+
+async def _fallback_search(terms: List[str], filt: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    pattern = _terms_source(terms)
+    query = {**filt, "$or": [{field: {"$regex": pattern, "$options": "i"}} for field in RESUME_TEXT_WEIGHTS]}
+    docs = [d async for d in resumes.aggregate([{"$match": query}, {"$project": SEARCH_PROJECTION}])]
+    for d in docs:
+        d["score"] = fallback_score(d, terms)
+    docs.sort(key=lambda d: d["score"], reverse=True)
+    return docs[:limit]
+
+
+async def search_resumes(q: str, filt: Optional[Dict[str, Any]] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """Ranked resumes matching `q` (plus `filt`), each with `score`, `highlights` and `matched_fields`."""
+    terms = query_terms(q)
+    if not terms:
+        return []
+    filt = dict(filt or {})
+    try:
+        pipeline = [
+            {"$match": {**filt, "$text": {"$search": " ".join(terms)}}},
+            {"$sort": {"score": {"$meta": "textScore"}}},
+            {"$limit": limit},
+            {"$project": {**SEARCH_PROJECTION, "score": {"$meta": "textScore"}}},
+        ]
+        docs = [d async for d in resumes.aggregate(pipeline)]
+    except OperationFailure as e:
+        # IndexNotFound: the text index has not been built yet
+        logger.warning("Resume text index unavailable, falling back to a regex scan: %s", e)
+        docs = await _fallback_search(terms, filt, limit)
+
+    for d in docs:
+        d["highlights"] = highlight(d.get("text", ""), terms)
+        d["matched_fields"] = matched_fields(d, terms)
+    return docs
@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import uuid
+import weakref
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from backend.config import SINGLE_FLIGHT_DISTRIBUTED, SINGLE_FLIGHT_LEASE_SECONDS, SINGLE_FLIGHT_RESULT_TTL_SECONDS
+from backend.db import llm_flights
+from backend.services.metrics import single_flight_calls
+from backend.services.utils import get_malaysia_time
+
+logger = logging.getLogger(__name__)
+
+# Request coalescing for expensive, deterministic-enough work (LLM completions).
+#
+# Concurrent calls with the same key share one execution: inside a process the first
+# caller starts a task and later callers await the same task. Across processes the
+# first caller inserts a lease document into llm_flights (`_id` = flight:key); others
+# poll it until the leader publishes the result, which stays readable for
+# SINGLE_FLIGHT_RESULT_TTL_SECONDS so a late retry is answered too. A leader that dies
+# leaves an expired lease behind, which the next caller takes over.
+
+RUNNING = "running"
+DONE = "done"
+
+
+def content_key(*parts: Any) -> str:
+    """Stable hash of JSON-able call arguments."""
+    raw = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        name: str,
+        collection=None,
+        lease_seconds: float = 90,
+        result_ttl_seconds: float = 30,
+        poll_interval: float = 0.25,
+    ):
+        self.name = name
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.result_ttl_seconds = result_ttl_seconds
+        self.poll_interval = poll_interval
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        # In-flight tasks per event loop (serverless re-executions get a fresh loop)
+        self._flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+
+    def _count(self, outcome: str):
+        single_flight_calls.labels(self.name, outcome).inc()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns fn()'s result, running it once for all concurrent callers with the same key."""
+        loop = asyncio.get_running_loop()
+        flights = self._flights.setdefault(loop, {})
+        task = flights.get(key)
+        if task is not None:
+            self._count("coalesced")
+        else:
+            task = loop.create_task(self._run(key, fn))
+            flights[key] = task
+
+            def done(t: asyncio.Task):
+                flights.pop(key, None)
+                if not t.cancelled():
+                    t.exception() # Retrieved here so a task no caller waits for anymore does not warn
+
+            task.add_done_callback(done)
+        # A caller that goes away (client disconnect) does not cancel the shared work
+        return await asyncio.shield(task)
+
+    async def _run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if self.collection is None:
+            self._count("leader")
+            return await fn()
+        doc_id = f"{self.name}:{key}"
+        while True:
+            try:
+                doc = await self._acquire(doc_id)
+            except Exception as e:
+                logger.warning("Single-flight lease for %s unavailable, running locally: %s", self.name, e)
+                self._count("fallback")
+                return await fn()
+            if doc is None:
+                return await self._lead(doc_id, fn)
+            if doc.get("status") == DONE:
+                self._count("shared")
+                return doc.get("value")
+            # Another process is running it; check again shortly
+            await asyncio.sleep(self.poll_interval)
+
+    async def _acquire(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """None if this process now holds the lease, otherwise the current flight document."""
+        now = get_malaysia_time()
+        lease = {
+            "owner": self._owner,
+            "status": RUNNING,
+            "lease_until": now + timedelta(seconds=self.lease_seconds),
+            "expires_at": now + timedelta(seconds=self.lease_seconds + self.result_ttl_seconds),
+        }
+        try:
+            await self.collection.insert_one({"_id": doc_id, **lease})
+            self._count("leader")
+            return None
+        except DuplicateKeyError:
+            pass
+        # Take over an abandoned lease or a result past its TTL (the TTL monitor runs once a minute)
+        taken = await self.collection.find_one_and_update(
+            {"_id": doc_id, "$or": [
+                {"status": RUNNING, "lease_until": {"$lt": now}},
+                {"status": DONE, "expires_at": {"$lt": now}},
+            ]},
+            {"$set": lease, "$unset": {"value": ""}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if taken is not None:
+            self._count("takeover")
+            return None
+        doc = await self.collection.find_one({"_id": doc_id})
+        # Gone in between (leader failed): report it as running so the caller retries
+        return doc or {"status": RUNNING}
+
+    async def _lead(self, doc_id: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fn()
+        except BaseException:
+            # Let a waiting process run it instead of waiting for the lease to expire
+            try:
+                await self.collection.delete_one({"_id": doc_id, "owner": self._owner})
+            except Exception as e:
+                logger.warning("Failed to release single-flight lease %s: %s", doc_id, e)
+            raise
+        now = get_malaysia_time()
+        try:
+            await self.collection.update_one(
+                {"_id": doc_id, "owner": self._owner},
+                {"$set": {"status": DONE, "value": value, "expires_at": now + timedelta(seconds=self.result_ttl_seconds)},
+                 "$unset": {"lease_until": ""}},
+            )
+        except Exception as e:
+            logger.warning("Failed to publish single-flight result %s: %s", doc_id, e)
+            try:
+                await self.collection.delete_one({"_id": doc_id, "owner": self._owner})
+            except Exception:
+                pass
+        return value
+
+
+def llm_flight(name: str) -> SingleFlight:
+    """A single-flight group for one kind of LLM call, configured from SINGLE_FLIGHT_*."""
+    return SingleFlight(
+        name,
+        collection=llm_flights if SINGLE_FLIGHT_DISTRIBUTED else None,
+        lease_seconds=SINGLE_FLIGHT_LEASE_SECONDS,
+        result_ttl_seconds=SINGLE_FLIGHT_RESULT_TTL_SECONDS,
+    )
@@ -0,0 +1,210 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli  # Optional: adds a br variant when the module is installed
+except ImportError:
+    brotli = None
+
+# In-memory frontend assets.
+#
+# Each file is read once, pre-compressed (gzip, and brotli when available) and given a
+# strong ETag derived from its content, so a request is served from memory with no
+# stat/open/compress work. HTML files get their /static/... references rewritten to
+# `?v=<hash>` so the referenced assets can be cached as immutable by browsers.
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Files larger than this are streamed from disk instead of being held in memory
+MAX_CACHED_BYTES = 1024 * 1024
+# Already-compressed formats are not worth re-compressing
+_INCOMPRESSIBLE = {"image/png", "image/jpeg", "image/gif", "image/webp", "font/woff2", "application/zip", "application/pdf"}
+
+_STATIC_REF_RE = re.compile(r'((?:href|src)=["\'])(/static/[^"\'?#]+)(["\'])')
+
+
+class Asset:
+    __slots__ = ("path", "mtime", "content_type", "etag", "variants")
+
+    def __init__(self, path: str, mtime: float, content_type: str, body: bytes):
+        self.path = path
+        self.mtime = mtime
+        self.content_type = content_type
+        self.etag = hashlib.sha256(body).hexdigest()[:20]
+        # encoding -> (body, etag); identity is always present
+        self.variants: Dict[str, Tuple[bytes, str]] = {"identity": (body, f'"{self.etag}"')}
+        if content_type.split(";")[0] not in _INCOMPRESSIBLE and len(body) > 256:
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                self.variants["gzip"] = (gz, f'"{self.etag}-gzip"')
+            if brotli is not None:
+                br = brotli.compress(body, quality=11)
+                if len(br) < len(body):
+                    self.variants["br"] = (br, f'"{self.etag}-br"')
+
+    @property
+    def fingerprint(self) -> str:
+        return self.etag[:12]
+
+    def choose(self, accept_encoding: str) -> str:
+        accepted = _parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted.get(encoding, 0) > 0:
+                return encoding
+        return "identity"
+
+    def matches(self, if_none_match: str) -> bool:
+        if not if_none_match:
+            return False
+        tags = [t.strip() for t in if_none_match.split(",")]
+        if "*" in tags:
+            return True
+        known = {etag for _, etag in self.variants.values()}
+        return any((t[2:] if t.startswith("W/") else t) in known for t in tags)
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+class AssetCache:
+    """
+    Loads files under `root` on first request and keeps them in memory.
+    With reload=True (local development) each hit re-checks the file's mtime.
+    """
+
+    def __init__(self, root: str, reload: bool = False):
+        self.root = os.path.realpath(root)
+        self.reload = reload
+        self._assets: Dict[str, Optional[Asset]] = {}
+        # Re-entrant: loading an HTML file loads the assets it references
+        self._lock = threading.RLock()
+
+    def resolve(self, rel_path: str) -> Optional[str]:
+        full = os.path.realpath(os.path.join(self.root, rel_path.lstrip("/")))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            return None
+        return full if os.path.isfile(full) else None
+
+    def get(self, rel_path: str) -> Optional[Asset]:
+        rel_path = rel_path.lstrip("/")
+        asset = self._assets.get(rel_path)
+        if asset is not None and not self.reload:
+            return asset
+        full = self.resolve(rel_path)
+        if full is None:
+            return None
+        mtime = os.stat(full).st_mtime
+        if asset is not None and asset.mtime == mtime:
+            return asset
+        with self._lock:
+            asset = self._load(full, mtime)
+            self._assets[rel_path] = asset
+        return asset
+
+    def _load(self, full: str, mtime: float) -> Optional[Asset]:
+        if os.path.getsize(full) > MAX_CACHED_BYTES:
+            return None
+        content_type = mimetypes.guess_type(full)[0] or "application/octet-stream"
+        with open(full, "rb") as f:
+            body = f.read()
+        if content_type == "text/html":
+            body = self._fingerprint_refs(body.decode("utf-8")).encode("utf-8")
+        if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+            content_type += "; charset=utf-8"
+        return Asset(full, mtime, content_type, body)
+
+    def _fingerprint_refs(self, html: str) -> str:
+        """Appends ?v=<content hash> to /static/... URLs that exist under this cache's root."""
+        def repl(m):
+            ref = m.group(2)
+            if ref.endswith(".html"):
+                return m.group(0)
+            asset = self.get(ref)
+            if asset is None:
+                return m.group(0)
+            return f"{m.group(1)}{ref}?v={asset.fingerprint}{m.group(3)}"
+        return _STATIC_REF_RE.sub(repl, html)
+
+    def preload(self, rel_paths: List[str]):
+        for rel_path in rel_paths:
+            self.get(rel_path)
+
+    def response(self, request: Request, rel_path: str, cache_control: str = REVALIDATE, status_code: int = 200) -> Optional[Response]:
+        """Builds the response for `rel_path`, or returns None if it does not exist."""
+        asset = self.get(rel_path)
+        if asset is None:
+            full = self.resolve(rel_path)
+            # Too large for the cache: fall back to streaming from disk
+            return FileResponse(full, headers={"Cache-Control": cache_control}) if full else None
+
+        encoding = asset.choose(request.headers.get("accept-encoding", ""))
+        body, etag = asset.variants[encoding]
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if status_code == 200 and asset.matches(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(status_code=status_code, headers=headers, media_type=asset.content_type)
+        return Response(content=body, status_code=status_code, headers=headers, media_type=asset.content_type)
+
+
+class CachedStaticFiles:
+    """
+    ASGI app for the /static mount, serving from an AssetCache.
+    Requests carrying the current fingerprint (?v=<hash>) are cacheable for a year;
+    anything else (including HTML pages) must be revalidated, which is a cheap 304.
+    """
+
+    def __init__(self, cache: AssetCache, prefix: str = "static"):
+        self.cache = cache
+        self.prefix = prefix.strip("/")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        request = Request(scope, receive)
+        if request.method not in ("GET", "HEAD"):
+            response = Response("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+            await response(scope, receive, send)
+            return
+
+        path, root_path = scope.get("path", ""), scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            # Starlette >= 0.33 keeps the full path and puts the mount prefix in root_path
+            path = path[len(root_path):]
+        # Normalising against "/" clamps any ".." so the path cannot leave the prefix
+        rel_path = f"{self.prefix}/{posixpath.normpath('/' + path).lstrip('/')}"
+
+        asset = self.cache.get(rel_path)
+        version = request.query_params.get("v")
+        cache_control = IMMUTABLE if asset is not None and version and version == asset.fingerprint else REVALIDATE
+        response = self.cache.response(request, rel_path, cache_control)
+        if response is None:
+            response = Response("Not Found", status_code=404)
+        await response(scope, receive, send)
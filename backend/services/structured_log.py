@@ -0,0 +1,128 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from backend.config import LOG_LEVEL, LOG_FORMAT, LOG_REQUEST_SAMPLE_RATE, LOG_SLOW_REQUEST_MS
+
+request_logger = logging.getLogger("icp.request")
+
+# Per-request timing accumulator, e.g. {"db_ms": 12.3, "db_calls": 4, "llm_ms": 850.0, "llm_calls": 1}.
+# The dict is created by the request middleware and mutated in place, so time recorded inside
+# child tasks (which copy the context) is still visible to the middleware.
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line. Fields passed via `extra=` are included."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+def configure_logging():
+    """
+    Routes all logging through a QueueHandler so request handlers never block on stdout.
+    A background QueueListener thread does the formatting and the actual write.
+    Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def start_request_timings():
+    """Installs a fresh timing accumulator for the current request. Returns a reset token."""
+    return _request_timings.set({})
+
+
+def reset_request_timings(token):
+    _request_timings.reset(token)
+
+
+def get_request_timings() -> Dict[str, float]:
+    return _request_timings.get() or {}
+
+
+def add_timing(kind: str, elapsed_ms: float, calls: int = 1):
+    """Adds `elapsed_ms` to the current request's `<kind>_ms` total. No-op outside a request."""
+    timings = _request_timings.get()
+    if timings is None:
+        return
+    timings[f"{kind}_ms"] = timings.get(f"{kind}_ms", 0.0) + elapsed_ms
+    timings[f"{kind}_calls"] = timings.get(f"{kind}_calls", 0) + calls
+
+
+@contextmanager
+def timed(kind: str):
+    """Context manager that records the enclosed block's duration under `kind`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(kind, (time.perf_counter() - start) * 1000)
+
+
+def log_request(method: str, route: str, path: str, status: int, latency_ms: float, client_ip: str = None):
+    """
+    Emits one structured line per request. Successful fast requests are sampled at
+    LOG_REQUEST_SAMPLE_RATE; server errors and slow requests are always logged.
+    """
+    if not request_logger.isEnabledFor(logging.INFO):
+        return
+    always = status >= 500 or latency_ms >= LOG_SLOW_REQUEST_MS
+    if not always and LOG_REQUEST_SAMPLE_RATE < 1.0 and random.random() >= LOG_REQUEST_SAMPLE_RATE:
+        return
+
+    fields: Dict[str, Any] = {
+        "method": method,
+        "route": route,
+        "path": path,
+        "status": status,
+        "latency_ms": round(latency_ms, 2),
+        "client_ip": client_ip,
+    }
+    for key, value in get_request_timings().items():
+        fields[key] = round(value, 2) if isinstance(value, float) else value
+    request_logger.info("request", extra=fields)
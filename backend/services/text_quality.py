@@ -0,0 +1,332 @@
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+from backend.services.metrics import answer_checks, resume_gate_decisions
+from backend.services.resume_parser import section_headings
+
+logger = logging.getLogger(__name__)
+
+# Cheap local text checks that run before any LLM call: is_gibberish for job titles,
+# score_answer for interview answers and resume_gate for uploaded documents. All of
+# them work from the same character profile.
+#
+# Counting is done on a "shape" of the text: its UTF-8 bytes translated to one class
+# letter each (a vowel, b consonant, 0 digit, space, . symbol, u non-ASCII). translate()
+# and bytes.count() run in C, so a whole document costs a few dozen microseconds where
+# per-character Python loops or Unicode regex scans cost milliseconds.
+
+# Character ratios below/above which a text is gibberish
+MIN_ALPHA_SPACE_RATIO = 0.4
+MAX_SYMBOL_RATIO = 0.4
+
+COMMON_ABBREVIATIONS = {"hr", "vp", "it", "ai", "ceo", "cto", "cfo", "coo", "qa", "ux", "ui", "pm"}
+
+
+def _build_shape_table() -> bytes:
+    table = bytearray(b"." * 256)
+    for c in b"bcdfghjklmnpqrstvwxzBCDFGHJKLMNPQRSTVWXZ":
+        table[c] = ord("b")
+    for c in b"aeiouyAEIOUY":  # 'y' as a semi-vowel
+        table[c] = ord("a")
+    for c in b"0123456789":
+        table[c] = ord("0")
+    for c in b" \t\n\r\x0b\x0c":
+        table[c] = ord(" ")
+    for c in range(128, 256):
+        table[c] = ord("u")
+    return bytes(table)
+
+
+_SHAPE_TABLE = _build_shape_table()
+# Shape -> letters only (everything else becomes a word break), and raw bytes -> digits only
+_WORDS_TABLE = bytes.maketrans(b"0.", b"  ")
+_DIGITS_TABLE = bytes(c if 48 <= c <= 57 else 32 for c in range(256))
+
+
+def text_shape(s: str) -> bytes:
+    return s.encode("utf-8", "replace").translate(_SHAPE_TABLE)
+
+
+def shape_profile(shape: bytes) -> Dict[str, Any]:
+    """Character counts and ratios from a text shape."""
+    total = len(shape)
+    spaces = shape.count(b" ")
+    symbols = shape.count(b".")
+    letters = total - spaces - symbols - shape.count(b"0")
+    return {
+        "chars": total,
+        "alpha_space_ratio": (letters + spaces) / total if total else 0.0,
+        "symbol_ratio": symbols / total if total else 0.0,
+        "has_vowel": b"a" in shape,
+        # At least one whitespace-separated token made only of letters
+        "has_word": any(b"." not in tok and b"0" not in tok for tok in shape.split()),
+    }
+
+
+_NOT_ALPHA_SPACE_RE = re.compile(r"[\W\d_]")
+_SPACE_RE = re.compile(r"\s")
+_SYMBOL_RE = re.compile(r"[^\w\s]|_")
+_VOWEL_RE = re.compile(r"[aeiouy]", re.IGNORECASE)
+_ALPHA_TOKEN_RE = re.compile(r"(?:^|(?<=\s))[^\W\d_]+(?=\s|$)")
+
+
+def char_profile(s: str) -> Dict[str, Any]:
+    """shape_profile for any string; non-ASCII text is counted per character rather than per byte."""
+    if s.isascii():
+        return shape_profile(text_shape(s))
+    total = len(s)
+    letters = len(_NOT_ALPHA_SPACE_RE.sub("", s))
+    spaces = total - len(_SPACE_RE.sub("", s))
+    symbols = total - len(_SYMBOL_RE.sub("", s))
+    return {
+        "chars": total,
+        "alpha_space_ratio": (letters + spaces) / total if total else 0.0,
+        "symbol_ratio": symbols / total if total else 0.0,
+        "has_vowel": _VOWEL_RE.search(s) is not None,
+        "has_word": _ALPHA_TOKEN_RE.search(s) is not None,
+    }
+
+
+def _gibberish_profile(profile: Dict[str, Any]) -> bool:
+    if profile["alpha_space_ratio"] < MIN_ALPHA_SPACE_RATIO:
+        return True
+    if profile["symbol_ratio"] > MAX_SYMBOL_RATIO:
+        return True
+    # Short strings may lack vowels (e.g., "HR")
+    if profile["chars"] > 4 and not profile["has_vowel"]:
+        return True
+    return not profile["has_word"]
+
+
+def _gibberish(s: str, profile: Optional[Dict[str, Any]]) -> bool:
+    if not s:
+        return True
+    # Allow short common abbreviations (like HR, VP, IT, AI, CEO)
+    if s.lower() in COMMON_ABBREVIATIONS:
+        return False
+    if len(s) < 2:
+        return True
+    return _gibberish_profile(profile)
+
+
+def is_gibberish(text: str) -> bool:
+    s = (text or "").strip()
+    return _gibberish(s, char_profile(s) if s else None)
+
+
+# --- Resume gate ------------------------------------------------------------------
+#
+# Decides from local signals whether an extracted document can be a resume before it
+# is sent to mistral-large. Only clear non-resumes are rejected; anything with resume
+# structure passes and everything in between is left to the LLM (borderline). Every
+# decision is logged with its features so the thresholds can be tuned against
+# backend/benchmarks/fixtures/resume_gate.json (python -m backend.benchmarks.eval_resume_gate).
+
+PASS = "pass"
+BORDERLINE = "borderline"
+REJECT = "reject"
+
+GATE_SAMPLE_CHARS = 12000   # the first few pages decide; keeps the gate O(1) on long files
+CONTACT_SAMPLE_CHARS = 1500  # contact details sit at the top
+MIN_WORDS = 8               # fewer words and no resume signal at all: nothing to review
+MIN_WORDLIKE_RATIO = 0.6    # share of words without a 5-consonant run...
+MIN_WORDLIKE_SAMPLE = 10    # ...checked once there are this many words
+MAX_WORDS_WITHOUT_SIGNALS = 120
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_PROFILE_URL_RE = re.compile(r"(?:linkedin\.com|github\.com|gitlab\.com|behance\.net)/", re.IGNORECASE)
+
+
+def resume_features(text: str) -> Dict[str, Any]:
+    sample = (text or "")[:GATE_SAMPLE_CHARS].strip()
+    raw = sample.encode("utf-8", "replace")
+    shape = raw.translate(_SHAPE_TABLE)
+    profile = shape_profile(shape)
+    words = len(shape.translate(_WORDS_TABLE).split())
+    years = sum(1 for tok in raw.translate(_DIGITS_TABLE).split() if len(tok) == 4 and tok[:2] in (b"19", b"20"))
+    top = sample[:CONTACT_SAMPLE_CHARS]
+    contacts = sum((
+        _EMAIL_RE.search(top) is not None,
+        _PROFILE_URL_RE.search(top) is not None,
+        # Nine digits or more, so "2019 - 2021" is not a phone number
+        any(sum(c.isdigit() for c in m) >= 9 for m in _PHONE_RE.findall(top)),
+    ))
+    return {
+        "chars": len(text or ""),
+        "words": words,
+        "wordlike_ratio": round(1 - min(shape.count(b"bbbbb"), words) / words, 3) if words else 0.0,
+        "alpha_space_ratio": round(profile["alpha_space_ratio"], 3),
+        "symbol_ratio": round(profile["symbol_ratio"], 3),
+        "gibberish": _gibberish_profile(profile) if sample else True,
+        "sections": len(section_headings(sample, limit=3)),
+        "contacts": contacts,
+        "years": years,
+    }
+
+
+def classify_resume(features: Dict[str, Any]) -> Dict[str, str]:
+    """Gate decision (pass/borderline/reject) and the rule that made it."""
+    sections = features["sections"]
+    signals = sections + (1 if features["contacts"] else 0) + (1 if features["years"] >= 2 else 0)
+    if sections >= 2 or (sections and features["contacts"]):
+        return {"decision": PASS, "reason": "structure"}
+    if features["gibberish"] or (features["words"] >= MIN_WORDLIKE_SAMPLE and features["wordlike_ratio"] < MIN_WORDLIKE_RATIO):
+        return {"decision": REJECT, "reason": "gibberish"}
+    if signals == 0 and features["words"] < MIN_WORDS:
+        return {"decision": REJECT, "reason": "too_short"}
+    if signals == 0 and features["words"] >= MAX_WORDS_WITHOUT_SIGNALS:
+        return {"decision": REJECT, "reason": "no_resume_signals"}
+    return {"decision": BORDERLINE, "reason": "weak_signals" if signals else "short_text"}
+
+
+def resume_gate(text: str, source: str = "upload") -> Dict[str, Any]:
+    """Classifies an extracted document and logs the decision with its features."""
+    start = time.perf_counter()
+    features = resume_features(text)
+    result = classify_resume(features)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+    resume_gate_decisions.labels(result["decision"], result["reason"]).inc()
+    logger.info(
+        "resume gate %s (%s)", result["decision"], result["reason"],
+        extra={"gate": "resume", "source": source, **result, **features, "elapsed_us": round(elapsed_us, 1)},
+    )
+    return {**result, "features": features}
+
+
+# --- Answer quality -----------------------------------------------------------------
+#
+# Scores an interview answer before it is sent to the interviewer model. Clearly
+# unusable answers (gibberish, one character or word repeated) get the local re-ask;
+# short or unlikely-looking ones, including text the English model scores as mash
+# (Malay answers land there too), are sent on with a confidence value so the model
+# can ask for more. The language signal is the average cost in bits per
+# character of the answer's letters under a character trigram model of English, read
+# from backend/data/char_trigrams.bin (one byte per trigram over a-z plus a boundary
+# symbol; rebuilt with python -m backend.benchmarks.build_char_ngrams).
+
+OK = "ok"
+UNUSABLE = "unusable"  # BORDERLINE as above
+
+NGRAM_ALPHABET = 27          # a-z, then one boundary symbol for everything else
+NGRAM_SCALE = 16             # table bytes are -log2 P(c | a, b) * NGRAM_SCALE
+NGRAM_TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "char_trigrams.bin")
+
+BITS_FLUENT = 3.2            # typical English answers score at or below this...
+BITS_JUNK = 5.0              # ...and keyboard mash at or above this
+MIN_SCORED_LETTERS = 12      # shorter answers ("HR", "ok") are not judged on letters alone
+MAX_CHAR_RUN = 6             # "jjjjjj"
+MIN_UNIQUE_WORD_RATIO = 0.34 # "test test test test test test"
+FULL_ANSWER_WORDS = 12
+CONFIDENT_ANSWER = 0.6       # below this an answer is borderline
+
+_LETTERS_TABLE = bytes(
+    c + 32 if 65 <= c <= 90 else c if 97 <= c <= 122 else 32 for c in range(256)
+)
+_CODES_TABLE = bytes(c - 97 if 97 <= c <= 122 else NGRAM_ALPHABET - 1 for c in range(256))
+_BOUNDARY = bytes([NGRAM_ALPHABET - 1])
+
+_ngram_table: Optional[bytes] = None
+_ngram_table_loaded = False
+
+
+def _letter_words(text: str):
+    return text.encode("ascii", "replace").translate(_LETTERS_TABLE).split()
+
+
+def _codes(words) -> bytes:
+    return _BOUNDARY + b" ".join(words).translate(_CODES_TABLE) + _BOUNDARY
+
+
+def ngram_codes(text: str) -> bytes:
+    """Text as alphabet codes: letters 0-25 (case folded), one 26 per run of anything else, padded with 26."""
+    return _codes(_letter_words(text))
+
+
+def ngram_table() -> Optional[bytes]:
+    """The trigram cost table, read on first use (None when the artifact is missing)."""
+    global _ngram_table, _ngram_table_loaded
+    if not _ngram_table_loaded:
+        _ngram_table_loaded = True
+        try:
+            with open(NGRAM_TABLE_PATH, "rb") as f:
+                table = f.read()
+            if len(table) == NGRAM_ALPHABET ** 3:
+                _ngram_table = table
+            else:
+                logger.warning("Ignoring %s: unexpected size %d", NGRAM_TABLE_PATH, len(table))
+        except OSError as e:
+            logger.warning("Answer scoring without the language model: %s", e)
+    return _ngram_table
+
+
+def answer_features(text: str) -> Dict[str, Any]:
+    s = (text or "").strip()
+    profile = char_profile(s) if s else None
+    words = _letter_words(s)
+    codes = _codes(words)
+
+    # One pass over the letters: trigram cost and the longest run of one character
+    table = ngram_table()
+    n = NGRAM_ALPHABET
+    cost = 0
+    run = max_run = 1
+    a, b = codes[0], codes[1] if len(codes) > 1 else codes[0]
+    for c in codes[2:]:
+        if table is not None:
+            cost += table[(a * n + b) * n + c]
+        run = run + 1 if c == b and c != n - 1 else 1
+        if run > max_run:
+            max_run = run
+        a, b = b, c
+    scored = len(codes) - 2
+    letters = len(codes) - 1 - len(words)
+    return {
+        "chars": len(s),
+        "words": len(words),
+        "letters": letters,
+        "unique_word_ratio": round(len(set(words)) / len(words), 3) if words else 0.0,
+        "bits_per_char": round(cost / NGRAM_SCALE / scored, 2) if table is not None and scored > 0 else None,
+        "max_char_run": max_run if letters else 0,
+        "gibberish": _gibberish(s, profile),
+    }
+
+
+def classify_answer(features: Dict[str, Any]) -> Dict[str, Any]:
+    """Verdict (ok/borderline/unusable), the rule behind it and a 0-1 confidence that the answer is usable."""
+    if features["gibberish"]:
+        return {"verdict": UNUSABLE, "reason": "gibberish", "confidence": 0.0}
+    # A stretched word ("soooo", "ummmm") only sinks an answer it is most of
+    stretched = features["max_char_run"] >= MAX_CHAR_RUN
+    if stretched and (features["letters"] < MIN_SCORED_LETTERS or features["max_char_run"] * 2 > features["letters"]):
+        return {"verdict": UNUSABLE, "reason": "repeated_chars", "confidence": 0.0}
+    if features["words"] >= 6 and features["unique_word_ratio"] < MIN_UNIQUE_WORD_RATIO:
+        return {"verdict": UNUSABLE, "reason": "repeated_words", "confidence": 0.0}
+
+    bits = features["bits_per_char"]
+    language = 1.0
+    # The trigram model only knows English: Malay and Manglish answers score close to
+    # keyboard mash, so an unlikely score alone sends the answer to the model as borderline
+    unlikely = bits is not None and features["letters"] >= MIN_SCORED_LETTERS and bits >= BITS_JUNK
+    if bits is not None and features["letters"] >= MIN_SCORED_LETTERS:
+        language = max(0.0, min(1.0, (BITS_JUNK - bits) / (BITS_JUNK - BITS_FLUENT)))
+    length = min(1.0, features["words"] / FULL_ANSWER_WORDS)
+    variety = min(1.0, features["unique_word_ratio"] / 0.5)
+    confidence = round(language * (0.4 + 0.6 * length) * variety, 2)
+    if stretched:
+        return {"verdict": BORDERLINE, "reason": "repeated_chars", "confidence": confidence}
+    if unlikely:
+        return {"verdict": BORDERLINE, "reason": "not_language", "confidence": confidence}
+    if confidence >= CONFIDENT_ANSWER:
+        return {"verdict": OK, "reason": "ok", "confidence": confidence}
+    return {"verdict": BORDERLINE, "reason": "short" if length < 1 else "unlikely_text", "confidence": confidence}
+
+
+def score_answer(text: str) -> Dict[str, Any]:
+    """Scores an interview answer and counts the verdict."""
+    features = answer_features(text)
+    result = classify_answer(features)
+    answer_checks.labels(result["verdict"], result["reason"]).inc()
+    return {**result, "features": features}
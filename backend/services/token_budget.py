@@ -0,0 +1,170 @@
+import json
+import logging
+import re
+from typing import Any, Dict, List, Sequence, Tuple
+from backend.services.metrics import prompt_size, prompt_tokens
+
+logger = logging.getLogger(__name__)
+
+# Prompt budgeting for the Mistral calls.
+#
+# Token counts here are local estimates, not the model tokenizer: one token per word or
+# punctuation mark, plus one for each long word (which the tokenizer splits into several
+# pieces). That is close enough to decide what to trim, costs two regex scans and needs
+# no tokenizer download. The provider-reported counts stay in icp_llm_tokens.
+
+MESSAGE_OVERHEAD_TOKENS = 4  # role and separators around each chat message
+TRUNCATED_MARKER = "[... truncated]"
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_LONG_WORD_RE = re.compile(r"\w{8,}")
+_INLINE_SPACE_RE = re.compile(r"[ \t\f\v\u00a0\u2000-\u200b\u3000]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n\s*\n+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of text."""
+    if not text:
+        return 0
+    return len(_PIECE_RE.findall(text)) + len(_LONG_WORD_RE.findall(text))
+
+
+def estimate_messages(messages: Sequence[Dict[str, Any]]) -> int:
+    return sum(estimate_tokens(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapses runs of spaces, trailing spaces and blank lines (PDF/DOCX extraction leaves plenty)."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _INLINE_SPACE_RE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def dedupe_chunks(chunks: Sequence[str]) -> List[str]:
+    """Drops chunks that repeat (or are contained in) an earlier one, ignoring case and spacing."""
+    kept: List[str] = []
+    seen: List[str] = []
+    for chunk in chunks:
+        key = " ".join(chunk.lower().split())
+        if not key or any(key in s for s in seen):
+            continue
+        kept.append(chunk)
+        seen.append(key)
+    return kept
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keeps the leading lines of text within max_tokens, marking the cut. The line that does not fit is cut between words."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max(0, max_tokens - estimate_tokens(TRUNCATED_MARKER))
+    kept: List[str] = []
+    used = 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            # PDFs often extract as a few very long lines: keep the words of this one that fit
+            left = budget - used - 1
+            end = 0
+            for m in _PIECE_RE.finditer(line):
+                left -= 2 if _LONG_WORD_RE.match(m.group()) else 1
+                if left < 0:
+                    break
+                end = m.end()
+            if end:
+                kept.append(line[:end])
+            break
+        kept.append(line)
+        used += cost
+    kept.append(TRUNCATED_MARKER)
+    return "\n".join(kept)
+
+
+def window_transcript(history: Sequence[Dict[str, Any]], max_tokens: int) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    The most recent messages of an interview transcript that fit in max_tokens, and the
+    number of messages left out. Messages are dropped from the front two at a time (one
+    question and its answer), so the window keeps the transcript's turn order; the latest
+    question/answer pair is always kept.
+    """
+    history = list(history)
+    costs = [estimate_tokens(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in history]
+    total = sum(costs)
+    start = 0
+    while total > max_tokens and len(history) - start > 2:
+        total -= costs[start] + costs[start + 1]
+        start += 2
+    return history[start:], start
+
+
+def compact_feedback(feedback: Any, max_items: int = 3, max_keywords: int = 10) -> str:
+    """
+    The parts of a resume analysis the interviewer uses, as compact JSON: score, top
+    strengths and weaknesses, and keywords. Suggestions, location and flags are dropped.
+    """
+    if not isinstance(feedback, dict):
+        return str(feedback or "")
+    compact: Dict[str, Any] = {}
+    if feedback.get("Score") is not None:
+        compact["Score"] = feedback["Score"]
+    for key, limit in (("Advantages", max_items), ("Disadvantages", max_items), ("Keywords", max_keywords)):
+        items = feedback.get(key)
+        if isinstance(items, list) and items:
+            compact[key] = items[:limit]
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+
+class PromptBudget:
+    """Estimated tokens per prompt component of one LLM call, before (raw) and after (sent) compaction."""
+
+    def __init__(self, call: str):
+        self.call = call
+        self.raw: Dict[str, int] = {}
+        self.sent: Dict[str, int] = {}
+
+    def add(self, component: str, raw: int, sent: int = None):
+        self.raw[component] = raw
+        self.sent[component] = raw if sent is None else sent
+
+    @property
+    def raw_total(self) -> int:
+        return sum(self.raw.values())
+
+    @property
+    def sent_total(self) -> int:
+        return sum(self.sent.values())
+
+    def record(self):
+        for component, raw in self.raw.items():
+            prompt_tokens.labels(self.call, component, "raw").inc(raw)
+            prompt_tokens.labels(self.call, component, "sent").inc(self.sent[component])
+        prompt_size.labels(self.call).observe(self.sent_total)
+        if self.sent_total < self.raw_total:
+            logger.debug("Prompt for %s compacted from ~%d to ~%d tokens", self.call, self.raw_total, self.sent_total)
+
+
+def fit_resume_prompt(build_prompt, text: str, chunks: Sequence[str], max_tokens: int, separator: str = "\n---\n") -> Tuple[str, PromptBudget]:
+    """
+    Builds the resume feedback prompt within max_tokens. In order: normalize the resume's
+    whitespace, drop duplicate guideline chunks, drop the lowest-ranked chunks (the best one
+    is kept), then cut the resume text.
+    """
+    budget = PromptBudget("get_feedback")
+    resume = normalize_whitespace(text)
+    kept = dedupe_chunks(chunks)
+    instructions = estimate_tokens(build_prompt("", ""))
+    resume_tokens = estimate_tokens(resume)
+    chunk_tokens = [estimate_tokens(c) + 1 for c in kept]
+    while len(kept) > 1 and instructions + sum(chunk_tokens) + resume_tokens > max_tokens:
+        kept.pop()
+        chunk_tokens.pop()
+    room = max_tokens - instructions - sum(chunk_tokens)
+    if resume_tokens > room:
+        resume = truncate_to_tokens(resume, max(room, 0))
+        resume_tokens = estimate_tokens(resume)
+
+    budget.add("instructions", instructions)
+    budget.add("context", sum(estimate_tokens(c) + 1 for c in chunks), sum(chunk_tokens))
+    budget.add("resume", estimate_tokens(text), resume_tokens)
+    return build_prompt(resume, separator.join(kept)), budget
@@ -0,0 +1,253 @@
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from backend.config import (
+    TRACE_SAMPLE_RATE, TRACE_EXPORT, TRACE_FILE, TRACE_OTLP_ENDPOINT, SERVER_TIMING_ENABLED
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-request tracing. A Trace is installed by the request middleware; code below it opens
+# spans with `span()` / `@traced` or records finished leaf spans with `add_span()`.
+# When the request is not sampled there is no active trace and every call returns
+# immediately after one ContextVar lookup.
+
+_active_trace: ContextVar[Optional["Trace"]] = ContextVar("active_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+# Wall-clock anchor so perf_counter readings can be exported as Unix timestamps
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "start", "end", "attrs", "_token")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start = time.perf_counter()
+        self.end = None
+        self.attrs = attrs
+        self._token = None
+
+    def set(self, key: str, value: Any):
+        self.attrs[key] = value
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = time.perf_counter()
+        if exc is not None:
+            self.attrs["error"] = type(exc).__name__
+        _current_span.reset(self._token)
+        self.trace.spans.append(self)
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": _EPOCH_OFFSET + self.start,
+            "duration_ms": round(self.duration_ms, 3),
+            "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is inactive; supports the same API at near-zero cost."""
+    __slots__ = ()
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.trace_id = _new_id(16)
+        self.spans: List[Span] = []
+        self.root = Span(self, name, None, {})
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: total per span category plus the whole request."""
+        totals: Dict[str, float] = {}
+        for s in self.spans:
+            if s is self.root:
+                continue
+            category = s.name.split(".", 1)[0]
+            totals[category] = totals.get(category, 0.0) + s.duration_ms
+        parts = [f"{name};dur={ms:.1f}" for name, ms in totals.items()]
+        parts.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(parts)
+
+
+def span(name: str, **attrs):
+    """Opens a child span of the current span: `with span("rag.retrieve", top_k=5): ...`."""
+    trace = _active_trace.get()
+    if trace is None:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    return Span(trace, name, parent.span_id if parent else trace.root.span_id, attrs)
+
+
+def add_span(name: str, start: float, end: float, **attrs):
+    """Records an already-finished leaf span from perf_counter() readings (no context switch needed)."""
+    trace = _active_trace.get()
+    if trace is None:
+        return
+    parent = _current_span.get()
+    s = Span(trace, name, parent.span_id if parent else trace.root.span_id, attrs)
+    s.start = start
+    s.end = end
+    trace.spans.append(s)
+
+
+def traced(name: str):
+    """Decorator wrapping a sync or async function in a span."""
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if _active_trace.get() is None:
+                    return await fn(*args, **kwargs)
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active_trace.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_trace(name: str):
+    """Starts a trace for the current request if it is sampled. Returns (trace, reset_token) or (None, None)."""
+    if TRACE_SAMPLE_RATE <= 0 or (TRACE_SAMPLE_RATE < 1.0 and random.random() >= TRACE_SAMPLE_RATE):
+        return None, None
+    trace = Trace(name)
+    token = _active_trace.set(trace)
+    trace.root._token = _current_span.set(trace.root)
+    return trace, token
+
+
+def finish_trace(trace: "Trace", token, **attrs) -> Optional[str]:
+    """Closes the root span, hands the trace to the exporter and returns the Server-Timing value (if enabled)."""
+    root = trace.root
+    root.attrs.update(attrs)
+    root.end = time.perf_counter()
+    _current_span.reset(root._token)
+    _active_trace.reset(token)
+    trace.spans.append(root)
+    _exporter.submit(trace)
+    return trace.server_timing() if SERVER_TIMING_ENABLED else None
+
+
+class _Exporter:
+    """Ships finished traces from a background thread so the request path never blocks on I/O."""
+
+    def __init__(self):
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, trace: Trace):
+        if TRACE_EXPORT == "none":
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+        self._queue.put(trace)
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                return
+            try:
+                if TRACE_EXPORT == "file":
+                    self._write_file(trace)
+                elif TRACE_EXPORT == "otlp":
+                    self._post_otlp(trace)
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e)
+
+    def _write_file(self, trace: Trace):
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            for s in trace.spans:
+                f.write(json.dumps(s.to_dict(), default=str) + "\n")
+
+    def _post_otlp(self, trace: Trace):
+        body = json.dumps(to_otlp(trace), default=str).encode("utf-8")
+        req = urllib.request.Request(TRACE_OTLP_ENDPOINT, data=body, headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(req, timeout=5).close()
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """Converts a trace to the OTLP/HTTP JSON payload accepted by /v1/traces collectors."""
+    spans = []
+    for s in trace.spans:
+        start_ns = int((_EPOCH_OFFSET + s.start) * 1e9)
+        end_ns = int((_EPOCH_OFFSET + (s.end or s.start)) * 1e9)
+        spans.append({
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "parentSpanId": s.parent_id or "",
+            "name": s.name,
+            "kind": 2 if s is trace.root else 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [{"key": k, "value": {"stringValue": str(v)}} for k, v in s.attrs.items()],
+        })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "icp-backend"}}]},
+            "scopeSpans": [{"scope": {"name": "backend.services.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+_exporter = _Exporter()
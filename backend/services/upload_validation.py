@@ -0,0 +1,129 @@
+import hashlib
+import logging
+from typing import Dict, Iterable, Optional
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+from backend.config import RESUME_MAX_UPLOAD_BYTES
+from backend.services.metrics import upload_rejections
+
+logger = logging.getLogger(__name__)
+
+# Resume uploads are checked while they stream in rather than after the whole file is in
+# memory:
+#
+# * UploadLimitMiddleware sits in front of the upload route. A declared Content-Length
+#   over the cap is answered with 413 before any of the body is read, and a body without
+#   one (chunked) is counted as it is received and cut off at the cap, so an oversized
+#   upload is never spooled by the multipart parser.
+# * read_upload() then reads the spooled file part in chunks: the type is sniffed from
+#   the magic bytes of the first chunk (the filename is only a hint), the size is checked
+#   on every chunk and the SHA-256 is computed on the way.
+
+CHUNK_SIZE = 64 * 1024
+# Room for the boundaries, part headers and the job_title/consent fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+# Acrobat accepts a PDF header anywhere in the first KB
+PDF_HEADER_WINDOW = 1024
+# Entries that mark a ZIP as an Office Open XML package; Word writes them first
+DOCX_MARKERS = (b"[Content_Types].xml", b"word/", b"_rels/.rels")
+
+MIME_TYPES = {"pdf": "application/pdf", "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"}
+
+DOC_MESSAGE = "Please convert .doc to .docx or pdf"
+UNSUPPORTED_MESSAGE = "Unsupported file type. Please upload a PDF or DOCX file."
+EMPTY_MESSAGE = "The uploaded file is empty."
+
+
+def too_large_message(max_bytes: int = RESUME_MAX_UPLOAD_BYTES) -> str:
+    return f"File too large. The maximum size is {max_bytes / (1024 * 1024):g} MB."
+
+
+def _reject(status_code: int, reason: str, detail: str) -> HTTPException:
+    upload_rejections.labels(reason).inc()
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+def sniff_resume_type(head: bytes, filename: Optional[str] = None) -> str:
+    """"pdf" or "docx" from the first bytes of a file; raises HTTPException for anything else."""
+    name = (filename or "").lower()
+    if head.startswith(OLE2_MAGIC) or name.endswith(".doc"):
+        raise _reject(400, "doc", DOC_MESSAGE)
+    if PDF_MAGIC in head[:PDF_HEADER_WINDOW]:
+        return "pdf"
+    if head.startswith(ZIP_MAGIC) and (name.endswith(".docx") or any(m in head for m in DOCX_MARKERS)):
+        return "docx"
+    raise _reject(415, "unsupported_type", UNSUPPORTED_MESSAGE)
+
+
+async def read_upload(file: UploadFile, max_bytes: int = RESUME_MAX_UPLOAD_BYTES, chunk_size: int = CHUNK_SIZE) -> Dict:
+    """
+    Reads an uploaded resume in chunks. Unsupported types are turned away after the first
+    chunk and oversized files as soon as they pass max_bytes.
+    Returns {"data", "kind", "mime_type", "size", "sha256"}.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise _reject(413, "too_large", too_large_message(max_bytes))
+    head = await file.read(chunk_size)
+    if not head:
+        raise _reject(400, "empty", EMPTY_MESSAGE)
+    kind = sniff_resume_type(head, file.filename)
+
+    digest = hashlib.sha256(head)
+    data = bytearray(head)
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        if len(data) + len(chunk) > max_bytes:
+            raise _reject(413, "too_large", too_large_message(max_bytes))
+        digest.update(chunk)
+        data += chunk
+    return {"data": bytes(data), "kind": kind, "mime_type": MIME_TYPES[kind], "size": len(data), "sha256": digest.hexdigest()}
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware capping the request body of the given POST paths (see above)."""
+
+    def __init__(self, app, paths: Iterable[str], max_body_bytes: int, max_file_bytes: int = RESUME_MAX_UPLOAD_BYTES):
+        self.app = app
+        self.paths = frozenset(paths)
+        self.max_body_bytes = max_body_bytes
+        self.message = too_large_message(max_file_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        declared = None
+        for name, value in scope.get("headers") or ():
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    pass
+                break
+        if declared is not None and declared > self.max_body_bytes:
+            upload_rejections.labels("too_large").inc()
+            logger.info("Upload to %s rejected: Content-Length %d over %d", scope["path"], declared, self.max_body_bytes)
+            response = JSONResponse({"detail": self.message}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised inside request.form(); FastAPI turns it into the 413 response
+                    raise _reject(413, "too_large", self.message)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,109 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from backend.config import (
+    USAGE_QUEUE_MAX, USAGE_BATCH_SIZE, USAGE_FLUSH_INTERVAL_SECONDS, USAGE_DAILY_RETENTION_DAYS
+)
+from backend.db import usage, usage_daily
+from backend.services.batch_writer import BatchWriter
+from backend.services.metrics import REGISTRY
+from backend.services.utils import get_malaysia_time
+
+# Usage accounting.
+#
+# Every quota use and every LLM completion is an event in the `usage` time series
+# (see db._ensure_usage_collection):
+#     {"ts", "meta": {"user_id", "action"}, "kind": "quota" | "llm", ...}
+# LLM events also carry the model, token counts, latency and outcome. Events are queued
+# and written in batches off the request path; analytics.compute_day aggregates them
+# into the daily cost report.
+#
+# Quota checks never scan events. Each quota use also increments a per-user counter
+# document for the Malaysia calendar day in usage_daily (`_id` = "<user_id>:<YYYY-MM-DD>"),
+# so a check is one _id lookup and a new day simply starts a new document: nothing is
+# reset. Past days expire through a TTL index on expires_at.
+
+usage_writer = BatchWriter(
+    usage,
+    name="usage",
+    max_queue=USAGE_QUEUE_MAX,
+    batch_size=USAGE_BATCH_SIZE,
+    flush_interval=USAGE_FLUSH_INTERVAL_SECONDS,
+)
+REGISTRY.gauge_func(
+    "icp_usage_writer", "Usage event writer queue counters.", ("state",),
+    lambda: {(state,): value for state, value in usage_writer.stats().items()},
+)
+
+# LLM calls made inside a track() block, recorded when it exits. The list is shared with
+# worker threads (asyncio.to_thread copies the context, not the list), so completions run
+# off the event loop are still attributed to the request that made them.
+_tracked_calls: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("usage_tracked_calls", default=None)
+
+
+def _day(now=None) -> str:
+    return (now or get_malaysia_time()).date().isoformat()
+
+
+def _daily_id(user_id: str, day: str) -> str:
+    return f"{user_id}:{day}"
+
+
+async def record_event(user_id: str, action: str, kind: str, **fields) -> bool:
+    """Queues one usage event. Returns False if the writer dropped it."""
+    doc = {"ts": fields.pop("ts", None) or get_malaysia_time(), "meta": {"user_id": user_id, "action": action}, "kind": kind}
+    doc.update(fields)
+    return await usage_writer.put(doc)
+
+
+def note_llm_call(model: str, elapsed: float, completion=None, outcome: str = "ok"):
+    """Called by llm_client for every completion; a no-op outside a track() block."""
+    calls = _tracked_calls.get()
+    if calls is None:
+        return
+    tokens = getattr(completion, "usage", None)
+    calls.append({
+        "ts": get_malaysia_time(),
+        "model": model,
+        "prompt_tokens": getattr(tokens, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(tokens, "completion_tokens", 0) or 0,
+        "latency_ms": round(elapsed * 1000, 1),
+        "outcome": outcome,
+    })
+
+
+@asynccontextmanager
+async def track(user_id: str, action: str):
+    """Attributes the LLM completions made inside the block to a user and action."""
+    calls: List[Dict[str, Any]] = []
+    token = _tracked_calls.set(calls)
+    try:
+        yield
+    finally:
+        _tracked_calls.reset(token)
+        for call in calls:
+            await record_event(user_id, action, "llm", **call)
+
+
+async def add_daily_count(user_id: str, counter: str):
+    now = get_malaysia_time()
+    day = _day(now)
+    await usage_daily.update_one(
+        {"_id": _daily_id(user_id, day)},
+        {
+            "$inc": {f"counts.{counter}": 1},
+            "$setOnInsert": {"user_id": user_id, "day": day, "expires_at": now + timedelta(days=USAGE_DAILY_RETENTION_DAYS)},
+        },
+        upsert=True,
+    )
+
+
+async def daily_counts(user_id: str, day: Optional[str] = None) -> Dict[str, int]:
+    """The user's quota counters for a Malaysia calendar day (today by default)."""
+    doc = await usage_daily.find_one({"_id": _daily_id(user_id, day or _day())}, {"counts": 1})
+    return dict(doc.get("counts") or {}) if doc else {}
+
+
+async def clear_daily_counts(user_id: str):
+    await usage_daily.delete_one({"_id": _daily_id(user_id, _day())})
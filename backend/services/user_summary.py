@@ -0,0 +1,208 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from backend.config import DAILY_QUESTION_LIMIT, DAILY_RESUME_LIMIT, DAILY_INTERVIEW_LIMIT
+from backend.db import interviews, resumes, user_summaries
+from backend.services.utils import get_malaysia_time
+
+# One materialized document per user (`_id` = user id) holding everything the dashboard
+# shows from history and resumes, so it is served by a single _id lookup. Sections:
+# "interviews" (session stats) and "resume" (latest analysis). Today's quota use is not
+# copied here: it is read from the usage_daily counters the limits are enforced on.
+#
+# Writers update it incrementally with $inc/$max/$set and never upsert: if a user has no
+# summary yet (e.g. created before this existed), the first read rebuilds it from the
+# interviews collection, which already includes whatever the skipped update recorded.
+
+QUOTA_LIMITS = {
+    "daily_resume_count": DAILY_RESUME_LIMIT,
+    "daily_interview_count": DAILY_INTERVIEW_LIMIT,
+    "daily_question_count": DAILY_QUESTION_LIMIT,
+}
+
+INTERVIEW_STATS_DEFAULTS = {
+    "sessions_started": 0,
+    "sessions_completed": 0,
+    "sessions_ended_early": 0,
+    "score_sum": 0,
+    "score_count": 0,
+    "best_score": None,
+    "latest_score": None,
+    "latest_score_at": None,
+    "last_session_at": None,
+}
+
+
+async def rebuild_interview_stats(user_id: str) -> Dict[str, Any]:
+    """Recomputes a user's interview stats from their sessions (one aggregation + one indexed lookup)."""
+    # $ifNull folds "missing" into null so that `> null` means "has a value"
+    scored = {"$gt": [{"$ifNull": ["$readiness_score", None]}, None]}
+    unscored = {"$eq": [{"$ifNull": ["$readiness_score", None]}, None]}
+    ended = {"$gt": [{"$ifNull": ["$ended_at", None]}, None]}
+    pipeline = [
+        {"$match": {"user_id": user_id}},
+        {"$group": {
+            "_id": None,
+            "sessions_started": {"$sum": 1},
+            "sessions_completed": {"$sum": {"$cond": [scored, 1, 0]}},
+            "sessions_ended_early": {"$sum": {"$cond": [{"$and": [ended, unscored]}, 1, 0]}},
+            "score_sum": {"$sum": "$readiness_score"},
+            "best_score": {"$max": "$readiness_score"},
+            "last_session_at": {"$max": "$created_at"},
+        }},
+    ]
+    stats = dict(INTERVIEW_STATS_DEFAULTS)
+    async for row in interviews.aggregate(pipeline):
+        row.pop("_id", None)
+        stats.update({k: v for k, v in row.items() if v is not None})
+    stats["score_count"] = stats["sessions_completed"]
+
+    latest = await interviews.find_one(
+        {"user_id": user_id, "readiness_score": {"$ne": None}},
+        {"readiness_score": 1, "ended_at": 1},
+        sort=[("ended_at", -1)],
+    )
+    if latest:
+        stats["latest_score"] = latest.get("readiness_score")
+        stats["latest_score_at"] = latest.get("ended_at")
+    return stats
+
+
+async def rebuild_resume(user_id: str) -> Dict[str, Any]:
+    """Latest stored analysis. Analyses without storage consent are not recoverable here."""
+    latest = await resumes.find_one(
+        {"user_id": user_id},
+        {"feedback": 1, "job_title": 1, "filename": 1, "created_at": 1},
+        sort=[("created_at", -1)],
+    )
+    return {
+        "analyzed_count": await resumes.count_documents({"user_id": user_id}),
+        "latest_feedback": latest.get("feedback") if latest else None,
+        "latest_job_title": latest.get("job_title") if latest else None,
+        "latest_filename": latest.get("filename") if latest else None,
+        "latest_at": latest.get("created_at") if latest else None,
+    }
+
+
+_SECTIONS = {
+    "interviews": rebuild_interview_stats,
+    "resume": rebuild_resume,
+}
+
+
+async def get_user_summary(user_id: str) -> Dict[str, Any]:
+    """Returns the user's summary document, building missing sections on first access."""
+    doc = await user_summaries.find_one({"_id": user_id})
+    if doc is None:
+        doc = {"_id": user_id, "updated_at": get_malaysia_time()}
+        for name, rebuild in _SECTIONS.items():
+            doc[name] = await rebuild(user_id)
+        # A concurrent first read may have inserted it already; either copy is equivalent
+        await user_summaries.update_one({"_id": user_id}, {"$setOnInsert": doc}, upsert=True)
+        return doc
+    for name, rebuild in _SECTIONS.items():
+        if name not in doc:
+            # Summaries written before a section existed get it filled in once
+            doc[name] = await rebuild(user_id)
+            await user_summaries.update_one({"_id": user_id, name: {"$exists": False}}, {"$set": {name: doc[name]}})
+    return doc
+
+
+def interview_stats_view(stats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Public shape of the interview stats, with the average derived from sum/count."""
+    stats = {**INTERVIEW_STATS_DEFAULTS, **(stats or {})}
+    count = stats["score_count"]
+    return {
+        "sessions_started": stats["sessions_started"],
+        "sessions_completed": stats["sessions_completed"],
+        "sessions_ended_early": stats["sessions_ended_early"],
+        "average_score": round(stats["score_sum"] / count, 1) if count else None,
+        "best_score": stats["best_score"],
+        "latest_score": stats["latest_score"],
+        "latest_score_at": stats["latest_score_at"],
+        "last_session_at": stats["last_session_at"],
+    }
+
+
+def quotas_view(counts: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    """Public shape of today's quota use, from usage.daily_counts."""
+    counts = counts or {}
+    view = {}
+    for limit_type, limit in QUOTA_LIMITS.items():
+        used = int(counts.get(limit_type, 0))
+        view[limit_type[len("daily_"):-len("_count")]] = {"used": used, "limit": limit, "remaining": max(0, limit - used)}
+    return view
+
+
+def resume_view(resume: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    resume = resume or {}
+    return {
+        "analyzed_count": resume.get("analyzed_count", 0),
+        "latest_feedback": resume.get("latest_feedback"),
+        "latest_job_title": resume.get("latest_job_title"),
+        "latest_filename": resume.get("latest_filename"),
+        "latest_at": resume.get("latest_at"),
+    }
+
+
+async def _apply(user_id: str, update: Dict[str, Any]):
+    update.setdefault("$set", {})["updated_at"] = get_malaysia_time()
+    # No upsert: a missing summary is rebuilt from source on the next read
+    await user_summaries.update_one({"_id": user_id}, update)
+
+
+async def record_session_started(user_id: str, created_at: datetime):
+    await _apply(user_id, {
+        "$inc": {"interviews.sessions_started": 1},
+        "$max": {"interviews.last_session_at": created_at},
+    })
+
+
+async def record_session_completed(user_id: str, score: Optional[int], ended_at: datetime):
+    update: Dict[str, Any] = {"$inc": {"interviews.sessions_completed": 1}}
+    if score is not None:
+        update["$inc"].update({"interviews.score_sum": score, "interviews.score_count": 1})
+        update["$max"] = {"interviews.best_score": score}
+        update["$set"] = {"interviews.latest_score": score, "interviews.latest_score_at": ended_at}
+    else:
+        # The model did not produce a parseable score: count it like an unscored ending
+        update["$inc"] = {"interviews.sessions_ended_early": 1}
+    await _apply(user_id, update)
+
+
+async def record_session_ended_early(user_id: str):
+    await _apply(user_id, {"$inc": {"interviews.sessions_ended_early": 1}})
+
+
+async def record_session_deleted(user_id: str, session: Dict[str, Any]):
+    """Reverses what a deleted session contributed. Best/latest score are recomputed from source."""
+    score = session.get("readiness_score")
+    inc = {"interviews.sessions_started": -1}
+    if score is not None:
+        inc.update({"interviews.sessions_completed": -1, "interviews.score_sum": -score, "interviews.score_count": -1})
+    elif session.get("ended_at"):
+        inc["interviews.sessions_ended_early"] = -1
+    update: Dict[str, Any] = {"$inc": inc}
+    if score is not None:
+        stats = await rebuild_interview_stats(user_id)
+        update["$set"] = {
+            "interviews.best_score": stats["best_score"],
+            "interviews.latest_score": stats["latest_score"],
+            "interviews.latest_score_at": stats["latest_score_at"],
+        }
+    await _apply(user_id, update)
+
+
+async def record_resume_analyzed(user_id: str, feedback: Dict[str, Any], job_title: str, filename: Optional[str], stored: bool):
+    """
+    Records a completed resume analysis. The analysis is only kept when the resume was
+    stored with consent; otherwise just the count is updated.
+    """
+    update: Dict[str, Any] = {"$inc": {"resume.analyzed_count": 1}}
+    if stored:
+        update["$set"] = {
+            "resume.latest_feedback": feedback,
+            "resume.latest_job_title": job_title,
+            "resume.latest_filename": filename,
+            "resume.latest_at": get_malaysia_time(),
+        }
+    await _apply(user_id, update)
@@ -0,0 +1,73 @@
+import asyncio
+import importlib
+import logging
+import time
+from typing import Any, Dict, Optional
+from backend.config import MISTRAL_API_KEY
+
+logger = logging.getLogger(__name__)
+
+# Dependencies that are imported lazily on first use. A cold start must not import
+# them (checked by backend/benchmarks/check_importtime.py); warm_up() loads them ahead
+# of the first real request.
+LAZY_MODULES = ("mistralai", "pdfminer.high_level", "pypdf", "docx", "httpx")
+
+_result: Optional[Dict[str, Any]] = None
+_lock: Optional[asyncio.Lock] = None
+
+
+def _warm_sync() -> Dict[str, float]:
+    steps: Dict[str, float] = {}
+    for name in LAZY_MODULES:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        steps[f"import.{name}"] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    from backend.services.rag_engine import rag_engine
+    rag_engine.initialize()
+    steps["rag.initialize"] = (time.perf_counter() - start) * 1000
+
+    if MISTRAL_API_KEY:
+        start = time.perf_counter()
+        from backend.services.llm_client import get_client
+        get_client()
+        steps["llm.client"] = (time.perf_counter() - start) * 1000
+    return steps
+
+
+async def warm_up() -> Dict[str, Any]:
+    """
+    Loads lazy dependencies, the RAG index and the Mistral client, and opens the
+    MongoDB connection. Runs once per process; later calls return the first result.
+    Imports run in a worker thread so the event loop keeps serving requests.
+    """
+    global _result, _lock
+    if _result is not None:
+        return {**_result, "already_warm": True}
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _result is not None:
+            return {**_result, "already_warm": True}
+
+        total_start = time.perf_counter()
+        steps = await asyncio.to_thread(_warm_sync)
+
+        start = time.perf_counter()
+        try:
+            from backend.db import get_client
+            client = get_client()
+            if client is not None:
+                await client.admin.command("ping")
+                steps["mongo.ping"] = (time.perf_counter() - start) * 1000
+        except Exception as e:
+            logger.warning("Warm-up could not reach MongoDB: %s", e)
+
+        _result = {
+            "status": "warm",
+            "total_ms": round((time.perf_counter() - total_start) * 1000, 1),
+            "steps_ms": {k: round(v, 1) for k, v in steps.items()},
+        }
+        logger.info("Instance warmed up in %.1f ms", _result["total_ms"], extra={"steps_ms": _result["steps_ms"]})
+        return {**_result, "already_warm": False}
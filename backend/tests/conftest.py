@@ -0,0 +1,47 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from mongomock_motor import AsyncMongoMockClient, enabled_gridfs_integration
+from backend import db
+from backend.auth import get_current_user
+from backend.main import app
+from backend.services.analysis_jobs import analysis_queue
+from backend.services.audit import audit_writer
+from backend.services.usage import usage_writer
+
+
+@pytest_asyncio.fixture
+async def mongo(monkeypatch):
+    """An in-memory database bound to the test's event loop; yields the database."""
+    monkeypatch.setattr(db.DatabaseManager, "_client", AsyncMongoMockClient())
+    monkeypatch.setattr(db.DatabaseManager, "_loop", asyncio.get_running_loop())
+    yield db.DatabaseManager.get_db()
+    # Background workers started by the test are bound to its loop
+    await analysis_queue.stop()
+    await usage_writer.stop()
+    await audit_writer.stop()
+
+
+@pytest.fixture
+def gridfs(mongo, monkeypatch):
+    """`mongo` with GridFS support for the resume file store."""
+    monkeypatch.setattr(db.GridFSProxy, "_fs", None)
+    with enabled_gridfs_integration():
+        yield mongo
+
+
+@pytest.fixture
+def login():
+    """Signs API requests in as a user: login({"id": ..., "role": "user"})."""
+    def as_user(user):
+        app.dependency_overrides[get_current_user] = lambda: user
+    yield as_user
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest_asyncio.fixture
+async def api(mongo):
+    """An HTTP client for the app, served in-process against `mongo`."""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
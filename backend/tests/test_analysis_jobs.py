@@ -0,0 +1,99 @@
+from datetime import timedelta
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from backend import db
+from backend.benchmarks.fixtures import build_docx
+from backend.services import ai_feedback, usage
+from backend.services.analysis_jobs import AnalysisQueue, JobError
+from backend.services.utils import get_malaysia_time
+
+USER_ID = str(ObjectId())
+
+
+@pytest_asyncio.fixture
+async def jobs(mongo):
+    await db.analysis_jobs.create_index("dedupe_key", unique=True, sparse=True)
+    return db.analysis_jobs
+
+
+@pytest.mark.asyncio
+async def test_enqueue_dedupes_and_retries_until_final_failure(jobs):
+    queue = AnalysisQueue(db.analysis_jobs, workers=0, max_attempts=2, retry_delay=0)
+    calls = []
+
+    async def flaky(job):
+        calls.append(job["attempts"])
+        raise RuntimeError("LLM timeout")
+
+    queue.register("flaky", flaky)
+    job, dup = await queue.enqueue("flaky", "u1", {}, file_bytes=b"data", dedupe_key="k1")
+    again, dup_again = await queue.enqueue("flaky", "u1", {}, file_bytes=b"data", dedupe_key="k1")
+    assert not dup and dup_again and again["_id"] == job["_id"]
+
+    await queue.run_one(await queue.claim("w1"), "w1")
+    assert (await queue.get(str(job["_id"])))["status"] == "queued"
+    await queue.run_one(await queue.claim("w1"), "w1")
+    done = await queue.get(str(job["_id"]))
+    assert calls == [1, 2]
+    assert done["status"] == "failed" and done["error"]["status_code"] == 500
+    stored = await db.analysis_jobs.find_one({"_id": job["_id"]})
+    assert "file" not in stored and "dedupe_key" not in stored and stored["expires_at"]
+
+    # The released key lets the same upload be queued again
+    _, dup = await queue.enqueue("flaky", "u1", {}, dedupe_key="k1")
+    assert not dup
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed_and_job_errors_are_final(jobs):
+    queue = AnalysisQueue(db.analysis_jobs, workers=0, lease_seconds=60)
+
+    async def reject(job):
+        raise JobError(400, "Please convert .doc to .docx or pdf")
+
+    queue.register("reject", reject)
+    job, _ = await queue.enqueue("reject", "u1", {})
+    assert (await queue.claim("dead-worker"))["attempts"] == 1
+    assert await queue.claim("w2") is None
+
+    await db.analysis_jobs.update_one({"_id": job["_id"]}, {"$set": {"lease_until": get_malaysia_time() - timedelta(seconds=1)}})
+    claimed = await queue.claim("w2")
+    assert claimed["worker"] == "w2" and claimed["attempts"] == 2
+    await queue.run_one(claimed, "w2")
+    done = await queue.get(str(job["_id"]))
+    assert done["status"] == "failed" and done["error"] == {"status_code": 400, "detail": "Please convert .doc to .docx or pdf"}
+
+
+@pytest.mark.asyncio
+async def test_upload_returns_job_and_result_is_polled(jobs, api, login, monkeypatch):
+    monkeypatch.setattr(ai_feedback, "get_feedback", lambda text: {"IsResume": True, "Score": 70, "Keywords": ["Python"]})
+    await db.users.insert_one({"_id": ObjectId(USER_ID), "daily_reset_at": get_malaysia_time()})
+    resume = build_docx(["Jane Doe", "Experience", "Built Python services", "Education", "BSc Computer Science"])
+    files = {"file": ("cv.docx", resume, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
+
+    login({"id": USER_ID, "role": "user"})
+    r = await api.post("/api/resume/upload", data={"job_title": "Backend Engineer"}, files=files)
+    assert r.status_code == 202
+    body = r.json()
+    assert r.headers["location"] == body["status_url"]
+
+    r = await api.get(body["status_url"], params={"wait": 5})
+    job = r.json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"id": None, "feedback": {"IsResume": True, "Score": 70, "Keywords": ["Python"]}, "job_title": "Backend Engineer"}
+
+    r = await api.get(body["events_url"])
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert r.text.startswith("event: status\ndata: ") and '"status": "succeeded"' in r.text
+
+    # Same file again: served from the finished job, no second analysis
+    r = await api.post("/api/resume/upload", params={"wait": "true"}, data={"job_title": "Backend Engineer"}, files=files)
+    assert r.status_code == 200 and r.json()["feedback"]["Score"] == 70
+
+    login({"id": str(ObjectId()), "role": "user"})
+    assert (await api.get(body["status_url"])).status_code == 404
+
+    user = await db.users.find_one({"_id": ObjectId(USER_ID)})
+    assert user["target_job_title"] == "Backend Engineer"
+    assert (await usage.daily_counts(USER_ID))["daily_resume_count"] == 1
@@ -0,0 +1,67 @@
+from datetime import timedelta
+import pytest
+from backend import db
+from backend.services import analytics
+from backend.services.utils import get_malaysia_time
+
+
+async def seed(days_ago, job_title, difficulty, score, tags):
+    at = get_malaysia_time().replace(hour=12) - timedelta(days=days_ago)
+    await db.interviews.insert_one({
+        "user_id": "u1", "job_title": job_title, "difficulty": difficulty, "asked_count": 4,
+        "created_at": at, "ended_at": at, "readiness_score": score,
+    })
+    await db.resumes.insert_one({"user_id": "u1", "mime_type": "application/pdf", "tags": tags, "created_at": at})
+
+
+@pytest.mark.asyncio
+async def test_rollups_are_incremental_and_report_merges_days(mongo):
+    await seed(10, "Data Analyst", "Beginner", 60, ["sql", "python"])
+    await seed(10, "Data Analyst", "Beginner", None, ["sql"])
+    await seed(0, "Data Analyst", "Beginner", 80, ["python"])
+    await seed(0, "Backend Engineer", "Advanced", 70, ["go"])
+
+    first = await analytics.refresh_rollups()
+    assert first["status"] == "ok" and first["days_refreshed"] == 11
+
+    # The next run starts at the watermark instead of the beginning
+    second = await analytics.refresh_rollups()
+    assert second["days_refreshed"] == 3
+
+    today = get_malaysia_time().date()
+    report = await analytics.get_report(today - timedelta(days=29), today)
+    assert report["totals"]["sessions"] == 4
+    assert report["totals"]["completed"] == 3
+    assert report["totals"]["ended_early"] == 1
+    assert report["totals"]["uploads"] == 4
+    assert report["totals"]["llm_calls"] == {"interview": 17, "resume": 4}
+    roles = {(r["job_title"], r["difficulty"]): r for r in report["by_role"]}
+    assert roles[("Data Analyst", "Beginner")]["average_score"] == 70
+    assert roles[("Backend Engineer", "Advanced")]["sessions"] == 1
+    assert report["tags"][:2] == [{"tag": "sql", "count": 2}, {"tag": "python", "count": 2}]
+    assert [d["sessions"] for d in report["series"] if d["sessions"]] == [2, 2]
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_exclusive_and_admin_only(api, login):
+    await db.job_state.insert_one({"_id": analytics.STATE_ID, "locked_until": get_malaysia_time() + timedelta(minutes=5)})
+    assert (await analytics.refresh_rollups())["status"] == "busy"
+
+    login({"id": "u1", "role": "user"})
+    assert (await api.get("/api/admin/analytics")).status_code == 403
+    login({"id": "a1", "role": "admin"})
+    assert (await api.post("/api/admin/analytics/refresh")).status_code == 409
+    tomorrow = (get_malaysia_time().date() + timedelta(days=1)).isoformat()
+    r = await api.post("/api/admin/analytics/refresh", params={"since": tomorrow})
+    assert r.status_code == 400 and "after today" in r.json()["detail"]
+    r = await api.get("/api/admin/analytics", params={"days": 7})
+    assert r.status_code == 200 and len(r.json()["series"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_future_since_does_not_move_the_watermark_ahead(mongo):
+    today = get_malaysia_time().date()
+    result = await analytics.refresh_rollups(today + timedelta(days=5))
+    assert result["days_refreshed"] == 1 and result["watermark"] <= today.isoformat()
+    state = await db.job_state.find_one({"_id": analytics.STATE_ID})
+    assert state["watermark"] <= today.isoformat()
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from backend.services import audit
+from backend.services.batch_writer import BatchWriter, BLOCK, DROP_NEWEST, DROP_OLDEST
+
+
+class MemoryCollection:
+    def __init__(self):
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(list(docs))
+
+    async def insert_one(self, doc):
+        self.batches.append([doc])
+
+
+@pytest.mark.asyncio
+async def test_batches_by_size_and_flushes_on_stop():
+    col = MemoryCollection()
+    writer = BatchWriter(col, "test", batch_size=3, flush_interval=10)
+    for i in range(7):
+        await writer.put({"n": i})
+    await writer.stop()
+
+    written = [d["n"] for batch in col.batches for d in batch]
+    assert written == list(range(7))
+    assert all(len(batch) <= 3 for batch in col.batches)
+    assert writer.stats()["written"] == 7
+    assert writer.stats()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_flushes_partial_batch_by_interval():
+    col = MemoryCollection()
+    writer = BatchWriter(col, "test", batch_size=100, flush_interval=0.01)
+    await writer.put({"n": 1})
+    await asyncio.sleep(0.2)
+    assert col.batches == [[{"n": 1}]]
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy,expected", [(DROP_NEWEST, [0, 1]), (DROP_OLDEST, [1, 2])])
+async def test_overflow_policies_count_drops(policy, expected):
+    col = MemoryCollection()
+    writer = BatchWriter(col, "test", max_queue=2, batch_size=10, flush_interval=10, overflow=policy)
+    # Fill the queue synchronously so the flusher task has no chance to drain it
+    for i in range(3):
+        await writer.put({"n": i})
+    assert writer.stats()["dropped"] == 1
+    await writer.stop()
+    assert [d["n"] for batch in col.batches for d in batch] == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batched", [True, False])
+async def test_audit_events_are_written_inline_rather_than_dropped(monkeypatch, batched):
+    col = MemoryCollection()
+    writer = BatchWriter(col, "audit_test", max_queue=1, batch_size=10, flush_interval=10, overflow=BLOCK, put_timeout=0.01)
+    monkeypatch.setattr(audit, "audit_logs", col)
+    monkeypatch.setattr(audit, "audit_writer", writer)
+    monkeypatch.setattr(audit, "AUDIT_BATCH_ENABLED", batched)
+
+    for event in ("login", "logout", "password_reset"):
+        await audit.log_event("u1", "u1@example.com", event, "127.0.0.1", "success")
+    # Unbatched (the serverless default) nothing waits in the queue for a shutdown flush
+    assert writer.stats()["queued"] == (1 if batched else 0)
+    await writer.stop()
+    assert sorted(d["event_type"] for batch in col.batches for d in batch) == ["login", "logout", "password_reset"]
@@ -0,0 +1,42 @@
+import os
+from backend.benchmarks.bench_hotpaths import compare, measure
+from backend.benchmarks.fixtures import build_pdf, build_docx, load_corpus
+from backend.services.resume_parser import extract_resume_text
+
+
+def test_measure_reports_ops_per_sec():
+    stats = measure(lambda: sum(range(100)), repeat=3, min_time=0.001)
+    assert stats["median_us"] > 0
+    assert stats["ops_per_sec"] > 0
+    assert stats["loops"] >= 1
+
+
+def test_compare_ignores_changes_within_noise():
+    base = {"median_us": 100.0, "iqr_us": 2.0}
+    assert compare("x", {"median_us": 105.0, "iqr_us": 2.0}, base, 10).endswith("~")
+    assert compare("x", {"median_us": 150.0, "iqr_us": 2.0}, base, 10).endswith("SLOWER")
+    assert compare("x", {"median_us": 50.0, "iqr_us": 2.0}, base, 10).endswith("faster")
+    # Noisy samples widen the band beyond the threshold
+    assert compare("x", {"median_us": 130.0, "iqr_us": 50.0}, base, 10).endswith("~")
+    assert compare("x", {"median_us": 100.0, "iqr_us": 1.0}, None, 10) == ""
+
+
+def test_generated_fixture_documents_extract(tmp_path):
+    lines = load_corpus()["resumes"]["medium"].split("\n")
+    for ext, data in (("pdf", build_pdf(lines)), ("docx", build_docx(lines))):
+        path = os.path.join(tmp_path, f"resume.{ext}")
+        with open(path, "wb") as f:
+            f.write(data)
+        text, _ = extract_resume_text(path)
+        assert "Software Engineer, Example Sdn Bhd" in text
+        assert "(2021 - Present)" in text
+
+
+def test_docx_benchmark_corpus_tables_are_extracted(tmp_path):
+    from backend.benchmarks.bench_docx_extract import build_corpus, python_docx_text
+    from backend.services.resume_parser import extract_docx_text
+
+    for name, path, table_line in build_corpus(str(tmp_path)):
+        if table_line:
+            assert table_line in extract_docx_text(path), name
+            assert table_line not in python_docx_text(path), name
@@ -0,0 +1,19 @@
+import pytest
+from backend.benchmarks.check_importtime import run_importtime, eager_lazy_modules
+from backend.services.warmup import LAZY_MODULES, warm_up
+
+
+def test_heavy_dependencies_are_not_imported_at_startup():
+    rows = run_importtime("backend.main")
+    assert any(name == "backend.main" for name, _, _, _ in rows)
+    assert eager_lazy_modules(rows, LAZY_MODULES) == []
+
+
+@pytest.mark.asyncio
+async def test_warm_up_runs_once():
+    first = await warm_up()
+    assert first["status"] == "warm"
+    assert "rag.initialize" in first["steps_ms"]
+    second = await warm_up()
+    assert second["already_warm"] is True
+    assert second["steps_ms"] == first["steps_ms"]
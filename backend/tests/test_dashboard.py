@@ -0,0 +1,60 @@
+from datetime import timedelta
+import pytest
+from bson import ObjectId
+from backend import db
+from backend.services import usage, user_summary
+from backend.services.daily_limit import check_daily_limit, increment_daily_limit
+from backend.services.utils import get_malaysia_time
+
+USER_ID = str(ObjectId())
+
+
+@pytest.fixture
+def client(api, login):
+    login({"id": USER_ID, "email": "a@example.com", "role": "user"})
+    return api
+
+
+@pytest.mark.asyncio
+async def test_dashboard_builds_summary_from_existing_data(client):
+    now = get_malaysia_time()
+    await db.users.insert_one({"_id": ObjectId(USER_ID), "daily_reset_at": now})
+    for counter, n in (("daily_resume_count", 2), ("daily_question_count", 7)):
+        for _ in range(n):
+            await usage.add_daily_count(USER_ID, counter)
+    await db.resumes.insert_one({"user_id": USER_ID, "feedback": {"Score": 71}, "filename": "old.pdf", "created_at": now - timedelta(days=2)})
+    await db.resumes.insert_one({"user_id": USER_ID, "feedback": {"Score": 80}, "filename": "cv.pdf", "created_at": now})
+
+    r = await client.get("/api/dashboard")
+    assert r.status_code == 200
+    d = r.json()
+    assert d["user"]["email"] == "a@example.com"
+    assert d["quotas"]["resume"] == {"used": 2, "limit": 5, "remaining": 3}
+    assert d["quotas"]["question"]["used"] == 7
+    assert d["resume"]["latest_feedback"] == {"Score": 80}
+    assert d["resume"]["analyzed_count"] == 2
+    assert d["interviews"]["sessions_started"] == 0
+
+
+@pytest.mark.asyncio
+async def test_dashboard_quotas_are_the_enforced_counters(client):
+    await db.users.insert_one({"_id": ObjectId(USER_ID), "daily_reset_at": get_malaysia_time()})
+    await user_summary.get_user_summary(USER_ID)
+
+    await increment_daily_limit(USER_ID, "daily_interview_count")
+    await increment_daily_limit(USER_ID, "daily_interview_count")
+    quotas = (await client.get("/api/dashboard")).json()["quotas"]
+    assert quotas["interview"]["used"] == 2
+    assert quotas["interview"]["remaining"] == (await check_daily_limit(USER_ID, "daily_interview_count", quotas["interview"]["limit"]))[1]
+
+    # Resetting clears the same counters the limiter reads
+    await client.post("/api/interview/reset-quota")
+    await increment_daily_limit(USER_ID, "daily_resume_count")
+    quotas = (await client.get("/api/dashboard")).json()["quotas"]
+    assert quotas["resume"]["used"] == 1 and quotas["interview"]["used"] == 0
+    assert "quotas" not in await db.user_summaries.find_one({"_id": USER_ID})
+
+    await user_summary.record_resume_analyzed(USER_ID, {"Score": 55}, "Analyst", "cv.docx", stored=False)
+    doc = await user_summary.get_user_summary(USER_ID)
+    assert doc["resume"]["analyzed_count"] == 1
+    assert doc["resume"]["latest_feedback"] is None
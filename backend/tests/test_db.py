@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from backend import db
+
+
+@pytest.fixture
+def lazy_client(monkeypatch):
+    # Motor connects lazily, so a local URI is enough to exercise the proxies
+    monkeypatch.setattr(db, "MONGO_URI", "mongodb://localhost:27017")
+    monkeypatch.setattr(db.DatabaseManager, "_client", None)
+    monkeypatch.setattr(db.DatabaseManager, "_loop", None)
+
+
+def test_collection_proxy_caches_per_loop(lazy_client):
+    proxy = db.CollectionProxy("users")
+
+    async def resolve_twice():
+        return proxy._get_col(), proxy._get_col()
+
+    first_a, first_b = asyncio.run(resolve_twice())
+    assert first_a is first_b
+
+    # A new event loop (serverless re-execution) must get a fresh collection
+    second_a, _ = asyncio.run(resolve_twice())
+    assert second_a is not first_a
+    assert second_a.name == "users"
+
+
+def test_collection_proxy_invalidate(lazy_client):
+    proxy = db.CollectionProxy("resumes")
+
+    async def resolve_after_invalidate():
+        col = proxy._get_col()
+        proxy.invalidate()
+        return col, proxy._get_col()
+
+    before, after = asyncio.run(resolve_after_invalidate())
+    assert before is not after
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = list(docs)
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._docs:
+            raise StopAsyncIteration
+        return self._docs.pop(0)
+
+
+def test_timed_cursor_records_db_time_once_per_cursor():
+    from backend.services.structured_log import start_request_timings, get_request_timings, reset_request_timings
+
+    async def iterate():
+        token = start_request_timings()
+        try:
+            cursor = db.TimedCursor(FakeCursor([1, 2, 3])).sort("created_at", -1)
+            assert isinstance(cursor, db.TimedCursor)
+            items = [doc async for doc in cursor]
+            return items, dict(get_request_timings())
+        finally:
+            reset_request_timings(token)
+
+    items, timings = asyncio.run(iterate())
+    assert items == [1, 2, 3]
+    assert timings["db_calls"] == 1
+    assert timings["db_ms"] >= 0
@@ -0,0 +1,85 @@
+import asyncio
+import time
+import httpx
+import pytest
+from backend import auth
+from backend.services import email_service
+from backend.services.email_service import AlertDispatcher
+
+
+@pytest.fixture(autouse=True)
+def emailjs_config(monkeypatch):
+    monkeypatch.setattr(email_service, "ADMIN_ALERT_EMAILJS_SERVICE_ID", "service")
+    monkeypatch.setattr(email_service, "ADMIN_ALERT_EMAILJS_TEMPLATE_ID", "template")
+    monkeypatch.setattr(email_service, "ADMIN_ALERT_EMAILJS_PUBLIC_KEY", "key")
+
+
+def make_dispatcher(handler, recipients, **kwargs):
+    dispatcher = AlertDispatcher(backoff_base=0.01, **kwargs)
+    dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    dispatcher._loop = asyncio.get_running_loop()
+    dispatcher._recipients = list(recipients)
+    dispatcher._recipients_expire_at = time.monotonic() + 60
+    return dispatcher
+
+
+@pytest.mark.asyncio
+async def test_fans_out_concurrently():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    dispatcher = make_dispatcher(handler, [f"admin{i}@example.com" for i in range(6)], max_concurrency=3)
+    assert await dispatcher.send("subject", "message") is True
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_failures_only():
+    calls = {"flaky@example.com": 0, "rejected@example.com": 0}
+
+    async def handler(request):
+        email = request.read().decode()
+        target = "flaky@example.com" if "flaky@example.com" in email else "rejected@example.com"
+        calls[target] += 1
+        if target == "flaky@example.com":
+            return httpx.Response(200 if calls[target] == 3 else 503)
+        return httpx.Response(400)
+
+    dispatcher = make_dispatcher(handler, calls.keys(), max_retries=3)
+    assert await dispatcher.send("subject", "message") is True
+    assert calls == {"flaky@example.com": 3, "rejected@example.com": 1}
+
+
+@pytest.mark.asyncio
+async def test_enqueue_returns_before_delivery():
+    delivered = asyncio.Event()
+
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        delivered.set()
+        return httpx.Response(200)
+
+    dispatcher = make_dispatcher(handler, ["admin@example.com"])
+    dispatcher.enqueue("subject", "message")
+    assert not delivered.is_set()
+    await dispatcher.close()
+    assert delivered.is_set()
+
+
+@pytest.mark.asyncio
+async def test_seeding_the_super_admin_refreshes_cached_recipients(mongo, monkeypatch):
+    monkeypatch.setattr(auth, "hash_password", lambda password: "hash")
+    dispatcher = AlertDispatcher(recipients_ttl=300)
+    monkeypatch.setattr(email_service, "alert_dispatcher", dispatcher)
+    assert await dispatcher.get_admin_recipients() == []
+
+    await auth.ensure_admin()
+    assert await dispatcher.get_admin_recipients() == [auth.SUPERADMIN_EMAIL]
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from backend import db
+from backend.services import interview_engine, usage
+from backend.services.utils import get_malaysia_time
+
+USER_ID = str(ObjectId())
+
+
+@pytest_asyncio.fixture
+async def client(api, login, monkeypatch):
+    calls = []
+
+    def fake_reply(history, **kwargs):
+        calls.append(history)
+        return f"Question {kwargs.get('current_asked_count', 0) + 1}?"
+
+    monkeypatch.setattr(interview_engine, "interview_reply", fake_reply)
+    await db.users.insert_one({"_id": ObjectId(USER_ID), "has_analyzed": True, "daily_reset_at": get_malaysia_time()})
+    await db.interviews.insert_one({
+        "session_id": "s1", "user_id": USER_ID, "job_title": "Analyst", "questions_limit": 10,
+        "asked_count": 1, "transcript": [{"role": "assistant", "text": "Question 1?"}], "ended_at": None,
+    })
+    login({"id": USER_ID, "role": "user"})
+    api.calls = calls
+    return api
+
+
+@pytest.mark.asyncio
+async def test_repeated_reply_is_replayed_without_a_second_turn(client):
+    headers = {"Idempotency-Key": "reply-1"}
+    answer = {"user_text": "I would start by profiling the slow query."}
+    first, second = await asyncio.gather(
+        client.post("/api/interview/s1/reply", data=answer, headers=headers),
+        client.post("/api/interview/s1/reply", data=answer, headers=headers),
+    )
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {"message": "Question 2?", "asked_count": 2, "questions_limit": 10}
+    assert sorted(r.headers.get("idempotent-replayed", "") for r in (first, second)) == ["", "true"]
+    assert len(client.calls) == 1
+
+    s = await db.interviews.find_one({"session_id": "s1"})
+    assert s["asked_count"] == 2 and len(s["transcript"]) == 3
+    assert (await usage.daily_counts(USER_ID))["daily_question_count"] == 1
+
+    # A new key is a new turn; requests without a key are unaffected
+    r = await client.post("/api/interview/s1/reply", data=answer, headers={"Idempotency-Key": "reply-2"})
+    assert r.json()["asked_count"] == 3
+    r = await client.post("/api/interview/s1/reply", data=answer)
+    assert r.json()["asked_count"] == 4 and len(client.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_replayed_and_keys_are_scoped(client):
+    headers = {"Idempotency-Key": "same"}
+    r = await client.post("/api/interview/missing/reply", data={"user_text": "hello there friend"}, headers=headers)
+    assert r.status_code == 404
+    r = await client.post("/api/interview/missing/reply", data={"user_text": "hello there friend"}, headers=headers)
+    assert r.status_code == 404 and r.headers["idempotent-replayed"] == "true"
+
+    # The same key on another path is a different request
+    r = await client.post("/api/interview/s1/reply", data={"user_text": "hello there friend"}, headers=headers)
+    assert r.status_code == 200 and "idempotent-replayed" not in r.headers
+    assert await db.idempotency_keys.count_documents({}) == 2
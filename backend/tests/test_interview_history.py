@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from backend import db
+from backend.services import user_summary
+
+USER_ID = str(ObjectId())
+
+
+@pytest.fixture
+def client(api, login):
+    login({"id": USER_ID})
+    return api
+
+
+async def seed_sessions(n):
+    base = datetime(2026, 1, 1, 9, 0)
+    for i in range(n):
+        await db.interviews.insert_one({
+            "session_id": f"s{i}",
+            "user_id": USER_ID,
+            "asked_count": 3,
+            "transcript": [{"role": "assistant" if j % 2 == 0 else "user", "text": f"turn {j}"} for j in range(5)],
+            # Two sessions share each timestamp so the cursor must break ties on _id
+            "created_at": base + timedelta(minutes=i // 2),
+            "ended_at": base if i % 3 == 0 else None,
+            "readiness_score": 60 + i if i % 3 == 0 else None,
+        })
+
+
+@pytest.mark.asyncio
+async def test_history_pages_with_cursor_and_no_transcript(client):
+    await seed_sessions(7)
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        r = await client.get("/api/interview/history", params=params)
+        assert r.status_code == 200
+        page = r.json()
+        assert all("transcript" not in item for item in page)
+        seen.extend(page)
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == 7
+    assert len({item["id"] for item in seen}) == 7
+    created = [item["created_at"] for item in seen]
+    assert created == sorted(created, reverse=True)
+
+    r = await client.get("/api/interview/history", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_transcript_pages_by_sequence(client):
+    await seed_sessions(1)
+    r = await client.get("/api/interview/s0/transcript", params={"limit": 2})
+    page = r.json()
+    assert [t["seq"] for t in page["turns"]] == [0, 1]
+    assert page["total"] == 5 and page["next_after"] == 1
+
+    r = await client.get("/api/interview/s0/transcript", params={"after": 3, "limit": 2})
+    page = r.json()
+    assert [t["text"] for t in page["turns"]] == ["turn 4"]
+    assert page["next_after"] is None
+
+    r = await client.get("/api/interview/s0", params={"include_transcript": "false"})
+    assert "transcript" not in r.json()
+
+
+@pytest.mark.asyncio
+async def test_summary_rebuilds_then_tracks_deletes(client):
+    await seed_sessions(4)  # scored sessions: s0 (60) and s3 (63)
+    r = await client.get("/api/interview/stats")
+    stats = r.json()
+    assert stats["sessions_started"] == 4
+    assert stats["sessions_completed"] == 2
+    assert stats["average_score"] == 61.5
+    assert stats["best_score"] == 63
+
+    r = await client.delete("/api/interview/s3")
+    assert r.status_code == 200
+    stats = user_summary.interview_stats_view((await user_summary.get_user_summary(USER_ID))["interviews"])
+    assert stats["sessions_started"] == 3
+    assert stats["sessions_completed"] == 1
+    assert stats["best_score"] == 60
+    assert stats["average_score"] == 60
@@ -0,0 +1,30 @@
+import json
+import httpx
+from backend.benchmarks.loadtest import percentile, regressions, start_fake_mistral
+
+
+def test_percentile_interpolates():
+    values = [0.1, 0.2, 0.3, 0.4, 0.5]
+    assert percentile(values, 50) == 0.3
+    assert abs(percentile(values, 95) - 0.48) < 1e-9
+    assert percentile([], 99) == 0.0
+
+
+def test_regressions_flag_only_slower_p95():
+    baseline = {"endpoints": {"POST /a": {"p95_ms": 100.0}, "POST /b": {"p95_ms": 100.0}}}
+    result = {"endpoints": {"POST /a": {"p95_ms": 125.0}, "POST /b": {"p95_ms": 105.0}, "POST /c": {"p95_ms": 1.0}}}
+    assert regressions(result, baseline, 10) == ["POST /a: p95 100.0 -> 125.0 ms"]
+
+
+def test_fake_mistral_answers_chat_completions():
+    server = start_fake_mistral(latency_ms=0, jitter_ms=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+        r = httpx.post(url, json={"model": "m", "messages": [{"role": "user", "content": "hi"}], "response_format": {"type": "json_object"}})
+        feedback = json.loads(r.json()["choices"][0]["message"]["content"])
+        assert feedback["IsResume"] is True
+
+        r = httpx.post(url, json={"model": "m", "messages": [{"role": "system", "content": "All 10 questions are done."}]})
+        assert "[FINISH]" in r.json()["choices"][0]["message"]["content"]
+    finally:
+        server.shutdown()
@@ -0,0 +1,46 @@
+import pytest
+from backend.services.metrics import Registry, _Metric
+
+
+def test_counter_and_histogram_render_openmetrics():
+    registry = Registry()
+    requests = registry.counter("req", "Requests.", ("route",))
+    latency = registry.histogram("lat_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    requests.labels("/api/x").inc()
+    requests.labels("/api/x").inc(2)
+    for value in (0.05, 0.5, 5.0):
+        latency.labels("/api/x").observe(value)
+
+    text = registry.render()
+    assert "# TYPE req counter" in text
+    assert 'req_total{route="/api/x"} 3' in text
+    assert 'lat_seconds_bucket{route="/api/x",le="0.1"} 1' in text
+    assert 'lat_seconds_bucket{route="/api/x",le="1"} 2' in text
+    assert 'lat_seconds_bucket{route="/api/x",le="+Inf"} 3' in text
+    assert 'lat_seconds_count{route="/api/x"} 3' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.counter("c", "C.", ("path",))
+    counter.labels('a"b\\c').inc()
+    assert 'c_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_gauge_func_is_evaluated_at_render():
+    registry = Registry()
+    state = {"queued": 0}
+    registry.gauge_func("queue", "Queue.", ("state",), lambda: {(k,): v for k, v in state.items()})
+    state["queued"] = 4
+    assert 'queue{state="queued"} 4' in registry.render()
+
+
+def test_metric_kinds_must_implement_children_and_render():
+    with pytest.raises(TypeError):
+        _Metric("m", "M.")
+    registry = Registry()
+    gauge = registry.gauge_func("g", "G.", ("state",), lambda: {})
+    with pytest.raises(TypeError):
+        gauge.labels("queued")
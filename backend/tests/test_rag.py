@@ -0,0 +1,60 @@
+from backend.services.ai_feedback import resume_queries
+from backend.services.rag_engine import RAGEngine
+from backend.services.resume_parser import split_resume_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+PROFESSIONAL SUMMARY
+Backend engineer.
+
+Experience:
+Built payment services in Go.
+
+Technical Skills
+Kubernetes, Terraform
+
+Education & Training
+BSc Computer Science
+"""
+
+
+def make_engine(tmp_path, chunks):
+    (tmp_path / "guide.txt").write_text("\n\n".join(chunks), encoding="utf-8")
+    engine = RAGEngine(str(tmp_path))
+    engine.initialize()
+    return engine
+
+
+def test_split_resume_sections_detects_headings():
+    sections = split_resume_sections(RESUME)
+    assert list(sections) == ["header", "summary", "experience", "skills", "education"]
+    assert sections["skills"] == "Kubernetes, Terraform"
+    assert sections["education"] == "BSc Computer Science"
+    # A long line that merely mentions a heading word is content, not a heading
+    assert "experience" not in split_resume_sections("Five years of experience in the skills that matter")
+    assert resume_queries("no headings here") == ["no headings here"]
+
+
+def test_retrieve_many_fuses_sections_and_respects_budget(tmp_path):
+    engine = make_engine(tmp_path, [
+        "Payment services experience: quantify transaction volume.",
+        "Kubernetes and Terraform skills: name the clusters you ran.",
+        "Education: list the degree (BSc, MSc) and the university.",
+        "Payment services experience: quantify transaction volume.",
+        "Unrelated chunk about poetry.",
+    ])
+    # The whole-resume query surfaces guidance for every section, not just the first
+    chunks = engine.retrieve_many(resume_queries(RESUME), top_k=5)
+    assert chunks[:3] == [
+        "Payment services experience: quantify transaction volume.",
+        "Kubernetes and Terraform skills: name the clusters you ran.",
+        "Education: list the degree (BSc, MSc) and the university.",
+    ]
+    assert len(chunks) == len(set(chunks)) and "Unrelated chunk about poetry." not in chunks
+
+    budget = engine.retrieve_many(resume_queries(RESUME), top_k=5, max_chars=120)
+    assert sum(len(c) for c in budget) <= 120 and len(budget) == 2
+
+    # Single-query retrieval through the index ranks like the old scan
+    assert engine.retrieve("terraform kubernetes clusters", top_k=1) == ["Kubernetes and Terraform skills: name the clusters you ran."]
@@ -27,8 +27,9 @@ async def test_upload_docx_feedback():
     async with AsyncClient(app=app, base_url="http://test") as ac:
         token = await get_token(ac)
         files = {"file": ("resume.docx", make_docx_bytes(), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
-        data = {"consent": "true"}
-        r = await ac.post("/api/resume/upload", files=files, data=data, headers={"Authorization": f"Bearer {token}"})
+        data = {"consent": "true", "job_title": "Software Engineer"}
+        # wait=true answers with the finished analysis instead of a 202 job handle
+        r = await ac.post("/api/resume/upload", params={"wait": "true"}, files=files, data=data, headers={"Authorization": f"Bearer {token}"})
         assert r.status_code == 200
         fb = r.json()["feedback"]
         assert "Advantages" in fb and "Disadvantages" in fb and "Suggestions" in fb and "Keywords" in fb
@@ -0,0 +1,123 @@
+import hashlib
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from backend import db
+from backend.benchmarks.fixtures import build_pdf
+from backend.services import ai_feedback, resume_analysis, resume_files
+from backend.services.analysis_jobs import SUCCEEDED, FAILED, AnalysisQueue, analysis_queue
+from backend.services.metrics import resume_file_bytes
+from backend.services.resume_files import release_resume_file, store_resume_file
+
+PDF = b"%PDF-1.4\n" + b"resume " * 1000
+
+
+@pytest_asyncio.fixture
+async def store(gridfs):
+    assert await db.ensure_indexes()
+    return gridfs
+
+
+async def _download(file_id) -> bytes:
+    bucket = await db.fs.get_fs()
+    return await (await bucket.open_download_stream(file_id)).read()
+
+
+@pytest.mark.asyncio
+async def test_identical_files_share_one_object(store):
+    before = resume_file_bytes.value("shared")
+    first, reused = await store_resume_file("a.pdf", PDF)
+    assert not reused
+    second, reused = await store_resume_file("b.pdf", PDF, hashlib.sha256(PDF).hexdigest())
+    assert reused and second == first
+    other, reused = await store_resume_file("c.pdf", PDF + b"!")
+    assert not reused and other != first
+    assert resume_file_bytes.value("shared") == before + len(PDF)
+
+    doc = await store["resume_files.files"].find_one({"_id": first})
+    assert doc["metadata"] == {"sha256": hashlib.sha256(PDF).hexdigest(), "refcount": 2}
+    assert await store["resume_files.files"].count_documents({}) == 2
+
+    assert not await release_resume_file(str(first))
+    assert await _download(first) == PDF
+    assert await release_resume_file(str(first))
+    assert await store["resume_files.files"].count_documents({"_id": first}) == 0
+    assert await store["resume_files.chunks"].count_documents({"files_id": first}) == 0
+    assert not await release_resume_file(str(first))
+
+    # Content released to zero is stored afresh
+    again, reused = await store_resume_file("a.pdf", PDF)
+    assert not reused and again != first
+
+
+@pytest.mark.asyncio
+async def test_losing_a_concurrent_first_upload_takes_a_reference(store, monkeypatch):
+    winner, _ = await store_resume_file("a.pdf", PDF)
+    misses = []
+    add_reference = resume_files._add_reference
+
+    async def racing(sha256):
+        # The first lookup runs before the other upload's object exists
+        if not misses:
+            misses.append(sha256)
+            return None
+        return await add_reference(sha256)
+
+    monkeypatch.setattr(resume_files, "_add_reference", racing)
+    file_id, reused = await store_resume_file("b.pdf", PDF)
+    assert reused and file_id == winner and misses
+    assert await store["resume_files.files"].count_documents({}) == 1
+    assert await store["resume_files.chunks"].count_documents({"files_id": {"$ne": winner}}) == 0
+
+
+@pytest.mark.asyncio
+async def test_admin_delete_keeps_shared_file_until_last_resume(store, api, login):
+    file_id, _ = await store_resume_file("a.pdf", PDF)
+    await store_resume_file("a.pdf", PDF)
+    bucket = await db.fs.get_fs()
+    legacy = await bucket.upload_from_stream("old.pdf", PDF)
+    ids = []
+    for fid in (file_id, file_id, legacy):
+        res = await db.resumes.insert_one({"user_id": "u1", "filename": "cv.pdf", "file_id": str(fid)})
+        ids.append(str(res.inserted_id))
+
+    login({"id": str(ObjectId()), "role": "admin"})
+    assert (await api.delete(f"/api/admin/resumes/{ids[0]}")).json() == {"deleted": True}
+    r = await api.get(f"/api/admin/resumes/{ids[1]}/file")
+    assert r.status_code == 200 and r.content == PDF
+    await api.delete(f"/api/admin/resumes/{ids[1]}")
+    await api.delete(f"/api/admin/resumes/{ids[2]}")
+    assert await store["resume_files.files"].count_documents({}) == 0
+    assert await store["resume_files.chunks"].count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_retried_analysis_takes_one_reference(store, monkeypatch):
+    monkeypatch.setattr(ai_feedback, "get_feedback", lambda text: {"IsResume": True, "Score": 70})
+    monkeypatch.setattr(analysis_queue, "max_attempts", 2)
+    queue = AnalysisQueue(db.analysis_jobs, workers=0, max_attempts=2, retry_delay=0)
+    queue.register(resume_analysis.KIND, resume_analysis.analyze_upload)
+    failures = {"flaky": 1, "broken": 2}
+    increment = resume_analysis.increment_daily_limit
+
+    async def failing_increment(user_id, limit_type):
+        if failures.get(user_id):
+            failures[user_id] -= 1
+            raise RuntimeError("database unavailable")
+        await increment(user_id, limit_type)
+
+    monkeypatch.setattr(resume_analysis, "increment_daily_limit", failing_increment)
+    lines = ["Jane Doe", "Experience", "Built Python services", "Education", "BSc Computer Science"]
+    payload = {"filename": "cv.pdf", "job_title": "Backend Engineer", "consent": True, "kind": "pdf"}
+    for user_id, data in (("flaky", build_pdf(lines)), ("broken", build_pdf(lines + ["Go"]))):
+        job, _ = await queue.enqueue(resume_analysis.KIND, user_id, payload, file_bytes=data)
+        for _ in range(2):
+            await queue.run_one(await queue.claim("w1"), "w1")
+
+    flaky = await db.analysis_jobs.find_one({"user_id": "flaky"})
+    assert flaky["status"] == SUCCEEDED and flaky["attempts"] == 2
+    doc = await store["resume_files.files"].find_one({"_id": flaky["file_id"]})
+    assert doc["metadata"]["refcount"] == 1
+    # The job that never succeeded released its file
+    assert (await db.analysis_jobs.find_one({"user_id": "broken"}))["status"] == FAILED
+    assert await store["resume_files.files"].count_documents({}) == 1
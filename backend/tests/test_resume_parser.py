@@ -0,0 +1,42 @@
+import io
+import zipfile
+import pytest
+from docx import Document
+from backend.benchmarks.fixtures import build_docx, build_rich_docx, load_corpus
+from backend.services.resume_parser import DOCX_READ_ERROR, extract_docx_text, extract_resume_text
+
+
+def test_plain_docx_matches_python_docx():
+    for text in load_corpus()["resumes"].values():
+        data = build_docx(text.splitlines())
+        assert extract_docx_text(io.BytesIO(data)) == "\n".join(p.text for p in Document(io.BytesIO(data)).paragraphs)
+
+
+def test_docx_text_covers_headers_tables_and_text_boxes_in_order():
+    data = build_rich_docx(
+        ["Summary", "Backend engineer", "Experience", "Acme\tKuala Lumpur"],
+        header=["Jane Doe", "jane@example.com"],
+        tables=[[["Skills", "Python, Go"], ["Tools", ""]]],
+        text_boxes=[["Languages", "English, Malay"]],
+    )
+    assert extract_docx_text(io.BytesIO(data)).split("\n") == [
+        "Jane Doe", "jane@example.com",
+        # The text box is anchored in the first paragraph; its fallback copy is skipped
+        "Languages", "English, Malay",
+        "Summary", "Backend engineer", "Experience", "Acme\tKuala Lumpur",
+        "Skills | Python, Go", "Tools",
+    ]
+
+
+def test_unreadable_docx_is_a_user_error(tmp_path):
+    path = tmp_path / "cv.docx"
+    path.write_bytes(b"PK\x03\x04 not really a zip")
+    with pytest.raises(ValueError, match=DOCX_READ_ERROR):
+        extract_resume_text(str(path))
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("word/document.xml", "<w:document xmlns:w='http://schemas.openxmlformats.org/wordprocessingml/2006/main'><w:body><w:p>")
+    path.write_bytes(buf.getvalue())
+    with pytest.raises(ValueError, match=DOCX_READ_ERROR):
+        extract_resume_text(str(path))
@@ -0,0 +1,69 @@
+from datetime import timedelta
+import pytest
+from backend import db
+from backend.services.resume_search import _fallback_search, highlight, query_terms
+from backend.services.utils import get_malaysia_time
+
+
+def test_highlight_marks_terms_in_snippets():
+    text = "Intro. " + "x " * 100 + "Built Python services\n\nand developed   APIs. " + "y " * 100 + "More Python."
+    snippets = highlight(text, query_terms("python develop"), radius=20)
+    assert len(snippets) == 2
+    first = snippets[0]
+    marked = [first["snippet"][s:e] for s, e in first["matches"]]
+    assert marked == ["Python", "developed"]
+    assert first["snippet"].startswith("…") and "  " not in first["snippet"]
+    assert highlight(text, query_terms("python"), max_snippets=1, radius=5)[0]["snippet"].count("Python") == 1
+
+
+def test_query_terms_are_escaped_in_patterns():
+    assert query_terms("C++ (senior) a c++") == ["c", "senior"]
+    # One-letter terms match whole words only, and the punctuation stays literal
+    snippet = highlight("a.b*c cobol", query_terms("a.b*c"))[0]
+    assert [snippet["snippet"][s:e] for s, e in snippet["matches"]] == ["b", "c"]
+
+
+def test_highlight_offsets_are_utf16_code_units():
+    snippet = highlight("🚀 Shipped R and C++ tools 🎉 in Python", query_terms("r c python"))[0]
+    # What JavaScript's String.slice sees: astral characters take two code units
+    units = snippet["snippet"].encode("utf-16-le")
+    marked = [units[2 * s:2 * e].decode("utf-16-le") for s, e in snippet["matches"]]
+    assert marked == ["R", "C", "Python"]
+
+
+@pytest.mark.asyncio
+async def test_fallback_ranks_curated_fields_above_body(api, login):
+    await db.resumes.insert_many([
+        {"filename": "a.pdf", "text": "I once used kubernetes", "tags": [], "status": "pending"},
+        {"filename": "b.pdf", "text": "platform work", "tags": ["Kubernetes"], "status": "pending", "file_b64": "AAAA"},
+        {"filename": "c.pdf", "text": "nothing relevant", "tags": ["Go"], "status": "pending"},
+    ])
+    hits = await _fallback_search(["kubernetes"], {}, limit=10)
+    assert [h["filename"] for h in hits] == ["b.pdf", "a.pdf"]
+    assert "file_b64" not in hits[0] and hits[0]["file_available"] is True
+
+    login({"id": "a1", "role": "admin"})
+    items = (await api.get("/api/admin/resumes", params={"status": "pending"})).json()
+    assert len(items) == 3
+    assert {it["filename"]: it["file_available"] for it in items} == {"a.pdf": False, "b.pdf": True, "c.pdf": False}
+
+
+@pytest.mark.asyncio
+async def test_fallback_finds_one_letter_terms_as_words(mongo):
+    await db.resumes.insert_many([
+        {"filename": "r.pdf", "text": "Statistics in R and SQL", "tags": [], "status": "pending"},
+        {"filename": "x.pdf", "text": "Ruby on Rails", "tags": [], "status": "pending"},
+    ])
+    hits = await _fallback_search(query_terms("R"), {}, limit=10)
+    assert [h["filename"] for h in hits] == ["r.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_plain_list_is_limited_to_the_newest(api, login):
+    await db.resumes.insert_many([
+        {"filename": f"{i}.pdf", "text": "", "tags": [], "status": "pending", "created_at": get_malaysia_time() + timedelta(minutes=i)}
+        for i in range(5)
+    ])
+    login({"id": "a1", "role": "admin"})
+    items = (await api.get("/api/admin/resumes", params={"limit": 2})).json()
+    assert [it["filename"] for it in items] == ["4.pdf", "3.pdf"]
@@ -0,0 +1,89 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from backend import db
+from backend.services import ai_feedback, interview_engine
+from backend.services.metrics import single_flight_calls
+from backend.services.single_flight import SingleFlight, content_key
+from backend.services.utils import get_malaysia_time
+
+
+def slow_call(result, calls, delay=0.05):
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+    return fn
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution(mongo):
+    flight = SingleFlight("test_local", collection=db.llm_flights)
+    calls = []
+    key = content_key([{"role": "user", "content": "hi"}], {"job_title": "Analyst"})
+    results = await asyncio.gather(*(flight.do(key, slow_call({"Score": 1}, calls)) for _ in range(5)))
+    assert results == [{"Score": 1}] * 5 and len(calls) == 1
+    assert single_flight_calls.value("test_local", "coalesced") == 4
+
+    # A different key is a different flight
+    other = content_key([{"role": "user", "content": "hello"}], {"job_title": "Analyst"})
+    assert await flight.do(other, slow_call("other", calls)) == "other" and len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_other_process_waits_for_leader_result(mongo):
+    # Two instances stand in for two processes sharing the lease collection
+    a = SingleFlight("test_shared", collection=db.llm_flights, poll_interval=0.01)
+    b = SingleFlight("test_shared", collection=db.llm_flights, poll_interval=0.01)
+    calls_a, calls_b = [], []
+    leader = asyncio.create_task(a.do("k", slow_call("answer", calls_a, delay=0.1)))
+    await asyncio.sleep(0.02)
+    assert await b.do("k", slow_call("duplicate", calls_b)) == "answer"
+    assert await leader == "answer"
+    assert (len(calls_a), len(calls_b)) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_failed_or_abandoned_leases_are_taken_over(mongo):
+    a = SingleFlight("test_takeover", collection=db.llm_flights)
+    b = SingleFlight("test_takeover", collection=db.llm_flights)
+
+    async def boom():
+        raise RuntimeError("LLM down")
+
+    with pytest.raises(RuntimeError):
+        await a.do("k", boom)
+    assert await db.llm_flights.find_one({"_id": "test_takeover:k"}) is None
+
+    # A leader that died mid-call leaves an expired lease
+    await db.llm_flights.insert_one({"_id": "test_takeover:k2", "owner": "gone", "status": "running",
+                                     "lease_until": get_malaysia_time() - timedelta(seconds=1)})
+    assert await b.do("k2", slow_call("fresh", [])) == "fresh"
+    doc = await db.llm_flights.find_one({"_id": "test_takeover:k2"})
+    assert doc["status"] == "done" and doc["value"] == "fresh"
+
+
+@pytest.mark.asyncio
+async def test_flights_are_scoped_to_the_session_and_user(mongo, monkeypatch):
+    calls = []
+
+    def fake_reply(history, **kwargs):
+        calls.append(1)
+        return f"question {len(calls)}"
+
+    monkeypatch.setattr(interview_engine, "interview_reply", fake_reply)
+    monkeypatch.setattr(ai_feedback, "get_feedback", lambda text: {"Score": len(calls)})
+    # Every user's opening turn has the same history and settings
+    opening = dict(job_title="Analyst", questions_limit=5, difficulty="Intermediate", current_asked_count=0)
+    first, second = await asyncio.gather(
+        interview_engine.interview_reply_async([], session_id="s1", **opening),
+        interview_engine.interview_reply_async([], session_id="s2", **opening),
+    )
+    assert first != second and len(calls) == 2
+    # A retry within the same session still shares the finished result
+    assert await interview_engine.interview_reply_async([], session_id="s1", **opening) == first and len(calls) == 2
+
+    a = await ai_feedback.get_feedback_async("same resume", "u1")
+    calls.append(1)
+    assert await ai_feedback.get_feedback_async("same resume", "u2") != a
+    assert await ai_feedback.get_feedback_async("same resume", "u1") == a
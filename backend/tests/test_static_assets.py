@@ -0,0 +1,63 @@
+import gzip
+import re
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from backend.services.static_assets import AssetCache, CachedStaticFiles, IMMUTABLE
+
+
+def make_client(tmp_path):
+    static = tmp_path / "static"
+    static.mkdir()
+    (static / "app.js").write_text("console.log('hello');\n" * 50)
+    (static / "page.html").write_text('<script src="/static/app.js"></script><a href="/static/page.html">self</a>')
+    (tmp_path / "secret.txt").write_text("nope")
+    cache = AssetCache(str(tmp_path))
+    app = Starlette(routes=[Mount("/static", CachedStaticFiles(cache))])
+    return TestClient(app), cache
+
+
+def test_serves_precompressed_with_etag_and_304(tmp_path):
+    client, _ = make_client(tmp_path)
+    r = client.get("/static/app.js", headers={"accept-encoding": "gzip"})
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert r.headers["cache-control"] == "no-cache"
+    assert r.text.startswith("console.log")
+
+    r2 = client.get("/static/app.js", headers={"if-none-match": r.headers["etag"], "accept-encoding": "gzip"})
+    assert r2.status_code == 304
+    assert r2.content == b""
+
+    raw = client.get("/static/app.js", headers={"accept-encoding": "identity"})
+    assert "content-encoding" not in raw.headers
+    assert raw.headers["etag"] != r.headers["etag"]
+
+
+def test_html_references_are_fingerprinted_and_immutable(tmp_path):
+    client, cache = make_client(tmp_path)
+    html = client.get("/static/page.html").text
+    version = re.search(r'/static/app\.js\?v=(\w+)', html).group(1)
+    assert version == cache.get("static/app.js").fingerprint
+    # Links to other pages are left alone
+    assert 'href="/static/page.html"' in html
+
+    assert client.get(f"/static/app.js?v={version}").headers["cache-control"] == IMMUTABLE
+    assert client.get("/static/app.js?v=stale").headers["cache-control"] == "no-cache"
+
+
+def test_rejects_paths_outside_the_mount(tmp_path):
+    client, _ = make_client(tmp_path)
+    assert client.get("/static/../secret.txt").status_code == 404
+    assert client.get("/static/%2e%2e/secret.txt").status_code == 404
+    assert client.get("/static/missing.js").status_code == 404
+    assert client.post("/static/app.js").status_code == 405
+
+
+def test_gzip_variant_round_trips(tmp_path):
+    _, cache = make_client(tmp_path)
+    asset = cache.get("static/app.js")
+    body, _ = asset.variants["identity"]
+    gz, _ = asset.variants["gzip"]
+    assert gzip.decompress(gz) == body
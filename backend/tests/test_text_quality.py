@@ -0,0 +1,131 @@
+import pytest
+from bson import ObjectId
+from backend import db
+from backend.benchmarks.eval_resume_gate import DEFAULT_FIXTURES, evaluate, load_samples
+from backend.benchmarks.fixtures import build_docx, load_corpus
+from backend.services import ai_feedback, interview_engine, resume_analysis
+from backend.services.analysis_jobs import JobError
+from backend.services.metrics import answer_checks, resume_gate_decisions
+from backend.services.text_quality import BORDERLINE, OK, PASS, REJECT, UNUSABLE, is_gibberish, ngram_table, resume_gate, score_answer
+from backend.services.utils import get_malaysia_time
+
+
+def test_is_gibberish():
+    for text in ["HR", "CEO", "ok", "I don't know", "Backend Engineer", "Café manager"]:
+        assert not is_gibberish(text), text
+    for text in ["", " ", "x", "asdhaksjdoqiuwe1283(!^(^!#(", "1283(!^(^!#(", "qwrtpsdfghjklzxcvbnm", "!!!!????....", "12345"]:
+        assert is_gibberish(text), text
+    assert not any(is_gibberish(a) for a in load_corpus()["answers"][:12])
+
+
+def test_resume_gate_fixtures():
+    report = evaluate(load_samples(DEFAULT_FIXTURES))
+    decisions = {row["id"]: row["decision"] for row in report["rows"]}
+    labels = {row["id"]: row["label"] for row in report["rows"]}
+    # Rejecting a real resume is the expensive mistake; everything else may go to the LLM
+    assert [i for i in decisions if labels[i] == "resume" and decisions[i] == REJECT] == []
+    assert [i for i in decisions if labels[i] == "not_resume" and decisions[i] == PASS] == []
+    assert decisions["recipe"] == decisions["keyboard_mash"] == decisions["story"] == REJECT
+    assert decisions["corpus_long"] == PASS
+
+
+def test_resume_gate_counts_decisions():
+    before = resume_gate_decisions.value(REJECT, "too_short")
+    result = resume_gate("hello world")
+    assert result["decision"] == REJECT and result["reason"] == "too_short"
+    assert result["features"]["words"] == 2
+    assert resume_gate_decisions.value(REJECT, "too_short") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_upload_skips_the_llm(mongo, monkeypatch):
+    def no_llm(text):
+        raise AssertionError("get_feedback must not be called")
+
+    monkeypatch.setattr(ai_feedback, "get_feedback", no_llm)
+    story = next(s["text"] for s in load_samples(DEFAULT_FIXTURES) if s["id"] == "story")
+    user_id = str(ObjectId())
+    job = {"user_id": user_id, "payload": {"filename": "story.docx", "job_title": "Writer"}, "file": build_docx([story])}
+    with pytest.raises(JobError) as exc:
+        await resume_analysis.analyze_upload(job)
+    assert exc.value.status_code == 400 and exc.value.detail == resume_analysis.NOT_A_RESUME_MESSAGE
+
+
+def test_score_answer_verdicts():
+    assert ngram_table() is not None
+    for text in load_corpus()["answers"][:12]:
+        assert score_answer(text)["verdict"] == OK, text
+    for text, reason in [
+        ("test test test test test test", "repeated_words"),
+        ("noooooooo", "repeated_chars"),
+        ("!!!!????....", "gibberish"),
+    ]:
+        result = score_answer(text)
+        assert (result["verdict"], result["reason"]) == (UNUSABLE, reason), text
+    for text in ["ok", "I dunno", "HR", "no idea sorry"]:
+        result = score_answer(text)
+        assert result["verdict"] == BORDERLINE and 0 < result["confidence"] < 0.6, text
+    # A stretched word in an otherwise real answer is not a reason to throw it away
+    for text in [
+        "It was soooooo much fun building the REST API with my team, we used FastAPI and Postgres.",
+        "Ummmmmm, I would first profile the query, then add an index on the user_id column and check the plan.",
+        "mmmmmm let me think",
+    ]:
+        result = score_answer(text)
+        assert (result["verdict"], result["reason"]) == (BORDERLINE, "repeated_chars") and result["confidence"] > 0, text
+    # The letter model is English-only: unlikely text goes to the model instead of being re-asked
+    for text in ["asdf jkl qwer zxcv", "ajsdh kajsd lkajsd aksjd"]:
+        assert (score_answer(text)["verdict"], score_answer(text)["reason"]) == (BORDERLINE, "not_language"), text
+    for text in [
+        "Aku rasa boleh je",
+        "Saya pernah bekerja sebagai jurutera perisian selama dua tahun",
+        "Boleh, saya guna Python dan SQL untuk projek tu",
+        "Tak pasti lah bos, but I try my best",
+        "Can lah, I handle the database part also one",
+        "Dia punya API slow gila, so kita cache kat Redis",
+    ]:
+        assert score_answer(text)["verdict"] != UNUSABLE, text
+
+
+@pytest.mark.asyncio
+async def test_unusable_answers_are_reasked_without_the_llm(api, login, monkeypatch):
+    calls = []
+
+    def fake_reply(history, **kwargs):
+        calls.append(kwargs)
+        return "Could you tell me more?"
+
+    monkeypatch.setattr(interview_engine, "interview_reply", fake_reply)
+    user_id = str(ObjectId())
+    await db.users.insert_one({"_id": ObjectId(user_id), "has_analyzed": True, "daily_reset_at": get_malaysia_time()})
+    await db.interviews.insert_one({
+        "session_id": "s1", "user_id": user_id, "job_title": "Analyst", "questions_limit": 10,
+        "asked_count": 1, "transcript": [{"role": "assistant", "text": "Why this role?"}], "ended_at": None,
+    })
+    login({"id": user_id, "role": "user"})
+    before = answer_checks.value(UNUSABLE, "repeated_words")
+    r = await api.post("/api/interview/s1/reply", data={"user_text": "test test test test test test"})
+    assert r.json()["message"].endswith("Here’s the question again: Why this role?")
+    assert calls == [] and answer_checks.value(UNUSABLE, "repeated_words") == before + 1
+
+    r = await api.post("/api/interview/s1/reply", data={"user_text": "I dunno"})
+    assert r.json()["asked_count"] == 2
+    await api.post("/api/interview/s1/reply", data={"user_text": "I like turning messy data into decisions the whole team can act on."})
+    assert 0 < calls[0]["answer_confidence"] < 0.6 and calls[1]["answer_confidence"] is None
+
+
+def test_borderline_answer_adds_a_hint_to_the_prompt(monkeypatch):
+    sent = []
+
+    def fake_complete(model, messages, **kwargs):
+        sent.append(messages[0]["content"])
+        message = type("M", (), {"content": "Could you expand on that? What did you build?"})
+        return type("C", (), {"choices": [type("Ch", (), {"message": message})]})
+
+    monkeypatch.setattr(interview_engine, "MISTRAL_API_KEY", "key")
+    monkeypatch.setattr(interview_engine, "chat_complete", fake_complete)
+    history = [{"role": "assistant", "content": "What did you build?"}, {"role": "user", "content": "stuff"}]
+    interview_engine.interview_reply(history, job_title="Analyst", current_asked_count=1, answer_confidence=0.42)
+    interview_engine.interview_reply(history, job_title="Analyst", current_asked_count=1)
+    assert "ANSWER CHECK" in sent[0] and "confidence 0.42" in sent[0]
+    assert "ANSWER CHECK" not in sent[1]
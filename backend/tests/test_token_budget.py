@@ -0,0 +1,81 @@
+import json
+from backend.services import interview_engine
+from backend.services.ai_feedback import build_resume_prompt
+from backend.services.token_budget import (
+    TRUNCATED_MARKER, compact_feedback, dedupe_chunks, estimate_tokens, fit_resume_prompt,
+    normalize_whitespace, truncate_to_tokens, window_transcript,
+)
+
+
+def test_estimate_and_normalize():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("Built APIs, fast.") == 5
+    # Long words count as two pieces
+    assert estimate_tokens("internationalization") == 2
+    assert normalize_whitespace("Jane   Doe \t\r\n\n\n\n  Experience   2021  ") == "Jane Doe\n\nExperience 2021"
+    assert dedupe_chunks(["Use metrics.", "use   METRICS.", "Tailor keywords. Use metrics.", ""]) == ["Use metrics.", "Tailor keywords. Use metrics."]
+
+
+def test_fit_resume_prompt_drops_chunks_then_cuts_resume():
+    resume = "\n".join(f"Line {i}:    shipped   feature number {i}" for i in range(400))
+    chunks = ["Quantify achievements with numbers.", "Quantify achievements with numbers.", "Keep it to two pages. " * 40]
+    instructions = estimate_tokens(build_resume_prompt("", ""))
+
+    prompt, budget = fit_resume_prompt(build_resume_prompt, resume, chunks, instructions + 5000)
+    assert prompt.count("Quantify achievements") == 1 and "two pages" in prompt
+    assert "Line 399: shipped feature number 399" in prompt and TRUNCATED_MARKER not in prompt
+    assert budget.sent["context"] < budget.raw["context"]
+
+    prompt, budget = fit_resume_prompt(build_resume_prompt, resume, chunks, instructions + 500)
+    assert "Quantify achievements" in prompt and "two pages" not in prompt
+    assert prompt.endswith(TRUNCATED_MARKER) and "Line 399" not in prompt
+    assert budget.sent_total <= instructions + 500 < budget.raw_total
+
+
+def test_single_line_resume_is_cut_inside_the_line():
+    text = " ".join(["experience python developer"] * 3000)
+    cut = truncate_to_tokens(text, 2000)
+    assert cut.startswith("experience python developer") and cut.endswith("\n" + TRUNCATED_MARKER)
+    assert 1900 < estimate_tokens(cut) <= 2000
+    assert cut[:-len(TRUNCATED_MARKER) - 1].split()[-1] in ("experience", "python", "developer")
+
+    instructions = estimate_tokens(build_resume_prompt("", ""))
+    prompt, budget = fit_resume_prompt(build_resume_prompt, text, [], instructions + 500)
+    assert "experience python developer" in prompt and prompt.endswith(TRUNCATED_MARKER)
+    assert 400 < budget.sent["resume"] <= 500
+
+
+def test_window_transcript_keeps_latest_turns():
+    history = []
+    for i in range(30):
+        history.append({"role": "assistant", "content": f"Question {i}: " + "explain the design " * 10})
+        history.append({"role": "user", "content": f"Answer {i}"})
+    window, omitted = window_transcript(history, 300)
+    assert omitted and omitted % 2 == 0 and window == history[omitted:]
+    assert window[0]["role"] == "assistant" and window[-1]["content"] == "Answer 29"
+    assert window_transcript(history[:4], 300) == (history[:4], 0)
+    # The last exchange is kept even when it alone is over budget
+    assert window_transcript(history, 1)[0] == history[-2:]
+
+
+def test_interview_prompt_is_compacted(monkeypatch):
+    sent = []
+
+    def fake_complete(model, messages, **kwargs):
+        sent.append(messages)
+        message = type("M", (), {"content": "Thanks. Next question: how would you scale it?"})
+        return type("C", (), {"choices": [type("Ch", (), {"message": message})]})
+
+    monkeypatch.setattr(interview_engine, "MISTRAL_API_KEY", "key")
+    monkeypatch.setattr(interview_engine, "INTERVIEW_HISTORY_MAX_TOKENS", 200)
+    monkeypatch.setattr(interview_engine, "chat_complete", fake_complete)
+    feedback = {"IsResume": True, "Score": 72, "Suggestions": ["Add metrics"] * 5, "Keywords": [f"kw{i}" for i in range(15)]}
+    history = [{"role": "assistant" if i % 2 == 0 else "user", "content": "word " * 40} for i in range(20)]
+
+    interview_engine.interview_reply(history, job_title="Data Engineer", resume_feedback=feedback, questions_limit=15, current_asked_count=10)
+    system, *window = sent[0]
+    assert f"Resume Analysis: {compact_feedback(feedback)}" in system["content"]
+    assert json.loads(compact_feedback(feedback)) == {"Score": 72, "Keywords": [f"kw{i}" for i in range(10)]}
+    assert "Add metrics" not in system["content"]
+    assert window == history[-len(window):] and len(window) < len(history)
+    assert f"The first {len(history) - len(window)} messages" in system["content"]
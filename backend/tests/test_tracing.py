@@ -0,0 +1,58 @@
+import asyncio
+import time
+import pytest
+from backend.services import tracing
+
+
+@pytest.fixture
+def sampled(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tracing, "TRACE_EXPORT", "none")
+    monkeypatch.setattr(tracing, "SERVER_TIMING_ENABLED", True)
+
+
+def test_spans_are_noop_without_active_trace():
+    assert tracing.span("mongo.find_one") is tracing.NOOP_SPAN
+    tracing.add_span("llm.chat", 0.0, 1.0)  # must not raise
+
+
+@pytest.mark.asyncio
+async def test_nested_spans_propagate_through_tasks(sampled):
+    @tracing.traced("service.work")
+    async def work():
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        tracing.add_span("mongo.find_one", start, time.perf_counter(), collection="users")
+
+    trace, token = tracing.start_trace("GET")
+    with tracing.span("auth.get_current_user"):
+        await asyncio.gather(work(), work())
+    header = tracing.finish_trace(trace, token, status=200)
+
+    by_name = {}
+    for s in trace.spans:
+        by_name.setdefault(s.name, []).append(s)
+    auth = by_name["auth.get_current_user"][0]
+    assert auth.parent_id == trace.root.span_id
+    assert all(s.parent_id == auth.span_id for s in by_name["service.work"])
+    work_ids = {s.span_id for s in by_name["service.work"]}
+    assert {s.parent_id for s in by_name["mongo.find_one"]} == work_ids
+
+    assert "auth;dur=" in header and "service;dur=" in header
+    assert "mongo;dur=" in header and header.endswith(f"total;dur={trace.root.duration_ms:.1f}")
+    # The trace is no longer active once finished
+    assert tracing.span("x") is tracing.NOOP_SPAN
+
+
+def test_otlp_payload_shape(sampled):
+    trace, token = tracing.start_trace("POST")
+    with tracing.span("rag.retrieve", top_k=5):
+        pass
+    tracing.finish_trace(trace, token)
+
+    spans = tracing.to_otlp(trace)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(spans) == 2
+    rag = next(s for s in spans if s["name"] == "rag.retrieve")
+    assert len(rag["traceId"]) == 32 and len(rag["spanId"]) == 16
+    assert rag["attributes"] == [{"key": "top_k", "value": {"stringValue": "5"}}]
+    assert int(rag["endTimeUnixNano"]) >= int(rag["startTimeUnixNano"])
@@ -0,0 +1,127 @@
+import hashlib
+import io
+import httpx
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from backend import db
+from backend.benchmarks.fixtures import build_docx, build_pdf
+from backend.config import RESUME_MAX_UPLOAD_BYTES
+from backend.services import ai_feedback
+from backend.services.metrics import upload_rejections
+from backend.services.upload_validation import DOC_MESSAGE, MULTIPART_OVERHEAD_BYTES, OLE2_MAGIC, UploadLimitMiddleware, read_upload, sniff_resume_type
+from backend.services.utils import get_malaysia_time
+
+USER_ID = str(ObjectId())
+RESUME_LINES = ["Jane Doe", "Experience", "Built Python services", "Education", "BSc Computer Science"]
+
+
+@pytest_asyncio.fixture
+async def user_api(api, login):
+    await db.analysis_jobs.create_index("dedupe_key", unique=True, sparse=True)
+    login({"id": USER_ID, "role": "user"})
+    return api
+
+
+def _status(fn, *args):
+    with pytest.raises(HTTPException) as exc:
+        fn(*args)
+    return exc.value.status_code, exc.value.detail
+
+
+def test_sniff_resume_type():
+    assert sniff_resume_type(build_pdf(RESUME_LINES)[:64], "cv.docx") == "pdf"
+    assert sniff_resume_type(build_docx(RESUME_LINES)[:4096], "upload") == "docx"
+    assert sniff_resume_type(b"PK\x03\x04" + b"\0" * 60, "cv.docx") == "docx"
+    assert _status(sniff_resume_type, OLE2_MAGIC + b"\0" * 60, "cv.docx") == (400, DOC_MESSAGE)
+    assert _status(sniff_resume_type, b"%PDF-1.4", "cv.doc") == (400, DOC_MESSAGE)
+    assert _status(sniff_resume_type, b"PK\x03\x04" + b"\0" * 60, "photos.zip")[0] == 415
+    assert _status(sniff_resume_type, b"Jane Doe\nExperience", "cv.pdf")[0] == 415
+
+
+@pytest.mark.asyncio
+async def test_read_upload_hashes_and_caps_size():
+    data = build_pdf(RESUME_LINES * 40)
+    upload = await read_upload(UploadFile(io.BytesIO(data), filename="cv.pdf"), max_bytes=len(data), chunk_size=256)
+    assert upload["data"] == data and upload["kind"] == "pdf" and upload["size"] == len(data)
+    assert upload["sha256"] == hashlib.sha256(data).hexdigest()
+
+    before = upload_rejections.value("too_large")
+    with pytest.raises(HTTPException) as exc:
+        await read_upload(UploadFile(io.BytesIO(data), filename="cv.pdf"), max_bytes=len(data) - 1, chunk_size=256)
+    assert exc.value.status_code == 413 and upload_rejections.value("too_large") == before + 1
+    with pytest.raises(HTTPException) as exc:
+        await read_upload(UploadFile(io.BytesIO(b""), filename="cv.pdf"))
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_oversized_and_unsupported_uploads_are_rejected_early(user_api, monkeypatch):
+    def no_llm(text):
+        raise AssertionError("get_feedback must not be called")
+
+    monkeypatch.setattr(ai_feedback, "get_feedback", no_llm)
+    too_big = b"%PDF-1.4\n" + b"0" * (RESUME_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES)
+    r = await user_api.post("/api/resume/upload", data={"job_title": "Analyst"}, files={"file": ("cv.pdf", too_big, "application/pdf")})
+    assert r.status_code == 413 and "maximum size" in r.json()["detail"]
+
+    r = await user_api.post("/api/resume/upload", data={"job_title": "Analyst"}, files={"file": ("cv.pdf", b"Jane Doe, Analyst", "application/pdf")})
+    assert r.status_code == 415
+    r = await user_api.post("/api/resume/upload", data={"job_title": "Analyst"}, files={"file": ("cv.docx", OLE2_MAGIC + b"\0" * 512, "application/msword")})
+    assert r.status_code == 400 and r.json()["detail"] == DOC_MESSAGE
+    assert await db.analysis_jobs.count_documents({}) == 0
+
+
+@pytest.mark.asyncio
+async def test_body_without_content_length_is_cut_off_at_the_cap():
+    small = FastAPI()
+    small.add_middleware(UploadLimitMiddleware, paths=["/upload"], max_body_bytes=4096)
+    received = []
+
+    @small.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(await file.read())
+        return {"ok": True}
+
+    boundary = "b0undary"
+    head = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"cv.pdf\"\r\n"
+        "Content-Type: application/pdf\r\n\r\n%PDF-1.4\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    sent = []
+
+    def chunked(size):
+        async def stream():
+            body = head + b"0" * size + tail
+            for i in range(0, len(body), 1024):
+                sent.append(i)
+                yield body[i:i + 1024]
+        return stream()
+
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=small), base_url="http://test") as ac:
+        assert (await ac.post("/upload", content=chunked(1024), headers=headers)).status_code == 200
+        sent.clear()
+        r = await ac.post("/upload", content=chunked(64 * 1024), headers=headers)
+    assert r.status_code == 413 and len(received) == 1
+    assert len(sent) <= 6
+
+
+@pytest.mark.asyncio
+async def test_mislabelled_upload_is_parsed_by_its_content(user_api, monkeypatch):
+    seen = []
+
+    def fake_feedback(text):
+        seen.append(text)
+        return {"IsResume": True, "Score": 65}
+
+    monkeypatch.setattr(ai_feedback, "get_feedback", fake_feedback)
+    await db.users.insert_one({"_id": ObjectId(USER_ID), "daily_reset_at": get_malaysia_time()})
+    files = {"file": ("cv.docx", build_pdf(RESUME_LINES), "application/pdf")}
+    r = await user_api.post("/api/resume/upload", params={"wait": "true"}, data={"job_title": "Backend Engineer"}, files=files)
+    assert r.status_code == 200 and r.json()["feedback"]["Score"] == 65
+    assert "Built Python services" in seen[0]
+    job = await db.analysis_jobs.find_one({})
+    assert job["payload"]["kind"] == "pdf" and job["payload"]["sha256"] == hashlib.sha256(files["file"][1]).hexdigest()
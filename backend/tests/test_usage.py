@@ -0,0 +1,88 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+import pytest
+import pytest_asyncio
+from backend import db
+from backend.services import analytics, llm_client, usage
+from backend.services.daily_limit import check_daily_limit, increment_daily_limit
+from backend.services.utils import get_malaysia_time
+
+
+@pytest_asyncio.fixture
+async def usage_db(mongo):
+    assert await db.ensure_indexes()
+    return mongo
+
+
+class FakeChat:
+    def complete(self, model, messages, **kwargs):
+        if messages[-1]["content"] == "fail":
+            raise RuntimeError("upstream error")
+        return SimpleNamespace(usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30))
+
+
+@pytest.mark.asyncio
+async def test_quota_counters_start_over_each_day_without_resets(usage_db):
+    # Time series are not available here, so the fallback indexes are in place
+    assert {"ts", "user_ts"} <= set(await usage_db["usage"].index_information())
+
+    yesterday = (get_malaysia_time() - timedelta(days=1)).date().isoformat()
+    await db.usage_daily.insert_one({"_id": f"u1:{yesterday}", "user_id": "u1", "day": yesterday, "counts": {"daily_resume_count": 5}})
+    assert await check_daily_limit("u1", "daily_resume_count", 5) == (True, 5)
+
+    await increment_daily_limit("u1", "daily_resume_count")
+    await increment_daily_limit("u1", "daily_resume_count")
+    await increment_daily_limit("u1", "daily_question_count")
+    assert await check_daily_limit("u1", "daily_resume_count", 2) == (False, 0)
+    assert await usage.daily_counts("u1") == {"daily_resume_count": 2, "daily_question_count": 1}
+    assert await usage.daily_counts("u1", yesterday) == {"daily_resume_count": 5}
+    today = await db.usage_daily.find_one({"user_id": "u1", "day": {"$ne": yesterday}})
+    assert today["day"] == get_malaysia_time().date().isoformat() and today["expires_at"]
+    # Nothing is read from or written to the user document
+    assert await db.users.count_documents({}) == 0
+
+    await usage.clear_daily_counts("u1")
+    assert await check_daily_limit("u1", "daily_resume_count", 2) == (True, 2)
+
+    await usage.usage_writer.stop()
+    events = [e async for e in db.usage.find({"kind": "quota"})]
+    assert sorted(e["meta"]["action"] for e in events) == ["interview_question", "resume_analysis", "resume_analysis"]
+    assert all(e["meta"]["user_id"] == "u1" and e["ts"] for e in events)
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_are_attributed_and_rolled_up(usage_db, monkeypatch):
+    monkeypatch.setattr(llm_client, "get_client", lambda: SimpleNamespace(chat=FakeChat()))
+    # Completions outside a tracked block are not attributed to anyone
+    llm_client.chat_complete("mistral-small-latest", [{"role": "user", "content": "hi"}])
+
+    async with usage.track("u1", "interview_question"):
+        await asyncio.to_thread(llm_client.chat_complete, "mistral-small-latest", [{"role": "user", "content": "hi"}])
+    with pytest.raises(RuntimeError):
+        async with usage.track("u2", "resume_analysis"):
+            await asyncio.to_thread(llm_client.chat_complete, "mistral-large-latest", [{"role": "user", "content": "ok"}])
+            await asyncio.to_thread(llm_client.chat_complete, "mistral-large-latest", [{"role": "user", "content": "fail"}])
+    await usage.usage_writer.stop()
+
+    events = [e async for e in db.usage.find({"kind": "llm"}).sort("ts", 1)]
+    assert [(e["meta"]["user_id"], e["meta"]["action"], e["outcome"]) for e in events] == [
+        ("u1", "interview_question", "ok"), ("u2", "resume_analysis", "ok"), ("u2", "resume_analysis", "error"),
+    ]
+    assert events[0]["prompt_tokens"] == 120 and events[0]["completion_tokens"] == 30
+    assert events[2]["prompt_tokens"] == 0 and events[2]["latency_ms"] >= 0
+
+    today = get_malaysia_time().date()
+    doc = await analytics.compute_day(today)
+    rows = {(r["action"], r["model"]): r for r in doc["llm_usage"]}
+    assert rows[("resume_analysis", "mistral-large-latest")]["calls"] == 2
+    assert rows[("resume_analysis", "mistral-large-latest")]["errors"] == 1
+    assert rows[("interview_question", "mistral-small-latest")]["prompt_tokens"] == 120
+
+    await analytics.refresh_rollups()
+    report = await analytics.get_report(today, today)
+    assert report["series"][-1]["llm_tokens"] == 300
+    by_model = {r["model"]: r for r in report["llm_usage"]["by_model"]}
+    large = by_model["mistral-large-latest"]
+    assert large["calls"] == 2 and large["errors"] == 1 and large["completion_tokens"] == 30
+    assert {r["action"] for r in report["llm_usage"]["by_action"]} == {"interview_question", "resume_analysis"}
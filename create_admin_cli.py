@@ -8,7 +8,7 @@ from motor.motor_asyncio import AsyncIOMotorClient
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from backend.auth import hash_password
-from backend.config import MONGO_URI, DB_NAME
+from backend.config import MONGO_URI, DB_NAME, ADMIN_ALERT_RECIPIENTS_TTL_SECONDS
 from backend.services.utils import get_malaysia_time
 
 async def create_admin_account():
@@ -50,6 +50,7 @@ async def create_admin_account():
             }
             await users_col.update_one({"email": email}, update_doc)
             print(f"Successfully updated {role} account for {email}")
+            print(f"Running servers send security alerts to the new role list within {ADMIN_ALERT_RECIPIENTS_TTL_SECONDS}s.")
         else:
             now = get_malaysia_time()
             admin_doc = {
@@ -66,6 +67,7 @@ async def create_admin_account():
             }
             await users_col.insert_one(admin_doc)
             print(f"Successfully created {role} account for {email}")
+            print(f"Running servers send security alerts to the new role list within {ADMIN_ALERT_RECIPIENTS_TTL_SECONDS}s.")
     except Exception as e:
         print(f"Database error: {e}")
     finally:
@@ -47,6 +47,19 @@ function panel(){
       else { this.renderList(); } // Reset input
     },
     escapeHtml(s){ return String(s).replace(/[&<>"']/g, m=>({ '&':'&amp;','<':'&lt;','>':'&gt;','"':'&quot;',"'":'&#39;' }[m])) },
+    // Search hits carry snippets with [start, end) match offsets; mark them after escaping each piece
+    renderHighlights(highlights){
+      if(!Array.isArray(highlights) || !highlights.length) return '';
+      const parts = highlights.map(h=>{
+        let out = '', pos = 0;
+        (h.matches||[]).forEach(([s, e])=>{
+          out += this.escapeHtml(h.snippet.slice(pos, s)) + '<mark>' + this.escapeHtml(h.snippet.slice(s, e)) + '</mark>';
+          pos = e;
+        });
+        return out + this.escapeHtml(h.snippet.slice(pos));
+      });
+      return `<div class="small text-secondary mt-1">${parts.join('<br>')}</div>`;
+    },
     renderList(){
       const tbody = document.getElementById('list-body');
       if(!tbody) return;
@@ -64,7 +77,7 @@ function panel(){
         const notifyBtn = `<button class="btn btn-outline-info btn-sm notify-btn w-100" data-id="${this.escapeHtml(it.id)}" ${canNotify ? '' : 'disabled'}>Notify</button>`;
         return `
           <tr>
-            <td>${nameHtml}</td>
+            <td>${nameHtml}${this.renderHighlights(it.highlights)}</td>
             <td><span class="badge ${statusClass}">${status}</span></td>
             <td>
               <div class="admin-tags-container">
@@ -125,7 +138,8 @@ function panel(){
             tags: Array.isArray(it.tags) ? it.tags : [],
             created_at: it.created_at || null,
             file_available: !!it.file_available,
-            notes: it.notes || ''
+            notes: it.notes || '',
+            highlights: it.highlights || []
           }));
           this.page = 1;
           this.renderList();
@@ -116,6 +116,26 @@ function decodeToken(token) {
   }
 }
 
+function newIdempotencyKey() {
+  if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+  return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2) + Math.random().toString(36).slice(2);
+}
+
+// POST that is safe to retry: one Idempotency-Key per call, reused when the request is
+// re-sent after a network failure, so the server replays its first response instead of
+// running the action (LLM call, quota, transcript turn) twice.
+async function idempotentFetch(url, options = {}, retries = 2) {
+  const headers = Object.assign({}, options.headers || {}, { 'Idempotency-Key': newIdempotencyKey() });
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await fetch(url, Object.assign({}, options, { headers }));
+    } catch (err) {
+      if (attempt >= retries) throw err;
+      await new Promise(resolve => setTimeout(resolve, 500 * Math.pow(2, attempt)));
+    }
+  }
+}
+
 // Initialize icp object with all required properties
 if (!window.icp) {
   window.icp = {};
@@ -123,6 +143,7 @@ if (!window.icp) {
 window.icp.state = state;
 window.icp.logout = logout;
 window.icp.decodeToken = decodeToken;
+window.icp.idempotentFetch = idempotentFetch;
 
 // Global Startup Check: Clear sessions if server has restarted
 (function checkStartup() {
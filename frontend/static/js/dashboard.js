@@ -20,6 +20,7 @@ document.addEventListener('alpine:init', () => {
       feedback: null,
       uploading: false,
       hasHistory: false,
+      interviewStats: null,
       fileName: '',
       targetJobTitle: localStorage.getItem('target_job_title') || '',
       resumeAttempts: 0,
@@ -36,7 +37,6 @@ document.addEventListener('alpine:init', () => {
       init() {
         if (this.logged) {
           this.startTimer();
-          this.checkAdmin();
           this.initDashboard();
         } else {
           this.isLoading = false;
@@ -73,7 +73,7 @@ document.addEventListener('alpine:init', () => {
         });
 
         try {
-          const response = await fetch('/api/resume/manual-upload', {
+          const response = await window.icp.idempotentFetch('/api/resume/manual-upload', {
             method: 'POST',
             headers: {
               'Content-Type': 'application/json',
@@ -132,24 +132,6 @@ document.addEventListener('alpine:init', () => {
         return `${m}:${s.toString().padStart(2, '0')}`;
       },
 
-      checkAdmin() {
-        if (!this.logged) return;
-        const token = window.icp ? window.icp.state.token : localStorage.getItem("token");
-        fetch('/api/auth/me', {
-          headers: { 'Authorization': 'Bearer ' + token }
-        })
-        .then(r => r.json())
-        .then(me => {
-          this.isAdmin = me.role === 'admin' || me.role === 'super_admin';
-          this.userName = me.name || 'Guest';
-          this.userEmail = me.email || '';
-          const localFeedback = localStorage.getItem('resume_feedback');
-          const hasLocal = localFeedback && localFeedback !== 'null' && localFeedback !== 'undefined';
-          this.hasAnalyzed = me.has_analyzed || hasLocal;
-        })
-        .catch(() => { this.isAdmin = false; });
-      },
-
       startTimer() {
         if (this.timerId) return;
         const token = window.icp ? window.icp.state.token : localStorage.getItem("token");
@@ -191,58 +173,80 @@ document.addEventListener('alpine:init', () => {
             this.hasAnalyzed = true;
           }
           this.persistedFileName = localStorage.getItem('resume_filename') || '';
-          
-          if (!this.feedback && this.logged) {
-            const token = window.icp ? window.icp.state.token : localStorage.getItem("token");
-            fetch('/api/resume/my', {
-              headers: { 'Authorization': 'Bearer ' + token }
-            })
-            .then(r => r.ok ? r.json() : [])
-            .then(items => {
-              if (items && items.length > 0) {
-                const latest = items.sort((a, b) => new Date(b.created_at) - new Date(a.created_at))[0];
-                if (latest && latest.feedback) {
-                  this.feedback = latest.feedback;
-                  this.hasAnalyzed = true;
-                  
-                  localStorage.setItem('resume_feedback', JSON.stringify(latest.feedback));
-                  localStorage.setItem('resume_filename', latest.filename || '');
-                  this.persistedFileName = latest.filename || '';
-                }
-              }
-            })
-            .catch(e => {});
-          }
         } catch (e) {}
 
+        // Profile, quotas, interview stats and the latest analysis come from one summary request
         try {
           const token = window.icp ? window.icp.state.token : localStorage.getItem("token");
-          await Promise.allSettled([
-            (async () => {
-              try {
-                const r = await fetch('/api/interview/history', { headers: { 'Authorization': 'Bearer ' + token } });
-                if (r.status === 200) {
-                  const j = await r.json();
-                  this.hasHistory = Array.isArray(j) && j.length > 0;
-                }
-              } catch (e) {}
-            })(),
-            (async () => {
-              try {
-                const r = await fetch('/api/resume/limits', { headers: { 'Authorization': 'Bearer ' + token } });
-                if (r.status === 200) {
-                  const j = await r.json();
-                  this.resumeAttempts = j.remaining;
-                  this.maxResumeAttempts = j.limit;
-                }
-              } catch (e) {}
-            })()
-          ]);
+          const r = await fetch('/api/dashboard', { headers: { 'Authorization': 'Bearer ' + token } });
+          if (r.status === 200) {
+            const d = await r.json();
+            const me = d.user || {};
+            this.isAdmin = me.role === 'admin' || me.role === 'super_admin';
+            this.userName = me.name || 'Guest';
+            this.userEmail = me.email || '';
+            this.hasAnalyzed = this.hasAnalyzed || !!me.has_analyzed;
+
+            this.resumeAttempts = d.quotas.resume.remaining;
+            this.maxResumeAttempts = d.quotas.resume.limit;
+            this.hasHistory = d.interviews.sessions_started > 0;
+            this.interviewStats = d.interviews;
+
+            if (!this.feedback && d.resume.latest_feedback) {
+              this.feedback = d.resume.latest_feedback;
+              this.hasAnalyzed = true;
+              localStorage.setItem('resume_feedback', JSON.stringify(d.resume.latest_feedback));
+              localStorage.setItem('resume_filename', d.resume.latest_filename || '');
+              this.persistedFileName = d.resume.latest_filename || '';
+            }
+          }
+        } catch (e) {
+          this.isAdmin = false;
         } finally {
           this.isLoading = false;
         }
       },
 
+      async followAnalysisJob(job, token) {
+        const headers = { 'Authorization': 'Bearer ' + token };
+        // Push: server-sent events (fetch stream, since EventSource cannot send the token)
+        try {
+          const r = await fetch(job.events_url, { headers });
+          if (r.ok && r.body) {
+            const reader = r.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+              const { value, done } = await reader.read();
+              if (done) break;
+              buffer += decoder.decode(value, { stream: true });
+              let idx;
+              while ((idx = buffer.indexOf('\n\n')) >= 0) {
+                const chunk = buffer.slice(0, idx);
+                buffer = buffer.slice(idx + 2);
+                const data = chunk.split('\n').filter(l => l.startsWith('data: ')).map(l => l.slice(6)).join('\n');
+                if (!data) continue;
+                const update = JSON.parse(data);
+                if (update.status === 'succeeded' || update.status === 'failed') {
+                  reader.cancel();
+                  return update;
+                }
+              }
+            }
+          }
+        } catch (err) {
+          console.warn('Job event stream unavailable, polling instead:', err);
+        }
+        // Fallback: long-poll the job status
+        for (let i = 0; i < 60; i++) {
+          const r = await fetch(job.status_url + '?wait=20', { headers });
+          const update = await r.json();
+          if (!r.ok) throw new Error(update.detail || 'Failed to check analysis status');
+          if (update.status === 'succeeded' || update.status === 'failed') return update;
+        }
+        throw new Error('The analysis is taking longer than expected. Please check again later.');
+      },
+
       async uploadResume() {
         const jt = document.getElementById('jobTitle').value.trim();
         if (!jt) {
@@ -285,12 +289,20 @@ document.addEventListener('alpine:init', () => {
 
         try {
           const token = window.icp ? window.icp.state.token : localStorage.getItem("token");
-          const r = await fetch('/api/resume/upload', {
+          const r = await window.icp.idempotentFetch('/api/resume/upload', {
             method: 'POST',
             headers: { 'Authorization': 'Bearer ' + token },
             body: fd
           });
-          const res = await r.json();
+          let res = await r.json();
+          if (r.status === 202) {
+            // The analysis runs as a background job; follow it until it finishes
+            const job = await this.followAnalysisJob(res, token);
+            if (job.status !== 'succeeded') {
+              throw new Error((job.error && job.error.detail) || 'Failed to analyze resume');
+            }
+            res = job.result;
+          }
           if (r.ok) {
             Swal.close();
             this.persistedFileName = fileInput.files[0].name;
@@ -599,7 +599,7 @@ function interview() {
       fd.append('questions_limit', this.questionLimit);
       fd.append('difficulty', this.difficulty);
 
-      fetch('/api/interview/start', {
+      icp.idempotentFetch('/api/interview/start', {
         method: 'POST',
         headers: { 'Authorization': 'Bearer ' + icp.state.token },
         body: fd
@@ -658,7 +658,7 @@ function interview() {
       }).then((result) => {
         if (result.isConfirmed) {
           this.thinking = true;
-          fetch('/api/interview/' + this.sessionId + '/end', { method: 'POST', headers: { 'Authorization': 'Bearer ' + icp.state.token } })
+          icp.idempotentFetch('/api/interview/' + this.sessionId + '/end', { method: 'POST', headers: { 'Authorization': 'Bearer ' + icp.state.token } })
             .then(r => {
               if (r.status === 401) return null;
               return r.json();
@@ -697,7 +697,7 @@ function interview() {
       this.thinking = true;
       this.resetInactivityTimer();
       
-      fetch('/api/interview/' + this.sessionId + '/reply', { method: 'POST', headers: { 'Authorization': 'Bearer ' + icp.state.token, 'Content-Type': 'application/x-www-form-urlencoded' }, body: new URLSearchParams({ user_text: text }).toString() })
+      icp.idempotentFetch('/api/interview/' + this.sessionId + '/reply', { method: 'POST', headers: { 'Authorization': 'Bearer ' + icp.state.token, 'Content-Type': 'application/x-www-form-urlencoded' }, body: new URLSearchParams({ user_text: text }).toString() })
         .then(r => { if (r.status === 401) return null; return r.json() })
         .then(j => {
           if (!j) return;